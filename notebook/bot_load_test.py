@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Load test: many bot users hitting the API at once
+
+    python notebook/bot_load_test.py [--users 50] [--latency 0.5]
+
+Starts a stub API server (every endpoint answers after --latency seconds)
+and runs the bot's /queue and "post to all platforms" handlers for every
+user concurrently, the way Application(concurrent_updates=...) dispatches
+them. With async API calls the wall time stays close to one API latency;
+the old blocking requests calls took users x latency. No Telegram token
+or config.yaml is needed - handlers reply into an in-memory log.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def start_stub_api(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, body):
+            time.sleep(latency)
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._reply({"total": 3, "pending": 3, "next_processing": "23:00"})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            self._reply({"status": "queued", "position": 1})
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 1024
+
+    server = Server(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def load_bot(api_url: str):
+    """Import the bot module against a throwaway config"""
+    import scripts.src.config.loader as loader
+
+    test_config = {
+        'api': {'url': api_url},
+        'telegram': {'bot_token': '0:test', 'concurrent_updates': 256},
+        'scheduler': {'time': '23:00'},
+    }
+    loader.load_config = lambda *args, **kwargs: test_config
+    from scripts.src.bot import telegram_bot
+    return telegram_bot
+
+
+def fake_update(user_id: int, replies: list):
+    async def reply(text, **kwargs):
+        replies.append((user_id, text))
+
+    message = SimpleNamespace(
+        from_user=SimpleNamespace(id=user_id), chat_id=user_id, message_id=user_id,
+        reply_text=reply, text=None, caption=None, photo=None,
+    )
+    query = SimpleNamespace(
+        from_user=message.from_user, message=message, data='platform_all',
+        answer=lambda *a, **k: asyncio.sleep(0), edit_message_text=reply,
+    )
+    return SimpleNamespace(message=message, callback_query=query)
+
+
+def fake_context(replies: list, text: str):
+    async def send_message(chat_id, text, **kwargs):
+        replies.append((chat_id, text))
+
+    return SimpleNamespace(
+        bot=SimpleNamespace(send_message=send_message),
+        user_data={'pending_content': {'text': text, 'type': 'url', 'has_image': False}},
+    )
+
+
+async def timed(handler, update, context):
+    started = time.perf_counter()
+    await handler(update, context)
+    return time.perf_counter() - started
+
+
+async def run(bot, users: int):
+    replies = []
+    jobs = []
+    for user_id in range(1, users + 1):
+        update = fake_update(user_id, replies)
+        jobs.append(timed(bot.queue_command, update, fake_context(replies, '')))
+        jobs.append(timed(bot.button_callback, update,
+                          fake_context(replies, f"https://example.com/article-{user_id}")))
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*jobs)
+    wall = time.perf_counter() - started
+    await bot.api.aclose()
+    return wall, sorted(latencies), replies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub API response time in seconds")
+    args = parser.parse_args()
+
+    server = start_stub_api(args.latency)
+    bot = load_bot(f"http://127.0.0.1:{server.server_address[1]}")
+    logging.getLogger(bot.__name__).setLevel(logging.WARNING)
+
+    wall, latencies, replies = asyncio.run(run(bot, args.users))
+    errors = [text for _, text in replies if text.startswith('❌')]
+    updates = len(latencies)
+
+    print("=" * 80)
+    print(f"BOT LOAD TEST ({args.users} users, {updates} updates, stub latency {args.latency}s)")
+    print("=" * 80)
+    print(f"wall time:        {wall:6.2f}s  (blocking handlers: ~{updates * args.latency:.0f}s)")
+    print(f"handler p50/p95:  {statistics.median(latencies):6.2f}s / {latencies[int(0.95 * (updates - 1))]:.2f}s")
+    print(f"errors:           {len(errors)}")
+    print(f"api client:       {bot.api.metrics()}")
+    print("=" * 80)
+    sys.exit(1 if errors else 0)
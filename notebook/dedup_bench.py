@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Lookup latency and accuracy of the near-duplicate index
+
+    python notebook/dedup_bench.py [--posts 100000] [--queries 2000] [--max-distance 7]
+
+Fills a throwaway index with synthetic posts (about 30 posts a day for ten
+years at the default size), then looks up lightly edited copies of indexed
+posts (different emojis, hashtags, a word changed, a link swapped), which
+should be found, and fresh posts, which should not. Fingerprinting the
+query is timed separately from the index lookup. No config.yaml needed.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.src.utils.dedup_index import DedupIndex, simhash  # noqa: E402
+
+SYLLABLES = "ka lo mi ne ru ta vi so de pa gen mod lat tok vec ser ran ing ex al".split()
+# A few thousand made-up words drawn with a Zipf-like skew, plus stopwords,
+# so unrelated posts overlap about as much as real ones do
+WORDS = sorted({"".join(random.Random(i).choices(SYLLABLES, k=random.Random(-i).randint(2, 4)))
+                for i in range(4000)})
+STOP = "the and of to in is for with on that this we our you".split()
+WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+EMOJIS = ["🚀", "🔹", "👉", "🎯", "💡", "✨"]
+
+
+def make_post(rng: random.Random) -> str:
+    words = [rng.choice(STOP) if rng.random() < 0.3 else word
+             for word in rng.choices(WORDS, weights=WEIGHTS, k=rng.randint(35, 70))]
+    tags = " ".join(f"#{rng.choice(WORDS).title()}" for _ in range(3))
+    return f"{rng.choice(EMOJIS)} {' '.join(words)}\n\nhttps://example.com/{rng.randint(0, 10**9)}\n\n{tags}"
+
+
+def edit(post: str, rng: random.Random) -> str:
+    """Small changes a rewrite of the same post tends to have"""
+    body, _, tags = post.rpartition("\n\n")
+    words = body.split()
+    words[rng.randrange(1, len(words))] = rng.choice(WORDS)
+    words[0] = rng.choice(EMOJIS)
+    return f"{' '.join(words)} https://example.org/other\n\n{tags.upper()}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--max-distance', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    platforms = ["telegram", "twitter", "linkedin"]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dedup.db")
+        index = DedupIndex(path, max_distance=args.max_distance)
+        posts = []
+        started = time.perf_counter()
+        for i in range(args.posts):
+            post = make_post(rng)
+            platform = platforms[i % 3]
+            posts.append((platform, post))
+            index.add(platform, post, ref=i)
+        print(f"Indexed {args.posts} posts in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        reloaded = DedupIndex(path, max_distance=args.max_distance)
+        print(f"Reloaded from SQLite in {time.perf_counter() - started:.2f}s ({reloaded.stats()})")
+
+        hashing, lookups, found, false_hits = [], [], 0, 0
+        for i in range(args.queries):
+            near = i % 2 == 0
+            platform, original = rng.choice(posts)
+            query = edit(original, rng) if near else make_post(rng)
+
+            started = time.perf_counter()
+            simhash(query)
+            hashing.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            matches = reloaded.find(query, platforms=[platform])
+            lookups.append(time.perf_counter() - started)
+            if near:
+                found += any(match["preview"] == " ".join(original.split())[:80] for match in matches)
+            else:
+                false_hits += bool(matches)
+
+        # find() fingerprints the query too; the index part is the difference
+        index_ms = [(total - hashed) * 1000 for total, hashed in zip(lookups, hashing)]
+        print(f"Fingerprint: median {statistics.median(hashing) * 1000:.3f}ms")
+        print(f"Index lookup: median {statistics.median(index_ms):.3f}ms, "
+              f"p99 {statistics.quantiles(index_ms, n=100)[98]:.3f}ms")
+        print(f"Edited copies found: {found}/{args.queries // 2}, "
+              f"fresh posts flagged: {false_hits}/{args.queries - args.queries // 2}")
+
+
+if __name__ == '__main__':
+    main()
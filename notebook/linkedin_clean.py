@@ -1,82 +1,110 @@
 #!/usr/bin/env python3
 """
-Test the LinkedIn text cleanup function
+Regression suite for the platform text normalizer
+
+    python notebook/linkedin_clean.py
+
+Exits non-zero when any case fails.
 """
-import re
+import os
+import sys
 
-def clean_linkedin_text(text: str) -> str:
-    """Clean text for LinkedIn"""
-    # Replace parentheses with square brackets
-    text = re.sub(r'\(([^)]+)\)', r'[\1]', text)
-    
-    # Remove markdown bold
-    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-    
-    # Remove markdown italic
-    text = re.sub(r'(?<!\*)\*(?!\*)([^*]+)\*(?!\*)', r'\1', text)
-    
-    # Remove markdown headers
-    text = re.sub(r'^#+\s+', '', text, flags=re.MULTILINE)
-    
-    # Remove markdown links [text](url) -> text url
-    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'\1 \2', text)
-    
-    # Clean up multiple spaces
-    text = re.sub(r' +', ' ', text)
-    
-    # Clean up multiple newlines
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    
-    return text.strip()
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from scripts.src.utils.text_normalizer import normalize_text  # noqa: E402
 
 # Test cases
 test_cases = [
     {
         "name": "Parentheses in acronyms",
+        "platform": "linkedin",
         "input": "Vision Language Models (VLM) are amazing (AI) tools",
         "expected": "Vision Language Models [VLM] are amazing [AI] tools"
     },
     {
         "name": "Markdown bold",
+        "platform": "linkedin",
         "input": "This is **bold** text",
         "expected": "This is bold text"
     },
     {
         "name": "Markdown links",
+        "platform": "linkedin",
         "input": "Check [this article](https://example.com) out",
         "expected": "Check this article https://example.com out"
     },
     {
         "name": "Complex case",
+        "platform": "linkedin",
         "input": "**Mixture of Experts (MoE)** is a technique where models use specialized sub-networks (experts)",
         "expected": "Mixture of Experts [MoE] is a technique where models use specialized sub-networks [experts]"
     },
     {
         "name": "Multiple parentheses",
+        "platform": "linkedin",
         "input": "LLM (Large Language Model) and VLM (Vision Language Model) are both AI (Artificial Intelligence) systems",
         "expected": "LLM [Large Language Model] and VLM [Vision Language Model] are both AI [Artificial Intelligence] systems"
-    }
+    },
+    {
+        "name": "Headers, italic and blank lines",
+        "platform": "linkedin",
+        "input": "## Key takeaways\n\n\n\n🔹 *Faster* inference\n🔹 Lower   cost",
+        "expected": "Key takeaways\n\n🔹 Faster inference\n🔹 Lower cost"
+    },
+    {
+        "name": "Bullet asterisks are not italic",
+        "platform": "linkedin",
+        "input": "* first point\n* second point",
+        "expected": "* first point\n* second point"
+    },
+    {
+        "name": "Twitter strips markdown and HTML",
+        "platform": "twitter",
+        "input": "**New** <b>paper</b> on [RLHF](https://example.com/rlhf) (preprint) #AI",
+        "expected": "New paper on RLHF https://example.com/rlhf (preprint) #AI"
+    },
+    {
+        "name": "Telegram markdown to HTML",
+        "platform": "telegram",
+        "input": "**Big news** from *OpenAI*: read [the post](https://example.com/a?x=1&y=2)",
+        "expected": "<b>Big news</b> from <i>OpenAI</i>: read <a href=\"https://example.com/a?x=1&amp;y=2\">the post</a>"
+    },
+    {
+        "name": "Telegram escapes stray markup, keeps tags and entities",
+        "platform": "telegram",
+        "input": "<b>R&D</b> shows 5 < 6 &amp; <div>done</div>",
+        "expected": "<b>R&amp;D</b> shows 5 &lt; 6 &amp; &lt;div&gt;done&lt;/div&gt;"
+    },
+    {
+        "name": "Telegram header becomes bold",
+        "platform": "telegram",
+        "input": "# Weekly digest\nText",
+        "expected": "<b>Weekly digest</b>\nText"
+    },
 ]
 
-print("=" * 80)
-print("TESTING LINKEDIN TEXT CLEANUP")
-print("=" * 80)
+if __name__ == "__main__":
+    print("=" * 80)
+    print("TESTING PLATFORM TEXT NORMALIZER")
+    print("=" * 80)
+
+    failures = 0
+    for i, test in enumerate(test_cases, 1):
+        print(f"\n{i}. [{test['platform']}] {test['name']}")
+        print("-" * 80)
+        print(f"Input:    {test['input']!r}")
+
+        result = normalize_text(test['input'], test['platform'])
+        print(f"Output:   {result!r}")
+        print(f"Expected: {test['expected']!r}")
 
-for i, test in enumerate(test_cases, 1):
-    print(f"\n{i}. {test['name']}")
-    print("-" * 80)
-    print(f"Input:    {test['input']}")
-    
-    result = clean_linkedin_text(test['input'])
-    print(f"Output:   {result}")
-    print(f"Expected: {test['expected']}")
-    
-    if result == test['expected']:
-        print("✅ PASS")
-    else:
-        print("❌ FAIL")
+        if result == test['expected']:
+            print("✅ PASS")
+        else:
+            failures += 1
+            print("❌ FAIL")
 
-print("\n" + "=" * 80)
-print("Testing complete!")
-print("=" * 80)
\ No newline at end of file
+    print("\n" + "=" * 80)
+    print(f"Testing complete! {len(test_cases) - failures}/{len(test_cases)} passed")
+    print("=" * 80)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Load test: FastAPI wrapper (server.py) vs LitServe entry point (server_litserve.py)
+
+Start both servers on different ports, then:
+    python notebook/load_test_servers.py \
+        --fastapi http://localhost:8000 --litserve http://localhost:8001 \
+        --requests 16 --concurrency 8
+
+Every request goes through the real pipeline (LLM + posting), so point the
+config at a test channel / dry-run accounts before running this.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+SAMPLE_URLS = [
+    "https://huggingface.co/blog/vlms-2025",
+    "https://aws.amazon.com/what-is/reinforcement-learning-from-human-feedback/",
+    "https://huggingface.co/blog/moe",
+    "https://huggingface.co/blog/rlhf",
+]
+
+
+async def fire(client, base_url, payload, semaphore):
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            response = await client.post(f"{base_url}/predict", json=payload)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        return ok, time.perf_counter() - started
+
+
+async def run_load(base_url, total, concurrency, platforms):
+    semaphore = asyncio.Semaphore(concurrency)
+    payloads = [
+        {"url": SAMPLE_URLS[i % len(SAMPLE_URLS)], "platforms": platforms}
+        for i in range(total)
+    ]
+    
+    async with httpx.AsyncClient(timeout=None) as client:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(fire(client, base_url, p, semaphore) for p in payloads))
+        wall = time.perf_counter() - started
+    
+    latencies = sorted(latency for _, latency in results)
+    return {
+        "ok": sum(1 for ok, _ in results if ok),
+        "total": total,
+        "wall_s": wall,
+        "throughput_per_min": total / wall * 60,
+        "p50_s": statistics.median(latencies),
+        "p95_s": latencies[int(0.95 * (len(latencies) - 1))],
+    }
+
+
+def print_result(name, result):
+    print(f"\n{name}")
+    print("-" * 60)
+    print(f"OK:          {result['ok']}/{result['total']}")
+    print(f"Wall time:   {result['wall_s']:.1f}s")
+    print(f"Throughput:  {result['throughput_per_min']:.2f} req/min")
+    print(f"Latency p50: {result['p50_s']:.1f}s")
+    print(f"Latency p95: {result['p95_s']:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare FastAPI wrapper and LitServe batching")
+    parser.add_argument("--fastapi", default="http://localhost:8000")
+    parser.add_argument("--litserve", default="http://localhost:8001")
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--platform", default="telegram", choices=["telegram", "twitter", "linkedin"])
+    args = parser.parse_args()
+    
+    platforms = {p: p == args.platform for p in ("telegram", "twitter", "linkedin")}
+    
+    print("=" * 60)
+    print(f"LOAD TEST: {args.requests} requests, concurrency {args.concurrency}")
+    print("=" * 60)
+    
+    results = {}
+    for name, base_url in (("FastAPI wrapper", args.fastapi), ("LitServe batched", args.litserve)):
+        results[name] = asyncio.run(run_load(base_url, args.requests, args.concurrency, platforms))
+        print_result(f"{name} ({base_url})", results[name])
+    
+    fastapi_tp = results["FastAPI wrapper"]["throughput_per_min"]
+    litserve_tp = results["LitServe batched"]["throughput_per_min"]
+    if fastapi_tp:
+        print(f"\nSpeedup (throughput): {litserve_tp / fastapi_tp:.2f}x")
+    print("=" * 60)
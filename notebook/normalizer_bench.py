@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass normalizer against the old seven-pass cleanup
+
+    python notebook/normalizer_bench.py [--corpus data/results.db] [--repeat 5]
+
+The corpus is the "result" and "summary" fields of saved pipeline outputs
+(the results store). When there are none yet, a few representative LLM
+posts are used instead.
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.src.utils.results_store import ResultsStore  # noqa: E402
+from scripts.src.utils.text_normalizer import normalize_text  # noqa: E402
+
+legacy_logger = logging.getLogger("legacy_clean")
+legacy_logger.setLevel(logging.INFO)
+
+SAMPLES = [
+    "## 🚀 Mixture of Experts (MoE) Explained\n\n**Mixture of Experts (MoE)** lets large language models "
+    "(LLMs) route each token to a few *specialized* sub-networks (experts).\n\n\n\n🔹 **Sparse activation** "
+    "keeps inference cheap\n🔹 Training   needs load balancing (auxiliary loss)\n\nRead the full "
+    "[article](https://huggingface.co/blog/moe) and share your thoughts!\n\n#AI #MachineLearning #LLM",
+    "🎯 <b>Vision Language Models</b> (VLM) are everywhere.\n\nThey combine an image encoder with an LLM "
+    "& a projection layer. Key points:\n* CLIP-style encoders\n* Q-Former (BLIP-2)\n* *Instruction tuning*"
+    "\n\n👉 [Read more](https://example.com/vlm?utm_source=x&ref=1)\n\n#ComputerVision #VLM",
+    "RLHF (Reinforcement Learning from Human Feedback) aligns models with preferences. "
+    "**Step 1:** collect comparisons. **Step 2:** train a reward model (RM). **Step 3:** optimize with PPO. "
+    "https://aws.amazon.com/what-is/reinforcement-learning-from-human-feedback/ #RLHF #AI",
+]
+
+
+def legacy_clean(text: str) -> str:
+    """Old clean_linkedin_text, including its per-pass debug logging"""
+    legacy_logger.debug(f"Original text length: {len(text)}")
+    legacy_logger.debug(f"Original text preview: {text[:200]}")
+    text = re.sub(r'\(([^)]+)\)', r'[\1]', text)
+    legacy_logger.debug("Applied parentheses replacement")
+    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
+    legacy_logger.debug("Removed markdown bold")
+    text = re.sub(r'(?<!\*)\*(?!\*)([^*]+)\*(?!\*)', r'\1', text)
+    legacy_logger.debug("Removed markdown italic")
+    text = re.sub(r'^#+\s+', '', text, flags=re.MULTILINE)
+    legacy_logger.debug("Removed markdown headers")
+    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'\1 \2', text)
+    legacy_logger.debug("Removed markdown links")
+    text = re.sub(r' +', ' ', text)
+    legacy_logger.debug("Cleaned up multiple spaces")
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    legacy_logger.debug("Cleaned up multiple newlines")
+    legacy_logger.debug(f"Cleaned text length: {len(text)}")
+    legacy_logger.debug(f"Cleaned text preview: {text[:200]}")
+    return text.strip()
+
+
+def load_corpus(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    texts = []
+    for data in ResultsStore(path).query(status="success", limit=10000):
+        for key in ("result", "summary"):
+            if isinstance(data.get(key), str) and data[key].strip():
+                texts.append(data[key])
+    return texts
+
+
+if __name__ == "__main__":
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default=os.path.join(root, "data", "results.db"))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    source = f"{len(corpus)} saved outputs"
+    if not corpus:
+        corpus = SAMPLES * 50
+        source = f"{len(corpus)} built-in samples (no saved outputs found)"
+
+    print("=" * 80)
+    print(f"NORMALIZER BENCHMARK ({source}, {sum(map(len, corpus)) / 1024:.0f} KiB)")
+    print("=" * 80)
+
+    candidates = [("legacy 7-pass", legacy_clean)] + [
+        (f"single-pass {platform}", lambda text, p=platform: normalize_text(text, p))
+        for platform in ("linkedin", "twitter", "telegram")
+    ]
+    for name, fn in candidates:
+        seconds = min(timeit.repeat(lambda: [fn(t) for t in corpus], number=1, repeat=args.repeat))
+        print(f"{name:>22}: {seconds / len(corpus) * 1e6:8.1f} µs/post")
+
+    differing = sum(1 for t in corpus if legacy_clean(t) != normalize_text(t, "linkedin"))
+    print(f"\nLinkedIn outputs that differ from legacy: {differing}/{len(corpus)}")
+    print("=" * 80)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Property checks and microbenchmark for the weighted tweet splitter
+
+    python notebook/twitter_split_check.py [--cases 2000] [--seed 0]
+
+Generates random posts (ASCII, CJK, emoji, long URLs, hashtags), plus posts
+with more links and hashtags than fit in one tweet, and checks that every
+tweet of every thread stays within X's weighted limit and that no words,
+URLs or hashtags get lost. Then times the new splitter against
+the legacy len()-based one.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.src.utils.twitter_text import (  # noqa: E402
+    MAX_WEIGHTED_LENGTH, URL_RE, HASHTAG_RE, split_thread, weighted_length
+)
+
+WORDS = ["model", "vision", "language", "training", "data", "reasoning", "agents",
+         "benchmark", "open-source", "inference", "latency", "multimodal"]
+CJK = ["模型", "視覚", "言語", "学習", "データ", "推論"]
+EMOJI = ["🚀", "💡", "👍🏽", "👨‍👩‍👧", "🇩🇪", "✨"]
+TAGS = ["#AI", "#MachineLearning", "#LLM", "#ComputerVision", "#OpenSource"]
+
+
+def legacy_split(text: str, max_length: int = 270) -> list:
+    """Old TwitterPosterTool._split_into_tweets_smart, kept for the benchmark"""
+    hashtags = re.findall(r'#\w+', text)
+    urls = re.findall(r'https?://[^\s]+', text)
+    text_without_special = text
+    for hashtag in hashtags:
+        text_without_special = text_without_special.replace(hashtag, '')
+    for url in urls:
+        text_without_special = text_without_special.replace(url, '')
+    text_without_special = ' '.join(text_without_special.split())
+    words = text_without_special.split()
+    tweets = []
+    current_tweet = ""
+    for word in words:
+        if len(current_tweet) + len(word) + 1 <= max_length - 50:
+            current_tweet += word + " "
+        else:
+            if current_tweet:
+                tweets.append(current_tweet.strip())
+            current_tweet = word + " "
+    if current_tweet:
+        tweets.append(current_tweet.strip())
+    if tweets:
+        first_tweet = tweets[0]
+        for url in urls:
+            if len(first_tweet) + len(url) + 2 <= max_length:
+                first_tweet += f"\n{url}"
+        hashtag_str = " ".join(hashtags)
+        if len(first_tweet) + len(hashtag_str) + 2 <= max_length:
+            first_tweet += f"\n{hashtag_str}"
+        tweets[0] = first_tweet
+    total = len(tweets)
+    if total > 1:
+        tweets = [f"{i+1}/{total} {tweet}" for i, tweet in enumerate(tweets)]
+    return tweets
+
+
+def random_post(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(5, 160)):
+        roll = rng.random()
+        if roll < 0.65:
+            parts.append(rng.choice(WORDS))
+        elif roll < 0.75:
+            parts.append(rng.choice(CJK))
+        elif roll < 0.82:
+            parts.append(rng.choice(EMOJI))
+        elif roll < 0.87:
+            parts.append(rng.choice(TAGS))
+        elif roll < 0.90:
+            parts.append("https://example.com/" + "x" * rng.randint(5, 200))
+        elif roll < 0.92:
+            parts.append("a" * rng.randint(100, 700))  # unbreakable token
+        else:
+            parts[-1:] = [(parts[-1] if parts else "word") + rng.choice([".", "!", "?"])]
+    return " ".join(parts)
+
+
+def link_heavy_post(rng: random.Random) -> str:
+    """A post ending in many links and hashtags, more than half a tweet holds"""
+    words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 80)))
+    urls = " ".join(f"https://example.com/{i}/" + "x" * rng.randint(0, 60) for i in range(rng.randint(4, 12)))
+    tags = " ".join(f"#{rng.choice(WORDS).replace('-', '')}{i}" for i in range(rng.randint(3, 40)))
+    return f"{words}. {urls}\n{tags}"
+
+
+def check(post: str) -> list:
+    """Return a list of violated properties for one post"""
+    problems = []
+    tweets = split_thread(post)
+    for tweet in tweets:
+        if weighted_length(tweet) > MAX_WEIGHTED_LENGTH:
+            problems.append(f"tweet over limit ({weighted_length(tweet)})")
+
+    if weighted_length(post) <= MAX_WEIGHTED_LENGTH:
+        if tweets != [post]:
+            problems.append("post that fits was split")
+        return problems
+
+    joined = " ".join(re.sub(r"^\d+/\d+ ", "", t) for t in tweets)
+    # Every non-special word must survive, in order
+    words = [w for w in URL_RE.sub(" ", HASHTAG_RE.sub(" ", post)).split()]
+    position = 0
+    for word in words:
+        found = joined.find(word[:10], position)
+        if found == -1:
+            problems.append(f"lost word {word[:20]!r}")
+            break
+        position = found
+    # URLs and hashtags go to the first tweet, or after the text when they do not fit
+    thread_urls = URL_RE.findall(joined)
+    for url in URL_RE.findall(post):
+        if url not in thread_urls:
+            problems.append(f"lost URL {url[:40]}")
+            break
+    for url in thread_urls:
+        if url not in post:
+            problems.append(f"invented URL {url}")
+    thread_tags = set(HASHTAG_RE.findall(URL_RE.sub(" ", joined)))
+    for tag in HASHTAG_RE.findall(URL_RE.sub(" ", post)):
+        if tag not in thread_tags:
+            problems.append(f"lost hashtag {tag}")
+            break
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    posts = [random_post(rng) for _ in range(args.cases)]
+    posts += [link_heavy_post(rng) for _ in range(args.cases // 4)]
+
+    print("=" * 80)
+    print(f"PROPERTY CHECKS ({len(posts)} random posts, seed {args.seed})")
+    print("=" * 80)
+    failures = 0
+    for post in posts:
+        problems = check(post)
+        if problems:
+            failures += 1
+            if failures <= 5:
+                print(f"❌ {problems[0]}\n   {post[:120]!r}")
+    print("✅ PASS" if not failures else f"❌ FAIL ({failures} posts)")
+
+    legacy_over = sum(
+        1 for post in posts for t in legacy_split(post) if weighted_length(t) > MAX_WEIGHTED_LENGTH
+    )
+    legacy_tweets = sum(len(legacy_split(p)) for p in posts)
+    new_tweets = sum(len(split_thread(p)) for p in posts)
+
+    print("\n" + "=" * 80)
+    print("MICROBENCHMARK")
+    print("=" * 80)
+    for name, fn in (("legacy", legacy_split), ("weighted", split_thread)):
+        seconds = min(timeit.repeat(lambda: [fn(p) for p in posts], number=1, repeat=5))
+        print(f"{name:>9}: {seconds / len(posts) * 1e6:8.1f} µs/post")
+    print(f"\nTweets (API calls): legacy {legacy_tweets}, weighted {new_tweets}")
+    print(f"Legacy tweets X would reject (over 280 weighted): {legacy_over}")
+    print("=" * 80)
+    sys.exit(1 if failures else 0)
@@ -6,6 +6,14 @@ from colorama import init, Fore, Style
 from scripts.src.config.loader import load_config
 from scripts.src.utils.logger import setup_logger, setup_file_logger, log_info, log_success, log_warning, log_error
 from scripts.src.utils.storage import save_results
+from scripts.src.utils.concurrency import get_llm_limiter
+from scripts.src.utils.single_flight import summary_flight, normalize_url
+from scripts.src.utils.post_validators import make_post_guardrail
+from scripts.src.utils.image_processor import get_image_processor
+from scripts.src.utils.media_uploader import get_media_uploader
+from scripts.src.utils.stage_cache import get_stage_cache
+from scripts.src.utils.drafts import SETTLED, draft_payload, draft_source, get_draft_store
+from scripts.src.utils.dedup_index import dedup_action, describe, get_dedup_index
 from scripts.src.tools.web_scraper import WebScraperTool
 from scripts.src.tools.telegram_poster import TelegramPosterTool
 from scripts.src.agents.researcher import create_researcher
@@ -21,6 +29,156 @@ from scripts.src.utils.template_loader import template_loader
 import re
 
 
+def parse_json_object(raw: str) -> dict:
+    """Pull the first JSON object out of an LLM answer ({} if there is none)"""
+    import json
+    
+    start, end = raw.find("{"), raw.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        parsed = json.loads(raw[start:end + 1])
+    except ValueError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _task_text(task) -> str:
+    return task.output.raw.strip() if task is not None and task.output and task.output.raw else ""
+
+
+def collect_drafts(writer_tasks: dict, post_args: dict, hashtags: dict = None) -> dict:
+    """
+    Writer outputs of a crew run as drafts to publish later
+
+    Args:
+        writer_tasks: {platform: writer Task}
+        post_args: {platform: extra posting tool arguments}
+        hashtags: {platform: hashtag Task or an already generated string}
+
+    Returns {platform: {"text": ..., "hashtags": ..., **post_args[platform]}};
+    platforms whose writer produced nothing are left out.
+    """
+    drafts = {}
+    for platform, task in writer_tasks.items():
+        text = _task_text(task)
+        if text:
+            tags = (hashtags or {}).get(platform)
+            drafts[platform] = {
+                "text": text,
+                "hashtags": tags if isinstance(tags, str) else _task_text(tags) or None,
+                **post_args.get(platform, {})
+            }
+    return drafts
+
+
+def collect_post_status(post_tasks: dict) -> dict:
+    """
+    Per-platform outcome of the crew's posting tasks
+
+    The posting agents hand back the tool's message; a ❌ message (or an
+    agent that never called the tool) is a failure of that platform only.
+    Returns {platform: {"status": "published" | "skipped" | "failed", "result": message}}.
+    """
+    from scripts.src.utils.publish_scheduler import post_status
+    
+    return {
+        platform: {"status": post_status(_task_text(task)), "result": _task_text(task)}
+        for platform, task in post_tasks.items()
+    }
+
+
+def publish_stored_drafts(drafts: dict) -> dict:
+    """Send stored drafts through the publish-only path (no LLM); same shape as collect_post_status"""
+    from scripts.src.utils.publish_scheduler import publish_now
+    
+    outcomes = {}
+    for platform, draft in drafts.items():
+        outcome = publish_now(draft["id"])
+        if outcome is None:
+            outcomes[platform] = {"status": "skipped", "result": f"⚠️ Draft #{draft['id']} is already being published"}
+        else:
+            outcomes[platform] = {"status": outcome["status"], "result": outcome["result"]}
+    return outcomes
+
+
+def summarize_post_status(platform_status: dict) -> tuple:
+    """
+    (posted_to, failed, status) for a run
+
+    status is "success" when no platform failed, "partial" when some were
+    posted and some failed, and "failed" when nothing was posted.
+    """
+    posted_to = [platform for platform, outcome in platform_status.items() if outcome["status"] == "published"]
+    failed = [platform for platform, outcome in platform_status.items() if outcome["status"] == "failed"]
+    if not failed:
+        return posted_to, failed, "success"
+    return posted_to, failed, "partial" if posted_to else "failed"
+
+
+def record_posts(drafts: dict, platform_status: dict, url: str = None):
+    """Add what the crew's posting agents published to the duplicate index"""
+    from scripts.src.utils.publish_scheduler import record_published
+    
+    for platform, outcome in platform_status.items():
+        if outcome["status"] == "published" and platform in drafts:
+            draft = drafts[platform]
+            post_args = {key: value for key, value in draft.items() if key not in ("text", "hashtags")}
+            record_published({"platform": platform, "text": draft["text"], "source": url, "post_args": post_args})
+
+
+def cache_stages(logger, key: str, summary: str = None, drafts: dict = None):
+    """Keep a run's summary and hashtags for a retry; never fails the run"""
+    try:
+        cache = get_stage_cache()
+        cache.put(key, summary=summary)
+        cache.merge(key, "hashtags", {platform: draft["hashtags"] for platform, draft in (drafts or {}).items()
+                                      if draft.get("hashtags")})
+    except Exception as e:
+        log_warning(logger, f"Could not cache stage outputs: {e}")
+
+
+def previous_drafts(source: str, enabled: dict) -> tuple:
+    """
+    (drafts, settled) for a retry: the newest stored draft per enabled platform
+
+    Drafts that are out already, going out or were skipped as duplicates
+    are settled: neither rewritten nor sent again, reported with that
+    outcome. The others (pending, scheduled, failed) are sent again as
+    they are, or handed back as drafts.
+    """
+    drafts, settled = {}, {}
+    for platform, draft in get_draft_store().latest_by_source(source).items():
+        if not enabled.get(platform):
+            continue
+        if draft["status"] in SETTLED:
+            status = "skipped" if draft["status"] == "publishing" else draft["status"]
+            settled[platform] = {"status": status,
+                                 "result": f"Not sent again: draft #{draft['id']} is {draft['status']}"}
+        else:
+            drafts[platform] = draft
+    return drafts, settled
+
+
+def store_drafts(drafts: dict, source: str, request_id: int = None, platform_status: dict = None) -> dict:
+    """
+    Keep a run's drafts in the draft store; returns {platform: draft_id}
+
+    With platform_status (the crew posted them) each draft gets its
+    outcome, so a retry or the publish-only path knows what went out.
+    """
+    store = get_draft_store()
+    draft_ids = {}
+    for platform, draft in drafts.items():
+        post_args = {key: value for key, value in draft.items() if key not in ("text", "hashtags")}
+        draft_ids[platform] = store.add(platform, draft["text"], post_args, source=source,
+                                        request_id=request_id, hashtags=draft.get("hashtags"))
+        outcome = (platform_status or {}).get(platform)
+        if outcome:
+            store.mark(draft_ids[platform], outcome["status"], outcome["result"])
+    return draft_ids
+
+
 class SocialSummarizerAPI(ls.LitAPI):
         
     def setup(self, device):
@@ -49,21 +207,166 @@ class SocialSummarizerAPI(ls.LitAPI):
         if isinstance(request, dict):
             url = request.get("url")
             platforms = request.get("platforms", {})
-            return {"url": url, "platforms": platforms}
+            return {"url": url, "platforms": platforms, "retry": bool(request.get("retry", False))}
         else:
             # Legacy support - just URL string
-            return {"url": request, "platforms": {}}
+            return {"url": request, "platforms": {}, "retry": False}
+            
+    def batch(self, inputs):
+        """Keep decoded requests as a plain list; predict() groups them itself"""
+        return list(inputs)
+
+    def unbatch(self, output):
+        return list(output)
+
+    def predict_batch(self, inputs: list) -> list:
+        """
+        Process several decoded requests as one shared pipeline run
+        
+        Requests for the same URL share a single summary, summaries for
+        different URLs run concurrently and all hashtags come from one
+        batched prompt. Only the per-platform writing/posting runs per item.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        items = [item if isinstance(item, dict) else {"url": item, "platforms": {}} for item in inputs]
+        unique_urls = list(dict.fromkeys(item["url"] for item in items if item.get("url")))
+        log_info(self.logger, f"Batch of {len(items)} request(s), {len(unique_urls)} unique URL(s)")
+        
+        def safe_summarize(url):
+            try:
+                return url, self.summarize_shared(url)
+            except Exception as e:
+                log_error(self.logger, f"Shared summary failed for {url}: {e}")
+                return url, None
+        
+        workers = max(1, min(len(items), get_llm_limiter().max_limit))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            summaries = {url: summary for url, summary in pool.map(safe_summarize, unique_urls) if summary}
             
+            try:
+                platforms = ["telegram", "twitter", "linkedin"]
+                hashtags = self.generate_hashtags_batch(summaries, platforms)
+            except Exception as e:
+                log_warning(self.logger, f"Batched hashtags failed, falling back per item: {e}")
+                hashtags = {}
+            
+            prepared = [
+                {**item, "summary": summaries.get(item.get("url")), "hashtags": hashtags.get(item.get("url"), {})}
+                for item in items
+            ]
+            return list(pool.map(self.predict, prepared))
+
+    def summarize_shared(self, url: str) -> str:
+        """
+        Summarize a URL, joining an identical in-flight run if there is one
+        
+        Concurrent callers for the same normalized URL wait for the first
+        caller's summary instead of scraping and summarizing again.
+        """
+        summary, shared = summary_flight.do(normalize_url(url), lambda: self.summarize(url))
+        if shared:
+            log_success(self.logger, f"Reused in-flight summary for {url}")
+        return summary
+
+    def summarize(self, url: str) -> str:
+        """Run only the research/summarize stage for a URL"""
+        from scripts.src.tools.web_scraper import WebScraperTool
+        from scripts.src.agents.researcher import create_researcher
+        from scripts.src.tasks.summarize import create_summarize_task
+        
+        researcher = create_researcher(self.llm, [WebScraperTool()])
+        summarize_task = create_summarize_task(researcher, url)
+        crew = Crew(agents=[researcher], tasks=[summarize_task], verbose=False)
+        
+        with get_llm_limiter().slot(units=1):
+            result = crew.kickoff(inputs={"url": url})
+        return str(result)
+
+    def generate_hashtags_batch(self, summaries: dict, platforms: list) -> dict:
+        """
+        Generate hashtags for many summaries with one structured prompt
+        
+        Args:
+            summaries: {item_id: summary text}
+            platforms: Platforms to generate hashtag sets for
+        
+        Returns:
+            {item_id: {platform: "#Tag1 #Tag2"}} - items the model skipped
+            or mangled are left out so callers can fall back per item
+        """
+        from scripts.src.agents.hashtag_generator import create_hashtag_generator
+        from scripts.src.tasks.hashtag import PLATFORM_GUIDELINES
+        
+        if not summaries or not platforms:
+            return {}
+        
+        documents = "\n\n".join(
+            f"--- ARTICLE ID: {item_id} ---\n{summary}" for item_id, summary in summaries.items()
+        )
+        requirements = "\n".join(
+            f"- {platform}: {PLATFORM_GUIDELINES.get(platform, PLATFORM_GUIDELINES['all'])}"
+            for platform in platforms
+        )
+        description = template_loader.load(
+            'hashtag_batch',
+            documents=documents,
+            platforms=", ".join(platforms),
+            requirements=requirements
+        )
+        
+        hashtag_agent = create_hashtag_generator(self.llm)
+        task = Task(
+            description=description,
+            agent=hashtag_agent,
+            expected_output="A JSON object mapping article IDs to per-platform hashtag strings"
+        )
+        crew = Crew(agents=[hashtag_agent], tasks=[task], verbose=False)
+        
+        with get_llm_limiter().slot(units=1):
+            raw = str(crew.kickoff())
+        
+        parsed = parse_json_object(raw)
+        hashtags = {}
+        for item_id in summaries:
+            item_tags = parsed.get(str(item_id))
+            if isinstance(item_tags, dict):
+                hashtags[item_id] = {
+                    platform: str(tags) for platform, tags in item_tags.items()
+                    if platform in platforms and tags
+                }
+        
+        log_info(self.logger, f"Batched hashtags for {len(hashtags)}/{len(summaries)} items")
+        return hashtags
+
     def predict(self, input_data):
         """Process URL, generate content with hashtags, and post to platforms"""
         
+        # LitServe hands over a list when max_batch_size > 1
+        if isinstance(input_data, list):
+            return self.predict_batch(input_data)
+        
         # Handle both dict and string input
         if isinstance(input_data, dict):
             url = input_data.get("url")
             user_platforms = input_data.get("platforms", {})
+            # Stage outputs computed ahead of time (batch mode)
+            precomputed_summary = input_data.get("summary")
+            precomputed_hashtags = input_data.get("hashtags") or {}
+            # publish=False stops after the writers and returns the drafts
+            publish = input_data.get("publish", True)
+            # retry=True reuses the summary, hashtags and drafts of the last run
+            retry = input_data.get("retry", False)
+            # Queue item the drafts are stored for (queued requests)
+            request_id = input_data.get("request_id")
         else:
             url = input_data
             user_platforms = {}
+            precomputed_summary = None
+            precomputed_hashtags = {}
+            publish = True
+            retry = False
+            request_id = None
         
         log_warning(self.logger, f"Processing URL: {url}")
         log_info(self.logger, f"Platform selection: {user_platforms}")
@@ -92,13 +395,48 @@ class SocialSummarizerAPI(ls.LitAPI):
             print(f"LinkedIn: {Fore.GREEN if linkedin_enabled else Fore.RED}{'✓ Enabled' if linkedin_enabled else '✗ Disabled'}{Style.RESET_ALL}")
             print("==================\n")
 
-            # Initialize tools
-            from scripts.src.tools.web_scraper import WebScraperTool
-            web_scraper = WebScraperTool()
+            # A retry only reruns the stages whose output is kept: the
+            # summary and hashtags come from the stage cache, platforms with
+            # a stored draft just send it again, platforms already posted
+            # are left alone
+            cache_key = normalize_url(url)
+            source = draft_source(url=url)
+            cached = get_stage_cache().get(cache_key) if retry else {}
+            enabled = {"telegram": telegram_enabled, "twitter": twitter_enabled, "linkedin": linkedin_enabled}
+            cached_drafts, settled = previous_drafts(source, enabled) if retry else ({}, {})
+            if settled:
+                log_info(self.logger, f"Retry: {', '.join(settled)} already handled by an earlier run")
+            if cached or cached_drafts:
+                precomputed_summary = precomputed_summary or cached.get("summary")
+                precomputed_hashtags = {**cached.get("hashtags", {}), **precomputed_hashtags}
+                log_info(self.logger, f"Retry: reusing {', '.join(cached) or 'no stage output'} "
+                                      f"(drafts for {', '.join(cached_drafts) or 'no platform'})")
             
-            # Initialize researcher (always needed)
-            from scripts.src.agents.researcher import create_researcher
-            researcher = create_researcher(self.llm, [web_scraper])
+            # Platforms this link went out to recently are not written or
+            # posted again (queued requests were checked when queued)
+            duplicates = {}
+            if publish and dedup_action() == "skip":
+                try:
+                    matches = get_dedup_index().find(url=url, platforms=[p for p, on in enabled.items() if on])
+                except Exception as e:
+                    log_warning(self.logger, f"Duplicate check failed: {e}")
+                    matches = []
+                for match in matches:
+                    duplicates.setdefault(match["platform"], {"status": "skipped",
+                                                              "result": f"⚠️ Skipped: {describe(match)}"})
+                if duplicates:
+                    log_warning(self.logger, f"Already posted to {', '.join(duplicates)}, skipping those")
+            done = set(cached_drafts) | set(duplicates) | set(settled)
+            telegram_enabled = telegram_enabled and "telegram" not in done
+            twitter_enabled = twitter_enabled and "twitter" not in done
+            linkedin_enabled = linkedin_enabled and "linkedin" not in done
+
+            # Summarize stage runs on its own so identical in-flight URLs
+            # (e.g. "All platforms" then a single platform) share one run
+            if precomputed_summary:
+                summary = precomputed_summary
+            else:
+                summary = self.summarize_shared(url)
             
             # Initialize hashtag agent (always needed)
             from scripts.src.agents.hashtag_generator import create_hashtag_generator
@@ -108,15 +446,28 @@ class SocialSummarizerAPI(ls.LitAPI):
             social_links = self.config.get('social', {})
             
             # Create tasks
-            from scripts.src.tasks.summarize import create_summarize_task
             from scripts.src.tasks.hashtag import create_hashtag_task
             from crewai import Task
             
-            summarize_task = create_summarize_task(researcher, url)
+            all_agents = [hashtag_agent]
+            all_tasks = []
+            writer_tasks = {}
+            post_tasks = {}
+            post_args = {}
+            hashtag_sources = {}
+            
+            def hashtag_tasks_for(platform):
+                """Hashtag task for a platform, unless the batch already produced them"""
+                if precomputed_hashtags.get(platform):
+                    return []
+                return [create_hashtag_task(hashtag_agent, [], platform=platform, content=summary)]
             
-            all_agents = [researcher, hashtag_agent]
-            all_tasks = [summarize_task]
-            posted_to = []
+            def stage_notes(platform):
+                """Earlier stage outputs, inlined into the writer description"""
+                notes = f"\n\n=== ARTICLE SUMMARY ===\n{summary}\n"
+                if precomputed_hashtags.get(platform):
+                    notes += f"\n=== HASHTAGS TO USE ===\n{precomputed_hashtags[platform]}\n"
+                return notes
             
             # ===== TELEGRAM =====
             if telegram_enabled:
@@ -129,15 +480,14 @@ class SocialSummarizerAPI(ls.LitAPI):
                 telegram_writer = create_writer(self.llm)
                 telegram_agent = create_telegram_poster(self.llm, [telegram_poster])
                 
-                telegram_hashtag_task = create_hashtag_task(
-                    hashtag_agent, [summarize_task], platform="telegram"
-                )
+                telegram_hashtag_tasks = hashtag_tasks_for("telegram")
                 
                 telegram_social_task = create_social_task(
                     telegram_writer, 
-                    [summarize_task, telegram_hashtag_task],
+                    telegram_hashtag_tasks,
                     source_url=url,
-                    social_links=social_links
+                    social_links=social_links,
+                    extra_context=stage_notes("telegram")
                 )
                 
                 telegram_post_task = create_telegram_task(
@@ -147,13 +497,15 @@ class SocialSummarizerAPI(ls.LitAPI):
                     self.config['telegram']['channel_id']
                 )
                 
-                all_agents.extend([telegram_writer, telegram_agent])
-                all_tasks.extend([
-                    telegram_hashtag_task,
-                    telegram_social_task,
-                    telegram_post_task
-                ])
-                posted_to.append("telegram")
+                all_agents.append(telegram_writer)
+                all_tasks.extend(telegram_hashtag_tasks)
+                all_tasks.append(telegram_social_task)
+                writer_tasks["telegram"] = telegram_social_task
+                hashtag_sources["telegram"] = precomputed_hashtags.get("telegram") or next(iter(telegram_hashtag_tasks), None)
+                if publish:
+                    all_agents.append(telegram_agent)
+                    all_tasks.append(telegram_post_task)
+                    post_tasks["telegram"] = telegram_post_task
             
             # ===== TWITTER =====
             if twitter_enabled:
@@ -166,16 +518,17 @@ class SocialSummarizerAPI(ls.LitAPI):
                 twitter_writer = create_writer(self.llm)
                 twitter_agent = create_twitter_poster(self.llm, [twitter_poster])
                 
-                twitter_hashtag_task = create_hashtag_task(
-                    hashtag_agent, [summarize_task], platform="twitter"
-                )
+                twitter_hashtag_tasks = hashtag_tasks_for("twitter")
                 
-                twitter_description = template_loader.load('twitter_writer', source_url=url)
+                twitter_description = template_loader.load('twitter_writer', source_url=url) + stage_notes("twitter")
                 twitter_social_task = Task(
                     description=twitter_description,
                     agent=twitter_writer,
                     expected_output="A concise Twitter post",
-                    context=[summarize_task, twitter_hashtag_task]
+                    context=twitter_hashtag_tasks,
+                    # Long posts become threads in the tool, so only formatting is checked
+                    guardrail=make_post_guardrail("twitter", allow_thread=True),
+                    guardrail_max_retries=1
                 )
                 
                 twitter_post_task = create_twitter_task(
@@ -187,13 +540,15 @@ class SocialSummarizerAPI(ls.LitAPI):
                     self.config['twitter']['access_token_secret']
                 )
                 
-                all_agents.extend([twitter_writer, twitter_agent])
-                all_tasks.extend([
-                    twitter_hashtag_task,
-                    twitter_social_task,
-                    twitter_post_task
-                ])
-                posted_to.append("twitter")
+                all_agents.append(twitter_writer)
+                all_tasks.extend(twitter_hashtag_tasks)
+                all_tasks.append(twitter_social_task)
+                writer_tasks["twitter"] = twitter_social_task
+                hashtag_sources["twitter"] = precomputed_hashtags.get("twitter") or next(iter(twitter_hashtag_tasks), None)
+                if publish:
+                    all_agents.append(twitter_agent)
+                    all_tasks.append(twitter_post_task)
+                    post_tasks["twitter"] = twitter_post_task
             
             # ===== LINKEDIN ===== (FIXED: Remove parentheses from titles)
             if linkedin_enabled:
@@ -206,16 +561,16 @@ class SocialSummarizerAPI(ls.LitAPI):
                 linkedin_writer = create_writer(self.llm)
                 linkedin_agent = create_linkedin_poster(self.llm, [linkedin_poster])
                 
-                linkedin_hashtag_task = create_hashtag_task(
-                    hashtag_agent, [summarize_task], platform="linkedin"
-                )
+                linkedin_hashtag_tasks = hashtag_tasks_for("linkedin")
                 
-                linkedin_description = template_loader.load('linkedin_writer', source_url=url)
+                linkedin_description = template_loader.load('linkedin_writer', source_url=url) + stage_notes("linkedin")
                 linkedin_social_task = Task(
                     description=linkedin_description,
                     agent=linkedin_writer,
                     expected_output="A professional LinkedIn post",
-                    context=[summarize_task, linkedin_hashtag_task]
+                    context=linkedin_hashtag_tasks,
+                    guardrail=make_post_guardrail("linkedin"),
+                    guardrail_max_retries=1
                 )
                 
                 # Extract article info from URL and clean it
@@ -241,6 +596,11 @@ class SocialSummarizerAPI(ls.LitAPI):
                 article_description = f"Interesting article from {parsed_url.netloc}"
                 
                 log_info(self.logger, f"LinkedIn article title: {article_title}")
+                post_args["linkedin"] = {
+                    "source_url": url,
+                    "article_title": article_title,
+                    "article_description": article_description
+                }
                 
                 linkedin_post_task = create_linkedin_task(
                     linkedin_agent,
@@ -252,48 +612,86 @@ class SocialSummarizerAPI(ls.LitAPI):
                     article_description=article_description
                 )
                 
-                all_agents.extend([linkedin_writer, linkedin_agent])
-                all_tasks.extend([
-                    linkedin_hashtag_task,
-                    linkedin_social_task,
-                    linkedin_post_task
-                ])
-                posted_to.append("linkedin")
-            
-            # Create crew with enabled platforms only
-            crew = Crew(
-                agents=all_agents,
-                tasks=all_tasks,
-                verbose=True,
-            )
+                all_agents.append(linkedin_writer)
+                all_tasks.extend(linkedin_hashtag_tasks)
+                all_tasks.append(linkedin_social_task)
+                writer_tasks["linkedin"] = linkedin_social_task
+                hashtag_sources["linkedin"] = precomputed_hashtags.get("linkedin") or next(iter(linkedin_hashtag_tasks), None)
+                if publish:
+                    all_agents.append(linkedin_agent)
+                    all_tasks.append(linkedin_post_task)
+                    post_tasks["linkedin"] = linkedin_post_task
             
-            log_info(self.logger, f"Starting crew execution for: {', '.join(posted_to)}...")
+            if all_tasks:
+                # Create crew with enabled platforms only
+                crew = Crew(
+                    agents=all_agents,
+                    tasks=all_tasks,
+                    verbose=True,
+                )
+                
+                log_info(self.logger, f"Starting crew execution for: {', '.join(writer_tasks)}...")
+                
+                with get_llm_limiter().slot(units=len(all_tasks)):
+                    result = crew.kickoff(inputs={"url": url})
+            else:
+                # No platform selected (or all drafts cached) - the summary is the result
+                result = summary
             
-            result = crew.kickoff(inputs={"url": url})
+            drafts = collect_drafts(writer_tasks, post_args, hashtag_sources)
+            cache_stages(self.logger, cache_key, summary, drafts)
+            platform_status = collect_post_status(post_tasks)
+            record_posts(drafts, platform_status, url)
+            draft_ids = store_drafts(drafts, source, request_id, platform_status if publish else None)
+            draft_ids.update({platform: draft["id"] for platform, draft in cached_drafts.items()})
+            platform_status.update(duplicates)
+            if publish and cached_drafts:
+                platform_status.update(publish_stored_drafts(cached_drafts))
+            if publish:
+                platform_status.update(settled)
+            posted_to, failed, status = summarize_post_status(platform_status)
             
             output = {
                 "url": url,
                 "timestamp": datetime.datetime.now().isoformat(),
+                "summary": summary,
                 "result": str(result),
-                "status": "success",
-                "posted_to": posted_to
+                "status": status,
+                "posted_to": posted_to,
+                "draft_ids": draft_ids
             }
+            if publish:
+                output["platform_status"] = platform_status
+                output["failed"] = failed
+            else:
+                output["drafts"] = {**{platform: draft_payload(draft) for platform, draft in cached_drafts.items()},
+                                    **drafts}
             
-            saved_path = save_results(url, output)
-            output["saved_to"] = str(saved_path)
+            output["result_id"] = save_results(url, output)
             
-            log_success(self.logger, f"Successfully posted to: {', '.join(posted_to)}!")
+            if not publish:
+                log_success(self.logger, f"Drafts ready for: {', '.join(output['drafts'])}")
+            elif failed:
+                log_warning(self.logger, f"Posted to: {', '.join(posted_to) or 'none'}; failed: {', '.join(failed)} "
+                                         f"(send retry: true with those platforms to post them again)")
+            else:
+                log_success(self.logger, f"Successfully posted to: {', '.join(posted_to)}!")
             
             return output
             
         except Exception as e:
             log_error(self.logger, f"Error processing URL: {str(e)}")
-            return {
+            output = {
                 "url": url,
                 "timestamp": datetime.datetime.now().isoformat(),
                 "error": str(e),
                 "status": "failed"
             }
+            try:
+                output["result_id"] = save_results(url, output)
+            except Exception as store_error:
+                log_warning(self.logger, f"Could not record failed result: {store_error}")
+            return output
     
     def encode_response(self, output):
         """Encode response for API"""
@@ -332,21 +730,43 @@ class EnhancementAPI(ls.LitAPI):
             text = request.get("text")
             platforms = request.get("platforms", {})
             image_path = request.get("image_path")
-            return {"text": text, "platforms": platforms, "image_path": image_path}
+            return {"text": text, "platforms": platforms, "image_path": image_path,
+                    "retry": bool(request.get("retry", False))}
         else:
-            return {"text": request, "platforms": {}, "image_path": None}
+            return {"text": request, "platforms": {}, "image_path": None, "retry": False}
+
+    def batch(self, inputs):
+        return list(inputs)
+
+    def unbatch(self, output):
+        return list(output)
 
     def predict(self, input_data):
         """Enhance user's text with AI and post to selected platforms"""
         
+        # LitServe hands over a list when max_batch_size > 1; enhancements
+        # share nothing, so the batch just runs its crews side by side
+        if isinstance(input_data, list):
+            from concurrent.futures import ThreadPoolExecutor
+            
+            workers = max(1, min(len(input_data), get_llm_limiter().max_limit))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(self.predict, input_data))
+        
         if isinstance(input_data, dict):
             text = input_data.get("text")
             user_platforms = input_data.get("platforms", {})
             image_path = input_data.get("image_path")
+            publish = input_data.get("publish", True)
+            retry = input_data.get("retry", False)
+            request_id = input_data.get("request_id")
         else:
             text = input_data
             user_platforms = {}
             image_path = None
+            publish = True
+            retry = False
+            request_id = None
         
         log_info(self.logger, "Processing text enhancement request")
         log_info(self.logger, f"Selected platforms: {user_platforms}")
@@ -374,6 +794,34 @@ class EnhancementAPI(ls.LitAPI):
             print(f"LinkedIn: {Fore.GREEN if linkedin_enabled else Fore.RED}{'✓ Enabled' if linkedin_enabled else '✗ Disabled'}{Style.RESET_ALL}")
             print("==================\n")
 
+            # A retry sends the drafts stored for this text again, leaves
+            # platforms already posted alone and only writes the platforms
+            # that have neither
+            source = draft_source(text=text)
+            enabled = {"telegram": telegram_enabled, "twitter": twitter_enabled, "linkedin": linkedin_enabled}
+            cached_drafts, settled = previous_drafts(source, enabled) if retry else ({}, {})
+            if cached_drafts:
+                log_info(self.logger, f"Retry: reusing drafts for {', '.join(cached_drafts)}")
+            if settled:
+                log_info(self.logger, f"Retry: {', '.join(settled)} already handled by an earlier run")
+            done = set(cached_drafts) | set(settled)
+            telegram_enabled = telegram_enabled and "telegram" not in done
+            twitter_enabled = twitter_enabled and "twitter" not in done
+            linkedin_enabled = linkedin_enabled and "linkedin" not in done
+
+            # Image stage: one resized, metadata-free copy per platform spec,
+            # uploaded in the background while the crew writes the posts
+            images = {}
+            if image_path:
+                enabled = [name for name, on in (("telegram", telegram_enabled), ("twitter", twitter_enabled),
+                                                 ("linkedin", linkedin_enabled)) if on]
+                try:
+                    images = get_image_processor().prepare_all(image_path, enabled)
+                    get_media_uploader().start_all(image_path, enabled, self.config)
+                except (ValueError, OSError) as e:
+                    log_warning(self.logger, f"Ignoring image {image_path}: {e}")
+            post_image = image_path if images else None
+            
             # Find URLs and analyze
             url_pattern = r'https?://[^\s]+'
             urls = re.findall(url_pattern, text)
@@ -396,7 +844,9 @@ class EnhancementAPI(ls.LitAPI):
             
             all_agents = [hashtag_agent]
             all_tasks = []
-            posted_to = []
+            writer_tasks = {}
+            post_tasks = {}
+            hashtag_sources = {}
             
             # Create a summary task from the user's text
             summary_agent = Agent(
@@ -445,23 +895,27 @@ class EnhancementAPI(ls.LitAPI):
                     """,
                     agent=telegram_writer,
                     expected_output="Enhanced Telegram post",
-                    context=[summary_task, telegram_hashtag_task]
+                    context=[summary_task, telegram_hashtag_task],
+                    guardrail=make_post_guardrail("telegram"),
+                    guardrail_max_retries=1
                 )
                 
                 telegram_post_task = create_telegram_task(
                     telegram_agent,
                     [telegram_enhance_task],
                     self.config['telegram']['bot_token'],
-                    self.config['telegram']['channel_id']
+                    self.config['telegram']['channel_id'],
+                    image_path=post_image
                 )
                 
-                all_agents.extend([telegram_writer, telegram_agent])
-                all_tasks.extend([
-                    telegram_hashtag_task,
-                    telegram_enhance_task,
-                    telegram_post_task
-                ])
-                posted_to.append("telegram")
+                all_agents.append(telegram_writer)
+                all_tasks.extend([telegram_hashtag_task, telegram_enhance_task])
+                writer_tasks["telegram"] = telegram_enhance_task
+                hashtag_sources["telegram"] = telegram_hashtag_task
+                if publish:
+                    all_agents.append(telegram_agent)
+                    all_tasks.append(telegram_post_task)
+                    post_tasks["telegram"] = telegram_post_task
             
             # ===== TWITTER =====
             if twitter_enabled:
@@ -491,7 +945,9 @@ class EnhancementAPI(ls.LitAPI):
                     """,
                     agent=twitter_writer,
                     expected_output="Concise Twitter post under 280 characters",
-                    context=[summary_task, twitter_hashtag_task]
+                    context=[summary_task, twitter_hashtag_task],
+                    guardrail=make_post_guardrail("twitter"),
+                    guardrail_max_retries=1
                 )
                 
                 twitter_post_task = create_twitter_task(
@@ -500,16 +956,18 @@ class EnhancementAPI(ls.LitAPI):
                     self.config['twitter']['api_key'],
                     self.config['twitter']['api_secret'],
                     self.config['twitter']['access_token'],
-                    self.config['twitter']['access_token_secret']
+                    self.config['twitter']['access_token_secret'],
+                    image_path=post_image
                 )
                 
-                all_agents.extend([twitter_writer, twitter_agent])
-                all_tasks.extend([
-                    twitter_hashtag_task,
-                    twitter_enhance_task,
-                    twitter_post_task
-                ])
-                posted_to.append("twitter")
+                all_agents.append(twitter_writer)
+                all_tasks.extend([twitter_hashtag_task, twitter_enhance_task])
+                writer_tasks["twitter"] = twitter_enhance_task
+                hashtag_sources["twitter"] = twitter_hashtag_task
+                if publish:
+                    all_agents.append(twitter_agent)
+                    all_tasks.append(twitter_post_task)
+                    post_tasks["twitter"] = twitter_post_task
             
             # ===== LINKEDIN =====
             if linkedin_enabled:
@@ -557,7 +1015,9 @@ class EnhancementAPI(ls.LitAPI):
                     """,
                     agent=linkedin_writer,
                     expected_output="Professional LinkedIn post with proper formatting",
-                    context=[summary_task, linkedin_hashtag_task]
+                    context=[summary_task, linkedin_hashtag_task],
+                    guardrail=make_post_guardrail("linkedin"),
+                    guardrail_max_retries=1
                 )
                 
                 # Extract URL info if present
@@ -573,6 +1033,11 @@ class EnhancementAPI(ls.LitAPI):
                     article_title = re.sub(r'\(([^)]+)\)', r'[\1]', article_title)
                 
                 article_description = text[:200] if len(text) > 200 else text
+                linkedin_args = {
+                    "source_url": source_url,
+                    "article_title": article_title,
+                    "article_description": article_description
+                }
                 
                 linkedin_post_task = create_linkedin_task(
                     linkedin_agent,
@@ -581,36 +1046,70 @@ class EnhancementAPI(ls.LitAPI):
                     self.config['linkedin']['author_urn'],
                     source_url=source_url,
                     article_title=article_title,
-                    article_description=article_description
+                    article_description=article_description,
+                    image_path=post_image
                 )
                 
-                all_agents.extend([linkedin_writer, linkedin_agent])
-                all_tasks.extend([
-                    linkedin_hashtag_task,
-                    linkedin_enhance_task,
-                    linkedin_post_task
-                ])
-                posted_to.append("linkedin")
-            
-            # Run the crew
-            crew = Crew(
-                agents=all_agents,
-                tasks=all_tasks,
-                verbose=True
-            )
-            
-            log_info(self.logger, f"Starting crew execution for: {', '.join(posted_to)}...")
+                all_agents.append(linkedin_writer)
+                all_tasks.extend([linkedin_hashtag_task, linkedin_enhance_task])
+                writer_tasks["linkedin"] = linkedin_enhance_task
+                hashtag_sources["linkedin"] = linkedin_hashtag_task
+                if publish:
+                    all_agents.append(linkedin_agent)
+                    all_tasks.append(linkedin_post_task)
+                    post_tasks["linkedin"] = linkedin_post_task
             
-            result = crew.kickoff()
+            if writer_tasks:
+                # Run the crew
+                crew = Crew(
+                    agents=all_agents,
+                    tasks=all_tasks,
+                    verbose=True
+                )
+                
+                log_info(self.logger, f"Starting crew execution for: {', '.join(writer_tasks)}...")
+                
+                with get_llm_limiter().slot(units=len(all_tasks)):
+                    result = crew.kickoff()
+            else:
+                # Every selected platform has a kept draft - nothing to write
+                result = next(iter(cached_drafts.values()), {}).get("text", text)
             
-            log_success(self.logger, f"Successfully posted to: {', '.join(posted_to)}!")
+            post_args = {platform: {"image_path": post_image} for platform in writer_tasks}
+            if "linkedin" in writer_tasks:
+                post_args["linkedin"].update(linkedin_args)
+            drafts = collect_drafts(writer_tasks, post_args, hashtag_sources)
+            platform_status = collect_post_status(post_tasks)
+            record_posts(drafts, platform_status, urls[0] if urls else None)
+            draft_ids = store_drafts(drafts, source, request_id, platform_status if publish else None)
+            draft_ids.update({platform: draft["id"] for platform, draft in cached_drafts.items()})
+            if publish and cached_drafts:
+                platform_status.update(publish_stored_drafts(cached_drafts))
+            if publish:
+                platform_status.update(settled)
+            posted_to, failed, status = summarize_post_status(platform_status)
             
-            return {
+            output = {
                 "enhanced_text": str(result),
                 "posted_to": posted_to,
-                "status": "success",
+                "status": status,
+                "draft_ids": draft_ids,
                 "timestamp": datetime.datetime.now().isoformat()
             }
+            if not publish:
+                output["drafts"] = {**{platform: draft_payload(draft) for platform, draft in cached_drafts.items()},
+                                    **drafts}
+                log_success(self.logger, f"Drafts ready for: {', '.join(output['drafts'])}")
+            else:
+                output["platform_status"] = platform_status
+                output["failed"] = failed
+                if failed:
+                    log_warning(self.logger, f"Posted to: {', '.join(posted_to) or 'none'}; "
+                                             f"failed: {', '.join(failed)}")
+                else:
+                    log_success(self.logger, f"Successfully posted to: {', '.join(posted_to)}!")
+            
+            return output
             
         except Exception as e:
             log_error(self.logger, f"Error in enhancement: {str(e)}")
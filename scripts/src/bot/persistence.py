@@ -0,0 +1,180 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_data (
+    user_id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS user_data_updated ON user_data (updated_at);
+"""
+
+
+class SQLitePersistence(BasePersistence):
+    """
+    Per-user bot state (preferences, drafts) in SQLite
+
+    Only user_data is persisted. Recently active users sit in an LRU cache;
+    the application hands over changed user_data every update_interval
+    seconds and the changes are written back in one transaction at most
+    update_interval seconds after the first of them (earlier once
+    flush_threshold users are dirty, and at flush() on shutdown). Users outside the
+    cache are loaded from disk on their next update via refresh_user_data().
+    Values must be JSON-serializable.
+    """
+
+    def __init__(self, path: str, cache_size: int = 1000, update_interval: float = 10,
+                 flush_threshold: int = 100):
+        super().__init__(
+            store_data=PersistenceInput(user_data=True, chat_data=False, bot_data=False, callback_data=False),
+            update_interval=update_interval,
+        )
+        self.path = path
+        self.cache_size = cache_size
+        self.flush_threshold = flush_threshold
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._cache: "OrderedDict[int, Dict]" = OrderedDict()
+        self._dirty = set()
+        # Pending timed flush, started when the first user becomes dirty
+        self._flush_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, user_id: int, data: Dict):
+        """Put data at the front of the LRU; only clean entries are evicted"""
+        self._cache[user_id] = data
+        self._cache.move_to_end(user_id)
+        self._evict()
+
+    def _evict(self):
+        if len(self._cache) > self.cache_size:
+            for old_id in list(self._cache):
+                if len(self._cache) <= self.cache_size:
+                    break
+                if old_id not in self._dirty:
+                    del self._cache[old_id]
+
+    def _load(self, user_id: int) -> Dict:
+        with self._lock:
+            if user_id in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(user_id)
+                return dict(self._cache[user_id])
+            self.misses += 1
+            row = self._conn.execute("SELECT data FROM user_data WHERE user_id = ?", (user_id,)).fetchone()
+            data = json.loads(row[0]) if row else {}
+            self._remember(user_id, data)
+            return dict(data)
+
+    def _flush_sync(self):
+        with self._lock:
+            rows = [(user_id, json.dumps(self._cache[user_id], default=str), time.time())
+                    for user_id in self._dirty if user_id in self._cache]
+            self._dirty.clear()
+            self._evict()
+            if rows:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT INTO user_data (user_id, data, updated_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                        rows
+                    )
+        if rows:
+            logger.debug(f"Flushed state for {len(rows)} user(s)")
+
+    async def get_user_data(self) -> Dict[int, Dict]:
+        """The most recently active users, to warm the cache at startup"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id, data FROM user_data ORDER BY updated_at DESC LIMIT ?", (self.cache_size,)
+            ).fetchall()
+            for user_id, data in reversed(rows):
+                self._remember(user_id, json.loads(data))
+            return {user_id: dict(data) for user_id, data in self._cache.items()}
+
+    async def refresh_user_data(self, user_id: int, user_data: Dict) -> None:
+        # Empty means the user was not preloaded (or was evicted): fill from disk
+        if not user_data:
+            user_data.update(await asyncio.to_thread(self._load, user_id))
+
+    async def update_user_data(self, user_id: int, data: Dict) -> None:
+        with self._lock:
+            self._dirty.add(user_id)
+            self._remember(user_id, json.loads(json.dumps(data, default=str)))
+            due = len(self._dirty) >= self.flush_threshold
+        if due:
+            await asyncio.to_thread(self._flush_sync)
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.update_interval)
+        await asyncio.to_thread(self._flush_sync)
+
+    async def drop_user_data(self, user_id: int) -> None:
+        with self._lock:
+            self._cache.pop(user_id, None)
+            self._dirty.discard(user_id)
+            with self._conn:
+                self._conn.execute("DELETE FROM user_data WHERE user_id = ?", (user_id,))
+
+    async def flush(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await asyncio.to_thread(self._flush_sync)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"cached": len(self._cache), "dirty": len(self._dirty), "hits": self.hits, "misses": self.misses}
+
+    # Chat, bot and callback data and conversations are not used by this bot
+    # (store_data turns them off); these satisfy the persistence interface.
+
+    async def get_chat_data(self) -> Dict:
+        return {}
+
+    async def get_bot_data(self) -> Dict:
+        return {}
+
+    async def get_callback_data(self) -> Optional[tuple]:
+        return None
+
+    async def get_conversations(self, name: str) -> Dict:
+        return {}
+
+    async def update_chat_data(self, chat_id: int, data: Dict) -> None:
+        pass
+
+    async def update_bot_data(self, data: Dict) -> None:
+        pass
+
+    async def update_callback_data(self, data) -> None:
+        pass
+
+    async def update_conversation(self, name: str, key, new_state) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: Dict) -> None:
+        pass
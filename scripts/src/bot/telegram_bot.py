@@ -1,16 +1,24 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest, RetryAfter
 from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters, ContextTypes
-import requests
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+import httpx
 import logging
 import os
+from pathlib import Path
 import sys
+import time
 
 # Add project root to path if needed
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from scripts.src.bot.persistence import SQLitePersistence
 from scripts.src.config.loader import load_config
+from scripts.src.utils.http_client import CircuitOpenError, get_async_http_client
 
 # Setup logging
 logging.basicConfig(
@@ -18,13 +26,26 @@ logging.basicConfig(
     level=logging.INFO
 )
 logger = logging.getLogger(__name__)
+# httpx logs every request at INFO
+logging.getLogger('httpx').setLevel(logging.WARNING)
 
 # Load config
 config = load_config()
 API_URL = config.get('api', {}).get('url', 'http://localhost:8080')
 
-# Store user preferences temporarily (in production, use a database)
-user_preferences = {}
+# Per-user state lives in the project's data/ directory, wherever the bot is started from
+STATE_PATH = str(Path(__file__).parents[3] / "data" / "bot_state.db")
+
+# Deadline given to posts marked urgent from the keyboard
+URGENT_DEADLINE = timedelta(hours=1)
+
+# Telegram allows about one edit per second in a chat and 20 per minute in
+# a group; one progress edit every 3 seconds stays within both
+PROGRESS_EDIT_INTERVAL = 3.0
+
+# Shared pooled client for the API server: handlers await it instead of
+# blocking the event loop, so one slow call does not stall other users
+api = get_async_http_client('api')
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -47,6 +68,7 @@ Commands:
 /help - Get help
 /settings - Change default platforms
 /queue - Check queue status
+/drafts - Re-send failed posts, publish scheduled ones now
 """
     await update.message.reply_text(welcome_message)
 
@@ -62,10 +84,11 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 /settings - Set default platforms
 /queue - Check queue status
 /processall - Process all queued requests NOW
+/drafts - Failed, skipped and scheduled posts, publish them now
 
 📤 How it works:
 - Send URLs or text - added to queue (unlimited!)
-- Choose platforms using buttons
+- Choose platforms using buttons (or set a default with /settings)
 - ALL requests processed daily at {scheduled_time}
 - Or use /processall to process immediately
 
@@ -102,7 +125,7 @@ async def process_all_command(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     # Get queue status first
     try:
-        response = requests.get(f"{API_URL}/queue/status", timeout=10)
+        response = await api.get(f"{API_URL}/queue/status", timeout=10)
         if response.status_code == 200:
             data = response.json()
             pending = data.get('pending', 0)
@@ -125,56 +148,281 @@ async def process_all_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         await update.message.reply_text(f"❌ Error: {e}")
 
 
-async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle button clicks"""
-    query = update.callback_query
-    await query.answer()
+def render_batch_progress(batch: dict) -> str:
+    """Status message text for a batch snapshot from the API"""
+    total, done = batch.get('total', 0), batch.get('done', 0)
+    status = batch.get('status')
+    platform_emoji = {'telegram': '🔵', 'twitter': '🐦', 'linkedin': '💼'}
     
-    user_id = query.from_user.id
-    callback_data = query.data
+    if status == 'failed':
+        header = f"❌ Processing stopped: {batch.get('error') or 'unknown error'}"
+    elif status == 'completed':
+        header = "✅ Processing Complete!" if total else "📭 Queue is empty! No requests to process."
+    else:
+        header = "⏳ Processing all requests..."
+    lines = [header]
     
-    # Handle admin process all
-    if callback_data == 'admin_process_all':
-        await query.edit_message_text("⏳ Processing all requests... This may take several minutes.\n\nYou can close this chat and I'll notify you when done.")
+    if total:
+        filled = int(20 * done / total)
+        lines.append(f"\n[{'█' * filled}{'░' * (20 - filled)}] {done}/{total}")
+        current = batch.get('current')
+        if current:
+            lines.append(f"▶️ {current['index']}/{total}: {current['label']}")
+        partial = batch.get('partial', 0)
+        lines.append(f"✅ Processed: {batch.get('succeeded', 0) - partial}   "
+                     + (f"⚠️ Partial: {partial}   " if partial else "")
+                     + f"❌ Failed: {batch.get('failed', 0)}")
+        for name, counts in sorted((batch.get('platforms') or {}).items()):
+            lines.append(f"{platform_emoji.get(name, '📤')} {name}: ✅ {counts['ok']}  ❌ {counts['failed']}")
+        eta = batch.get('eta_seconds')
+        if eta is not None:
+            lines.append(f"⏱️ ETA: ~{max(1, round(eta / 60))} min")
+    elif status in ('queued', 'running'):
+        lines.append("\nYou can close this chat, this message updates as items finish.")
+    return "\n".join(lines)
+
+
+async def follow_batch(bot, chat_id: int, message_id: int, batch: dict):
+    """
+    Keep one status message in sync with a running batch
+    
+    Long-polls the API for the next change and edits the message at most
+    once per PROGRESS_EDIT_INTERVAL (edits count against Telegram's per-chat
+    limits); the final state is always shown, followed by a new message so
+    the user gets a notification.
+    """
+    last_text, last_edit, errors = None, 0.0, 0
+    
+    while True:
+        text = render_batch_progress(batch)
+        finished = batch.get('status') in ('completed', 'failed')
+        since_edit = time.monotonic() - last_edit
+        if text != last_text and (finished or since_edit >= PROGRESS_EDIT_INTERVAL):
+            try:
+                await bot.edit_message_text(text, chat_id=chat_id, message_id=message_id)
+                last_text, last_edit = text, time.monotonic()
+            except RetryAfter as e:
+                delay = e.retry_after
+                await asyncio.sleep(delay.total_seconds() if hasattr(delay, 'total_seconds') else delay)
+                continue
+            except BadRequest as e:
+                # "message is not modified" or the message was deleted - keep going
+                logger.warning(f"Could not edit batch progress: {e}")
+                last_text = text
+        
+        if finished:
+            await bot.send_message(chat_id=chat_id, text=text)
+            return
         
+        # Wake up for the next change, or when a throttled edit is due
+        wait = PROGRESS_EDIT_INTERVAL - since_edit if text != last_text else 25
+        wait = max(0.5, wait)
         try:
-            # Get count before processing
-            response_before = requests.get(f"{API_URL}/queue/status", timeout=10)
-            pending_before = 0
-            if response_before.status_code == 200:
-                pending_before = response_before.json().get('pending', 0)
-            
-            # Process all
-            response = requests.post(f"{API_URL}/process/all", timeout=3600)  # 1 hour timeout
+            response = await api.get(
+                f"{API_URL}/batches/{batch['batch_id']}",
+                params={"since": batch.get('version', 0), "wait": wait},
+                timeout=(5, wait + 10)
+            )
+            response.raise_for_status()
+            batch, errors = response.json(), 0
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            errors += 1
+            if errors >= 10:
+                logger.error(f"Lost track of batch {batch['batch_id']}: {e}")
+                await bot.send_message(
+                    chat_id=chat_id,
+                    text="⚠️ Lost contact with the server while processing.\n\nCheck /queue status or server logs."
+                )
+                return
+            await asyncio.sleep(min(30, 2 ** errors))
+
+
+async def submit_content(context: ContextTypes.DEFAULT_TYPE, chat_id: int, user_id: int, message_id: int,
+                         pending: dict, platform: str):
+    """Queue the pending draft for `platform` and report back in the chat"""
+    # Determine which platforms to enable
+    platforms = {
+        'telegram': platform in ['telegram', 'all'],
+        'twitter': platform in ['twitter', 'all'],
+        'linkedin': platform in ['linkedin', 'all']
+    }
+    
+    try:
+        # Download image if present
+        image_path = None
+        if pending.get('has_image') and pending.get('image_file_id'):
+            file = await context.bot.get_file(pending['image_file_id'])
+            os.makedirs('/tmp/telegram_images', exist_ok=True)
+            image_path = f"/tmp/telegram_images/image_{user_id}_{message_id}.jpg"
+            await file.download_to_drive(image_path)
+            logger.info(f"Downloaded image to: {image_path}")
+        
+        # Process based on content type
+        if pending['type'] == 'url':
+            # Send URL to processing API (not retried: a 429 means over quota,
+            # and the user is told when to try again)
+            logger.info(f"Sending URL to API: {pending['text']}")
+            response = await api.post(
+                f"{API_URL}/predict",
+                retry=False,
+                json={
+                    "url": pending['text'],
+                    "platforms": platforms,
+                    "user_id": str(user_id),
+                    "priority": pending.get('priority', 'normal'),
+                    "publish_by": pending.get('publish_by')
+                },
+                timeout=30
+            )
+        else:
+            # Send text for enhancement
+            logger.info(f"Sending text to enhancement API")
+            response = await api.post(
+                f"{API_URL}/enhance",
+                retry=False,
+                json={
+                    "text": pending['text'],
+                    "platforms": platforms,
+                    "image_path": image_path,
+                    "user_id": str(user_id),
+                    "priority": pending.get('priority', 'normal'),
+                    "publish_by": pending.get('publish_by')
+                },
+                timeout=30
+            )
+        
+        if response.status_code == 200:
+            result = response.json()
             
-            if response.status_code == 200:
-                result = response.json()
-                processed = result.get('processed', 0)
-                failed = result.get('failed', 0)
+            # Should always be queued
+            if result.get("status") == "queued":
+                position = result.get("position", "?")
+                scheduled_time = config.get('scheduler', {}).get('time', '23:00')
+                if pending.get('priority') == 'urgent':
+                    scheduled_time = "within the hour (urgent)"
+                
+                # Format platform names for display
+                platform_names = []
+                if platforms['telegram']:
+                    platform_names.append('🔵 Telegram')
+                if platforms['twitter']:
+                    platform_names.append('🐦 Twitter/X')
+                if platforms['linkedin']:
+                    platform_names.append('💼 LinkedIn')
+                
+                platforms_str = ', '.join(platform_names)
+                duplicate = result.get("duplicate_of")
+                duplicate_note = f"⚠️ Possible duplicate: {duplicate['preview'] or duplicate['url']}\n\n" if duplicate else ""
                 
                 await context.bot.send_message(
-                    chat_id=query.message.chat_id,
-                    text=f"✅ Processing Complete!\n\n"
-                         f"📊 Results:\n"
-                         f"   • Total in queue: {pending_before}\n"
-                         f"   • ✅ Processed: {processed}\n"
-                         f"   • ❌ Failed: {failed}\n\n"
-                         f"🎉 Queue is now cleared!"
+                    chat_id=chat_id,
+                    text=f"📥 Request queued!\n\n"
+                         f"📍 Position: {position}\n"
+                         f"🎯 Platforms: {platforms_str}\n"
+                         f"⏰ Will be processed at: {scheduled_time}\n\n"
+                         f"{duplicate_note}"
+                         f"💡 Use /queue to check status\n"
+                         f"⚡ Use /processall to process all now"
                 )
             else:
                 await context.bot.send_message(
-                    chat_id=query.message.chat_id,
-                    text=f"❌ Error: {response.text}"
+                    chat_id=chat_id,
+                    text=f"✅ Request added: {result.get('message', 'Success')}"
                 )
-        except requests.exceptions.Timeout:
+        elif response.status_code == 409:
             await context.bot.send_message(
-                chat_id=query.message.chat_id,
-                text="⏰ Processing is taking longer than expected.\n\nCheck /queue status or server logs."
+                chat_id=chat_id,
+                text=f"♻️ Not queued. {response.json().get('message', 'This was already published.')}"
             )
-        except Exception as e:
+        elif response.status_code == 429:
+            retry_after = response.headers.get('Retry-After')
+            wait = f" Try again in {int(retry_after) // 60 + 1} min." if retry_after else ""
             await context.bot.send_message(
-                chat_id=query.message.chat_id,
-                text=f"❌ Error: {str(e)}"
+                chat_id=chat_id,
+                text=f"⏳ You've queued a lot recently, so this one was not added.{wait}"
+            )
+        else:
+            error_text = response.text[:500]
+            await context.bot.send_message(
+                chat_id=chat_id,
+                text=f"❌ Error: {error_text}"
+            )
+    
+    except httpx.TimeoutException:
+        await context.bot.send_message(
+            chat_id=chat_id,
+            text="❌ Request timeout. The server took too long to respond."
+        )
+    except (httpx.ConnectError, CircuitOpenError):
+        await context.bot.send_message(
+            chat_id=chat_id,
+            text="❌ Connection error.\n\nMake sure the API server is running:\n"
+                 "python3 scripts/src/server_queued.py"
+        )
+    except Exception as e:
+        logger.error(f"Error processing content: {e}")
+        await context.bot.send_message(
+            chat_id=chat_id,
+            text=f"❌ Error processing content: {str(e)}"
+        )
+    
+    # Clear pending content
+    context.user_data['pending_content'] = None
+
+
+async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle button clicks"""
+    query = update.callback_query
+    await query.answer()
+    
+    user_id = query.from_user.id
+    callback_data = query.data
+    
+    # Handle admin process all
+    if callback_data == 'admin_process_all':
+        try:
+            response = await api.post(f"{API_URL}/batches", retry=False)
+            if response.status_code != 202:
+                await query.edit_message_text(f"❌ Error: {response.text[:500]}")
+                return
+            batch = response.json()
+        except (httpx.ConnectError, CircuitOpenError):
+            await query.edit_message_text("❌ Cannot connect to server. Is server_queued.py running?")
+            return
+        except Exception as e:
+            await query.edit_message_text(f"❌ Error: {str(e)}")
+            return
+        
+        # Follow the batch in the background (its first edit shows the status
+        # right away); this handler returns so other updates keep flowing
+        context.application.create_task(
+            follow_batch(context.bot, query.message.chat_id, query.message.message_id, batch),
+            update=update
+        )
+        return
+    
+    # Publish a stored draft: only the platform call, no LLM run
+    if callback_data.startswith(('draft_publish_', 'draft_force_')):
+        _, action, draft_id = callback_data.split('_', 2)
+        try:
+            response = await api.post(f"{API_URL}/drafts/{draft_id}/publish", params={"force": action == 'force'},
+                                      retry=False, timeout=60)
+        except (httpx.ConnectError, CircuitOpenError):
+            await query.edit_message_text("❌ Cannot connect to server. Is server_queued.py running?")
+            return
+        except Exception as e:
+            await query.edit_message_text(f"❌ Error: {str(e)}")
+            return
+        if response.status_code == 409:
+            await query.edit_message_text(f"ℹ️ Draft #{draft_id} is already published")
+        elif response.status_code != 200:
+            await query.edit_message_text(f"❌ Error: {response.text[:500]}")
+        else:
+            outcome = response.json()
+            icon = {'published': '✅', 'skipped': '⚠️'}.get(outcome['status'], '❌')
+            await query.edit_message_text(
+                f"{icon} Draft #{draft_id} ({outcome['platform']}): {outcome['status']} "
+                f"in {outcome['elapsed_ms']:.0f}ms\n\n{outcome['result'][:500]}"
             )
         return
     
@@ -185,7 +433,13 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Handle default platform settings
     if callback_data.startswith('default_'):
         platform = callback_data.replace('default_', '')
-        user_preferences[user_id] = platform
+        
+        # Kept in user_data, which the bot persists across restarts
+        if platform == 'ask':
+            context.user_data.pop('default_platform', None)
+            await query.edit_message_text("✅ I'll ask where to post every time")
+            return
+        context.user_data['default_platform'] = platform
         
         platform_names = {
             'telegram': '🔵 Telegram',
@@ -195,8 +449,26 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         }
         
         await query.edit_message_text(
-            f"✅ Default platform set to: {platform_names.get(platform, 'All')}"
+            f"✅ Default platform set to: {platform_names.get(platform, 'All')}\n\n"
+            f"New messages are queued there directly. Use /settings to change it."
+        )
+        return
+    
+    # Toggle the priority of the pending post (tapping the selected one resets it)
+    if callback_data.startswith('priority_'):
+        pending = context.user_data.get('pending_content')
+        if not pending:
+            await query.edit_message_text("❌ No content to post. Please send a message first.")
+            return
+        priority = callback_data.replace('priority_', '')
+        if pending.get('priority') == priority:
+            priority = 'normal'
+        pending['priority'] = priority
+        # Urgent posts should be out within the hour
+        pending['publish_by'] = (
+            (datetime.now() + URGENT_DEADLINE).isoformat(timespec='seconds') if priority == 'urgent' else None
         )
+        await query.edit_message_reply_markup(reply_markup=get_platform_selection_keyboard(priority))
         return
     
     # Handle platform selection for posting
@@ -210,109 +482,7 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
         
         await query.edit_message_text("⏳ Adding to queue...")
-        
-        # Determine which platforms to enable
-        platforms = {
-            'telegram': platform in ['telegram', 'all'],
-            'twitter': platform in ['twitter', 'all'],
-            'linkedin': platform in ['linkedin', 'all']
-        }
-        
-        try:
-            # Download image if present
-            image_path = None
-            if pending.get('has_image') and pending.get('image_file_id'):
-                file = await context.bot.get_file(pending['image_file_id'])
-                os.makedirs('/tmp/telegram_images', exist_ok=True)
-                image_path = f"/tmp/telegram_images/image_{user_id}_{query.message.message_id}.jpg"
-                await file.download_to_drive(image_path)
-                logger.info(f"Downloaded image to: {image_path}")
-            
-            # Process based on content type
-            if pending['type'] == 'url':
-                # Send URL to processing API
-                logger.info(f"Sending URL to API: {pending['text']}")
-                response = requests.post(
-                    f"{API_URL}/predict",
-                    json={
-                        "url": pending['text'],
-                        "platforms": platforms
-                    },
-                    timeout=30
-                )
-            else:
-                # Send text for enhancement
-                logger.info(f"Sending text to enhancement API")
-                response = requests.post(
-                    f"{API_URL}/enhance",
-                    json={
-                        "text": pending['text'],
-                        "platforms": platforms,
-                        "image_path": image_path
-                    },
-                    timeout=30
-                )
-            
-            if response.status_code == 200:
-                result = response.json()
-                
-                # Should always be queued
-                if result.get("status") == "queued":
-                    position = result.get("position", "?")
-                    scheduled_time = config.get('scheduler', {}).get('time', '23:00')
-                    
-                    # Format platform names for display
-                    platform_names = []
-                    if platforms['telegram']:
-                        platform_names.append('🔵 Telegram')
-                    if platforms['twitter']:
-                        platform_names.append('🐦 Twitter/X')
-                    if platforms['linkedin']:
-                        platform_names.append('💼 LinkedIn')
-                    
-                    platforms_str = ', '.join(platform_names)
-                    
-                    await context.bot.send_message(
-                        chat_id=query.message.chat_id,
-                        text=f"📥 Request queued!\n\n"
-                             f"📍 Position: {position}\n"
-                             f"🎯 Platforms: {platforms_str}\n"
-                             f"⏰ Will be processed at: {scheduled_time}\n\n"
-                             f"💡 Use /queue to check status\n"
-                             f"⚡ Use /processall to process all now"
-                    )
-                else:
-                    await context.bot.send_message(
-                        chat_id=query.message.chat_id,
-                        text=f"✅ Request added: {result.get('message', 'Success')}"
-                    )
-            else:
-                error_text = response.text[:500]
-                await context.bot.send_message(
-                    chat_id=query.message.chat_id,
-                    text=f"❌ Error: {error_text}"
-                )
-        
-        except requests.exceptions.Timeout:
-            await context.bot.send_message(
-                chat_id=query.message.chat_id,
-                text="❌ Request timeout. The server took too long to respond."
-            )
-        except requests.exceptions.ConnectionError:
-            await context.bot.send_message(
-                chat_id=query.message.chat_id,
-                text="❌ Connection error.\n\nMake sure the API server is running:\n"
-                     "python3 scripts/src/server_queued.py"
-            )
-        except Exception as e:
-            logger.error(f"Error processing content: {e}")
-            await context.bot.send_message(
-                chat_id=query.message.chat_id,
-                text=f"❌ Error processing content: {str(e)}"
-            )
-        
-        # Clear pending content
-        context.user_data['pending_content'] = None
+        await submit_content(context, query.message.chat_id, user_id, query.message.message_id, pending, platform)
 
 
 
@@ -324,6 +494,7 @@ async def settings_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         [InlineKeyboardButton("🐦 Twitter/X", callback_data='default_twitter')],
         [InlineKeyboardButton("💼 LinkedIn", callback_data='default_linkedin')],
         [InlineKeyboardButton("🌐 All Platforms", callback_data='default_all')],
+        [InlineKeyboardButton("❓ Ask every time", callback_data='default_ask')],
     ]
     reply_markup = InlineKeyboardMarkup(keyboard)
     
@@ -336,19 +507,26 @@ async def settings_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def queue_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Check queue status"""
     try:
-        response = requests.get(f"{API_URL}/queue/status", timeout=10)
+        response = await api.get(f"{API_URL}/queue/status",
+                                 params={"user_id": str(update.message.from_user.id)}, timeout=10)
         if response.status_code == 200:
             data = response.json()
+            mine = data.get('you') or {}
+            if mine.get('positions'):
+                positions = ', '.join(f"#{p}" for p in mine['positions'][:10])
+                yours = f"🙋 Yours: {mine['pending']} ({positions})\n"
+            else:
+                yours = "🙋 Yours: none\n"
             await update.message.reply_text(
                 f"📊 Queue Status\n\n"
-                f"📥 Pending: {data.get('pending', 0)}/5\n"
-                f"✅ Available slots: {data.get('available_slots', 5)}\n"
+                f"📥 Pending: {data.get('pending', 0)}\n"
+                f"{yours}"
                 f"⏰ Next processing: {data.get('next_processing', '23:00')}\n\n"
                 f"Send me a URL or text to add to the queue!"
             )
         else:
             await update.message.reply_text("❌ Could not get queue status. Is the server running?")
-    except requests.exceptions.ConnectionError:
+    except (httpx.ConnectError, CircuitOpenError):
         await update.message.reply_text(
             "❌ Cannot connect to server.\n\n"
             "Make sure the API server is running:\n"
@@ -359,13 +537,74 @@ async def queue_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(f"❌ Error: {str(e)}")
 
 
-def get_platform_selection_keyboard():
-    """Create inline keyboard for platform selection"""
+async def drafts_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Failed and scheduled drafts, each with a button to publish it now"""
+    platform_emoji = {'telegram': '🔵', 'twitter': '🐦', 'linkedin': '💼'}
+    try:
+        drafts = []
+        for status in ('failed', 'skipped', 'scheduled'):
+            response = await api.get(f"{API_URL}/drafts", params={"status": status, "limit": 5}, timeout=10)
+            if response.status_code != 200:
+                await update.message.reply_text("❌ Could not get drafts. Is the server running?")
+                return
+            drafts.extend(response.json().get('items', []))
+    except (httpx.ConnectError, CircuitOpenError):
+        await update.message.reply_text(
+            "❌ Cannot connect to server.\n\n"
+            "Make sure the API server is running:\n"
+            "python3 scripts/src/server_queued.py"
+        )
+        return
+    except Exception as e:
+        logger.error(f"Error getting drafts: {e}")
+        await update.message.reply_text(f"❌ Error: {str(e)}")
+        return
+    
+    if not drafts:
+        await update.message.reply_text("📭 No failed, skipped or scheduled posts.")
+        return
+    
+    lines = ["📝 Drafts\n"]
+    keyboard = []
+    for draft in drafts:
+        emoji = platform_emoji.get(draft['platform'], '📤')
+        preview = draft['text'][:60].replace('\n', ' ')
+        action = 'publish'
+        if draft['status'] == 'failed':
+            lines.append(f"❌ #{draft['id']} {emoji} {preview}…")
+            label = f"🔁 Retry #{draft['id']} {emoji}"
+        elif draft['status'] == 'skipped':
+            # Duplicates (ours or LinkedIn's); sending means overriding the check
+            lines.append(f"♻️ #{draft['id']} {emoji} {preview}…")
+            label = f"⚠️ Publish #{draft['id']} {emoji} anyway"
+            action = 'force'
+        else:
+            lines.append(f"🗓️ #{draft['id']} {emoji} {draft['publish_at'][5:16].replace('T', ' ')} · {preview}…")
+            label = f"🚀 Publish #{draft['id']} {emoji} now"
+        keyboard.append([InlineKeyboardButton(label, callback_data=f"draft_{action}_{draft['id']}")])
+    
+    await update.message.reply_text('\n'.join(lines), reply_markup=InlineKeyboardMarkup(keyboard))
+
+
+async def close_api_client(application: Application):
+    """Close the pooled API connections on shutdown"""
+    await api.aclose()
+
+
+def get_platform_selection_keyboard(priority: str = 'normal'):
+    """Create inline keyboard for platform selection, with the priority toggles"""
+    def mark(option, label):
+        return f"✅ {label}" if priority == option else label
+    
     keyboard = [
         [InlineKeyboardButton("🔵 Telegram", callback_data='platform_telegram')],
         [InlineKeyboardButton("🐦 Twitter/X", callback_data='platform_twitter')],
         [InlineKeyboardButton("💼 LinkedIn", callback_data='platform_linkedin')],
         [InlineKeyboardButton("🌐 All Platforms", callback_data='platform_all')],
+        [
+            InlineKeyboardButton(mark('urgent', "🚨 Urgent (1h)"), callback_data='priority_urgent'),
+            InlineKeyboardButton(mark('low', "🐢 Can wait"), callback_data='priority_low'),
+        ],
     ]
     return InlineKeyboardMarkup(keyboard)
 
@@ -390,6 +629,13 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         'image_file_id': message.photo[-1].file_id if has_image else None
     }
     
+    # Skip the keyboard when the user has picked a default in /settings
+    default_platform = context.user_data.get('default_platform')
+    if default_platform:
+        await submit_content(context, message.chat_id, user_id, message.message_id,
+                             context.user_data['pending_content'], default_platform)
+        return
+    
     # Ask user to select platform
     await message.reply_text(
         "📤 Where would you like to post this?",
@@ -398,49 +644,76 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 
-def main():
-    """Start the bot"""
-    # Get bot token from config
-    token = config['telegram']['bot_token']
+def build_application(webhook: bool = False) -> Application:
+    """
+    Bot application with all handlers registered
     
-    logger.info(f"🤖 Starting bot with token: {token[:10]}...")
-    logger.info(f"📡 API URL: {API_URL}")
+    In webhook mode there is no updater: updates arrive through the
+    bounded update queue that the webhook endpoint fills.
+    """
+    settings = config['telegram']
     
-    # Create application
-    application = Application.builder().token(token).build()
+    # Default platforms and unsent drafts survive restarts
+    persistence = SQLitePersistence(
+        settings.get('state_path', STATE_PATH),
+        cache_size=settings.get('state_cache_size', 1000),
+        update_interval=settings.get('state_flush_interval', 10),
+    )
+    
+    # Handle updates from different users concurrently; API calls are async
+    builder = (
+        Application.builder()
+        .token(settings['bot_token'])
+        .concurrent_updates(settings.get('concurrent_updates', 32))
+        .persistence(persistence)
+        .post_shutdown(close_api_client)
+    )
+    if webhook:
+        builder = builder.updater(None).update_queue(asyncio.Queue(maxsize=settings.get('update_queue_size', 256)))
+    application = builder.build()
     
-    # Add handlers
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("help", help_command))
     application.add_handler(CommandHandler("settings", settings_command))
     application.add_handler(CommandHandler("queue", queue_command))
+    application.add_handler(CommandHandler("processall", process_all_command))
+    application.add_handler(CommandHandler("drafts", drafts_command))
     application.add_handler(MessageHandler(filters.TEXT | filters.PHOTO, handle_message))
     application.add_handler(CallbackQueryHandler(button_callback))
-    
-    # Start bot
-    logger.info("✅ Bot is ready! Press Ctrl+C to stop.")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    return application
 
 
 def main():
-    """Start the bot"""
-    token = config['telegram']['bot_token']
+    """
+    Start the bot
     
-    logger.info(f"🤖 Starting bot with token: {token[:10]}...")
-    logger.info(f"📡 API URL: {API_URL}")
+    Polling (the default, and the fallback when no public URL is available)
+    runs the bot in this process. In webhook mode (telegram.mode: webhook or
+    --mode webhook) the bot lives inside the queued API server, so this
+    starts that server.
+    """
+    parser = argparse.ArgumentParser(description="Telegram social media bot")
+    parser.add_argument('--mode', choices=['polling', 'webhook'],
+                        default=config['telegram'].get('mode', 'polling'))
+    args = parser.parse_args()
     
-    application = Application.builder().token(token).build()
+    token = config['telegram']['bot_token']
+    logger.info(f"🤖 Starting bot with token: {token[:10]}... ({args.mode})")
+    logger.info(f"📡 API URL: {API_URL}")
     
-    # Add handlers
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("help", help_command))
-    application.add_handler(CommandHandler("settings", settings_command))
-    application.add_handler(CommandHandler("queue", queue_command))
-    application.add_handler(CommandHandler("processall", process_all_command))
-    application.add_handler(MessageHandler(filters.TEXT | filters.PHOTO, handle_message))
-    application.add_handler(CallbackQueryHandler(button_callback))
+    if args.mode == 'webhook':
+        import uvicorn
+        from scripts.src.bot.webhook import mount_webhook
+        from scripts.src.server_queued import app
+        
+        # No-op when server_queued already mounted it from config
+        mount_webhook(app, config, enabled=True)
+        uvicorn.run(app, host="0.0.0.0", port=8080, log_level="info")
+        return
     
+    application = build_application()
     logger.info("✅ Bot is ready! Press Ctrl+C to stop.")
+    # Polling removes any webhook that is still registered
     application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 
@@ -0,0 +1,97 @@
+import asyncio
+import hmac
+import logging
+import secrets
+from typing import Dict, Optional
+
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import JSONResponse
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+DEFAULT_PATH = "/telegram/webhook"
+
+
+def create_webhook_router(application, secret_token: str, path: str = DEFAULT_PATH) -> APIRouter:
+    """
+    POST endpoint Telegram delivers updates to
+
+    Requests without the secret token are refused. Updates go into the
+    application's bounded update queue; when it is full Telegram gets a 503
+    and redelivers later, so a burst never grows memory without limit.
+    """
+    router = APIRouter()
+
+    @router.post(path, include_in_schema=False)
+    async def telegram_webhook(request: Request):
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), secret_token):
+            return JSONResponse(status_code=403, content={"ok": False})
+        try:
+            payload = await request.json()
+        except ValueError:
+            return JSONResponse(status_code=400, content={"ok": False})
+        if not isinstance(payload, dict):
+            return JSONResponse(status_code=400, content={"ok": False})
+        try:
+            update = Update.de_json(payload, application.bot)
+        except (ValueError, TypeError, KeyError):
+            return JSONResponse(status_code=400, content={"ok": False})
+        try:
+            application.update_queue.put_nowait(update)
+        except asyncio.QueueFull:
+            logger.warning("Telegram update queue is full, asking Telegram to redeliver")
+            return JSONResponse(status_code=503, headers={"Retry-After": "5"}, content={"ok": False})
+        return {"ok": True}
+
+    return router
+
+
+def mount_webhook(app: FastAPI, config: Dict, enabled: Optional[bool] = None) -> bool:
+    """
+    Serve the bot from `app` through a webhook instead of a polling process
+
+    Enabled by telegram.mode: webhook (or enabled=True). Needs
+    telegram.webhook_url, the public https base URL Telegram can reach;
+    webhook_secret is generated per process when not set. The webhook is
+    registered on startup and left in place on shutdown, so Telegram keeps
+    updates for the next start. Returns whether the webhook was mounted.
+    """
+    settings = config.get('telegram', {}) or {}
+    if enabled is None:
+        enabled = settings.get('mode', 'polling') == 'webhook'
+    if not enabled or getattr(app.state, 'telegram_webhook', False):
+        return False
+    if not settings.get('webhook_url'):
+        logger.error("telegram.mode is webhook but telegram.webhook_url is not set; run the bot with polling")
+        return False
+
+    from scripts.src.bot.telegram_bot import build_application, close_api_client
+
+    application = build_application(webhook=True)
+    path = settings.get('webhook_path', DEFAULT_PATH)
+    secret_token = settings.get('webhook_secret') or secrets.token_urlsafe(32)
+    app.include_router(create_webhook_router(application, secret_token, path))
+    app.state.telegram_webhook = True
+
+    async def start_bot():
+        await application.initialize()
+        await application.start()
+        await application.bot.set_webhook(
+            url=settings['webhook_url'].rstrip('/') + path,
+            secret_token=secret_token,
+            allowed_updates=Update.ALL_TYPES,
+            max_connections=settings.get('webhook_max_connections', 40),
+        )
+        logger.info(f"Telegram webhook registered at {settings['webhook_url'].rstrip('/')}{path}")
+
+    async def stop_bot():
+        await application.stop()
+        await application.shutdown()
+        # post_shutdown hooks only run under run_polling/run_webhook
+        await close_api_client(application)
+
+    app.add_event_handler("startup", start_bot)
+    app.add_event_handler("shutdown", stop_bot)
+    return True
@@ -1,9 +1,10 @@
 import schedule
 import time
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 import sys
 import os
+import threading
 from colorama import init, Fore, Style
 import warnings
 
@@ -16,10 +17,14 @@ sys.path.insert(0, project_root)
 
 from scripts.src.utils.queue_manager import (
     get_pending_requests, 
+    is_due,
+    is_ready,
     mark_as_processed, 
+    mark_failed,
     remove_processed
 )
 from scripts.src.config.loader import load_config
+from scripts.src.utils.concurrency import get_llm_limiter
 
 # Suppress warnings
 warnings.filterwarnings('ignore')
@@ -68,6 +73,11 @@ for handler in logger.handlers:
 
 config = load_config()
 SCHEDULED_TIME = config.get('scheduler', {}).get('time', '23:00')
+# Minutes between checks for urgent or deadline-bound items (0 = only nightly)
+URGENT_CHECK_MINUTES = config.get('scheduler', {}).get('urgent_check_minutes', 5)
+# Time-spread publishing: generate drafts, publish them into slots later
+PUBLISHING = config.get('scheduler', {}).get('publishing', {}) or {}
+SPREAD_PUBLISHING = PUBLISHING.get('enabled', False)
 
 
 def print_header(text):
@@ -147,37 +157,285 @@ def process_single_request(request_data):
         return {"status": "failed", "error": str(e)}
 
 
-def process_all_queue():
-    """Process ALL pending requests in queue"""
+def enabled_platforms(request_data, config_platforms):
+    """Platforms a queued URL request will be written for"""
+    user_platforms = request_data.get('platforms') or {}
+    if user_platforms:
+        return [p for p in ('telegram', 'twitter', 'linkedin') if user_platforms.get(p)]
+    return [
+        p for p in ('telegram', 'twitter', 'linkedin')
+        if config_platforms.get(p, {}).get('enabled', True)
+    ]
+
+
+def start_media_uploads(pending):
+    """
+    Start platform uploads for every queued image right away
+    
+    They run in the background while the LLM stages work; the posting tools
+    pick up the finished handles (or wait for the rest of the upload).
+    """
+    from scripts.src.utils.media_uploader import get_media_uploader
+    
+    uploader = get_media_uploader()
+    for item in pending:
+        request_data = item.get("data", {})
+        if request_data.get("image_path"):
+            platforms = enabled_platforms(request_data, config.get('platforms', {}))
+            uploader.start_all(request_data["image_path"], platforms, config)
+
+
+def prepare_batch(pending):
+    """
+    Run the summarize and hashtag stages for all URL requests up front
+    
+    Summaries run as concurrent crews (the LLM limiter decides how many hit
+    Ollama at once); hashtags for every item go out as one structured prompt.
+    
+    Returns:
+        {request_id: {"summary": ..., "hashtags": {...}}} to merge into the
+        request data before the per-item writing crews run
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from scripts.src.api.social_api import SocialSummarizerAPI
+    
+    url_items = [item for item in pending if "url" in item.get("data", {})]
+    if not url_items:
+        return {}
+    
+    api = SocialSummarizerAPI()
+    api.setup(device=None)
+    limiter = get_llm_limiter()
+    
+    # Stage 1: summaries
+    print_section("🧾", f"Batch stage 1/2: summarizing {len(url_items)} URL(s)", Fore.MAGENTA)
+    started = time.time()
+    
+    def summarize(item):
+        try:
+            return item["id"], api.summarize(item["data"]["url"])
+        except Exception as e:
+            logger.error(f"Summary failed for request {item['id']}: {e}")
+            return item["id"], None
+    
+    with ThreadPoolExecutor(max_workers=limiter.max_limit) as pool:
+        summaries = {rid: summary for rid, summary in pool.map(summarize, url_items) if summary}
+    print_info(f"{len(summaries)}/{len(url_items)} summaries in {time.time() - started:.0f}s")
+    
+    # Stage 2: hashtags, one multi-document prompt for everything
+    platforms_by_id = {
+        item["id"]: enabled_platforms(item["data"], config.get('platforms', {}))
+        for item in url_items
+    }
+    all_platforms = sorted({p for rid in summaries for p in platforms_by_id[rid]})
+    
+    print_section("#️⃣", f"Batch stage 2/2: hashtags for {len(summaries)} item(s)", Fore.MAGENTA)
+    started = time.time()
+    try:
+        hashtags = api.generate_hashtags_batch(summaries, all_platforms)
+    except Exception as e:
+        logger.error(f"Batched hashtag generation failed, falling back per item: {e}")
+        hashtags = {}
+    print_info(f"Hashtags for {len(hashtags)}/{len(summaries)} items in {time.time() - started:.0f}s")
+    
+    return {
+        rid: {
+            "summary": summary,
+            "hashtags": {
+                p: tags for p, tags in hashtags.get(rid, {}).items() if p in platforms_by_id[rid]
+            }
+        }
+        for rid, summary in summaries.items()
+    }
+
+
+def next_scheduled_run(now=None):
+    """Datetime of the next nightly run"""
+    now = now or datetime.now()
+    hour, minute = map(int, SCHEDULED_TIME.split(':'))
+    run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return run if run > now else run + timedelta(days=1)
+
+
+def schedule_drafts(item, draft_ids):
+    """Give each stored draft a publishing slot; returns {platform: publish_at}"""
+    from scripts.src.utils.publish_scheduler import get_publish_scheduler
+    
+    publisher = get_publish_scheduler()
+    deadline = datetime.fromisoformat(item["publish_by"]) if item.get("publish_by") else None
+    return {
+        platform: publisher.schedule_draft(draft_id, platform, deadline=deadline,
+                                           urgent=item.get("priority") == "urgent")
+        for platform, draft_id in draft_ids.items()
+    }
+
+
+def publish_drafts(draft_ids):
+    """Publish stored drafts right away; returns {platform: outcome}"""
+    from scripts.src.utils.publish_scheduler import publish_now
+    
+    return {platform: publish_now(draft_id) for platform, draft_id in draft_ids.items()}
+
+
+def urgent_arrivals(seen_ids):
+    """Urgent items queued after the run started, in processing order"""
+    return [
+        item for item in get_pending_requests()
+        if item.get("priority") == "urgent" and item.get("id") not in seen_ids and is_ready(item)
+    ]
+
+
+def record_failure(request_id, error):
+    """Back the item off for a retry, or report that it has been parked"""
+    item = mark_failed(request_id, error)
+    if item is None:
+        return
+    if item["status"] == "parked":
+        print(f"{Fore.RED}   🅿️  Parked after {item['attempts']} attempts, not retried again{Style.RESET_ALL}")
+    else:
+        retry_at = datetime.fromisoformat(item["retry_at"])
+        print(f"{Fore.YELLOW}   🔁 Attempt {item['attempts']}, retrying after {retry_at:%a %H:%M}{Style.RESET_ALL}")
+
+
+def process_due_queue():
+    """
+    Process urgent items and those due before the next nightly run
+    
+    Runs every scheduler.urgent_check_minutes so breaking news does not wait
+    for the nightly batch.
+    """
+    due = [item for item in get_pending_requests() if is_due(item, next_scheduled_run()) and is_ready(item)]
+    if due:
+        return process_all_queue(items=due)
+
+
+def release_due_drafts(scheduled_count):
+    """
+    After a spread-publishing run outside the scheduler (--now, /processall)
+
+    Nothing in this process posts at slot time, so drafts that are already
+    due (urgent ones) are published here and the rest are left to the
+    scheduler process.
+    """
+    from scripts.src.utils.publish_scheduler import get_publish_scheduler
+    
+    publisher = get_publish_scheduler()
+    if publisher.running:
+        return
+    released = publisher.run_pending()
+    if released:
+        print_success(f"Published {len(released)} draft(s) whose slot has already come")
+    if scheduled_count > len(released):
+        print_info(f"{scheduled_count - len(released)} draft(s) wait for their slots; they are posted by the "
+                   f"scheduler (python3 scripts/src/scheduler/processor.py), which has to be running")
+
+
+# One queue run at a time per process: /process/all, /batches and the
+# scheduler jobs would otherwise take the same pending items (and post them
+# twice) and fight over process_single_request's stdout swap
+_run_lock = threading.Lock()
+
+
+def process_all_queue(batch=None, progress=None, items=None):
+    """
+    Process ALL pending requests in queue
+    
+    Waits for a run already going in this process; items it handled
+    meanwhile are not processed again.
+    
+    Items go in priority order, earliest deadline first within a priority.
+    Urgent items queued while the run is going are picked up before the
+    next item (in batch mode, before the next micro-batch of
+    scheduler.micro_batch_size items is prepared), so they do not wait
+    behind the whole backlog.
+    
+    Args:
+        batch: Run the summarize/hashtag stages for all items together before
+            per-item writing. Defaults to config scheduler.batch_mode
+        progress: Optional BatchProgress told about every item as it starts
+            and finishes (used by the bot's live /processall status)
+        items: Process these pending items instead of the whole queue
+            (by default every pending item not waiting out a retry backoff)
+    """
+    with _run_lock:
+        if items is not None:
+            still_pending = {item.get("id") for item in get_pending_requests()}
+            items = [item for item in items if item.get("id") in still_pending]
+        return _process_all_queue(batch, progress, items)
+
+
+def _process_all_queue(batch, progress, items):
+    if batch is None:
+        batch = config.get('scheduler', {}).get('batch_mode', False)
+    micro_batch_size = config.get('scheduler', {}).get('micro_batch_size', 0) if batch else 0
     
     print_header("🕐 QUEUE PROCESSING STARTED")
     print(f"{Fore.CYAN}Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}{Style.RESET_ALL}\n")
     
-    pending = get_pending_requests()
+    run_started = time.time()
+    if items is not None:
+        pending = items
+    else:
+        queued = get_pending_requests()
+        pending = [item for item in queued if is_ready(item)]
+        if len(pending) < len(queued):
+            print_info(f"{len(queued) - len(pending)} failed request(s) waiting to be retried later")
     
     if not pending:
         print_info("No pending requests in queue")
         return {
             "status": "success",
             "processed": 0,
+            "partial": 0,
             "failed": 0,
             "message": "No requests to process"
         }
     
+    if progress:
+        progress.start(len(pending))
+    
     print_section("📬", f"Found {len(pending)} pending request(s)", Fore.BLUE)
     print_section("📤", "Processing ALL requests...", Fore.MAGENTA)
     print()
     
     processed_count = 0
+    partial_count = 0
     failed_count = 0
+    scheduled_count = 0
+    
+    start_media_uploads(pending)
+    work = list(pending)
+    seen_ids = {item.get("id") for item in work}
+    prepared = {}
+    prepared_ids = set()
     
-    for i, item in enumerate(pending, 1):
+    i = 0
+    while i < len(work):
+        if i:
+            arrivals = urgent_arrivals(seen_ids)
+            if arrivals:
+                print_section("🚨", f"{len(arrivals)} urgent request(s) arrived, processing them next", Fore.RED)
+                work[i:i] = arrivals
+                seen_ids.update(item.get("id") for item in arrivals)
+                start_media_uploads(arrivals)
+                if progress:
+                    progress.add_items(len(arrivals))
+        if batch and work[i].get("id") not in prepared_ids:
+            chunk = work[i:i + micro_batch_size] if micro_batch_size else work[i:]
+            chunk = [item for item in chunk if item.get("id") not in prepared_ids]
+            prepared.update(prepare_batch(chunk))
+            prepared_ids.update(item.get("id") for item in chunk)
+        item = work[i]
+        i += 1
+        
         request_id = item.get("id")
         request_data = item.get("data", {})
+        if request_id in prepared:
+            request_data = {**request_data, **prepared[request_id]}
         
         # Print minimal request header
         print(f"\n{Fore.YELLOW}{'─'*60}{Style.RESET_ALL}")
-        print(f"{Fore.YELLOW}{Style.BRIGHT}📋 Request {i}/{len(pending)} (ID: {request_id}){Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}{Style.BRIGHT}📋 Request {i}/{len(work)} (ID: {request_id}){Style.RESET_ALL}")
         print(f"{Fore.YELLOW}{'─'*60}{Style.RESET_ALL}")
         
         # Print compact request details
@@ -191,6 +449,9 @@ def process_all_queue():
         
         platforms = request_data.get('platforms', {})
         enabled = [k for k, v in platforms.items() if v]
+        if progress:
+            label = request_data.get('url') or request_data.get('text', '')
+            progress.item_started(i, label if len(label) <= 60 else label[:57] + "...")
         if enabled:
             platform_emoji = {'telegram': '🔵', 'twitter': '🐦', 'linkedin': '💼'}
             platform_str = ' '.join([f"{platform_emoji.get(p, '📤')} {p}" for p in enabled])
@@ -214,61 +475,115 @@ def process_all_queue():
         t.start()
         
         try:
-            # Process the request
-            result = process_single_request(request_data)
+            # Generate the drafts (the API keeps them in the draft store);
+            # publishing is a separate step on the stored drafts, so a failed
+            # platform can be re-sent without the crews
+            result = process_single_request({**request_data, "publish": False, "request_id": request_id})
+            draft_ids = (result.get("draft_ids") or {}) if result.get("status") == "success" else {}
+            if result.get("status") == "success" and not draft_ids:
+                result = {"status": "failed", "error": "No drafts were generated"}
+            if draft_ids and SPREAD_PUBLISHING:
+                planned = schedule_drafts(item, draft_ids)
+            elif draft_ids:
+                outcomes = publish_drafts(draft_ids)
             
             loading = False
             t.join(timeout=0.5)
             print('\r' + ' ' * 50 + '\r', end='')  # Clear loading line
             
-            if result.get("status") == "success":
-                posted_to = result.get('posted_to', [])
-                print_success(f"Processed successfully")
-                if posted_to:
-                    posted_str = ', '.join(posted_to)
-                    print(f"{Fore.GREEN}   📤 Posted to: {posted_str}{Style.RESET_ALL}")
+            if SPREAD_PUBLISHING and result.get("status") == "success":
+                print_success("Drafts generated")
+                for platform, publish_at in planned.items():
+                    print(f"{Fore.GREEN}   🗓️  {platform}: {publish_at:%a %H:%M}{Style.RESET_ALL}")
                 mark_as_processed(request_id)
                 processed_count += 1
+                scheduled_count += len(planned)
+                if progress:
+                    progress.item_finished(True, list(planned), [p for p in enabled if p not in planned])
+            elif result.get("status") == "success":
+                posted_to = [p for p, outcome in outcomes.items() if outcome and outcome["status"] == "published"]
+                failed_platforms = [p for p, outcome in outcomes.items() if outcome and outcome["status"] == "failed"]
+                if posted_to:
+                    print_success(f"Processed successfully")
+                    print(f"{Fore.GREEN}   📤 Posted to: {', '.join(posted_to)}{Style.RESET_ALL}")
+                for platform in failed_platforms:
+                    print_error(f"{platform}: {outcomes[platform]['result'][:80]}")
+                    print(f"{Fore.YELLOW}   🔁 Draft #{draft_ids[platform]} kept, re-send with "
+                          f"POST /drafts/{draft_ids[platform]}/publish{Style.RESET_ALL}")
+                # The drafts hold everything needed for a retry, so the item
+                # leaves the queue either way
+                mark_as_processed(request_id)
+                if failed_platforms and not posted_to:
+                    failed_count += 1
+                elif failed_platforms:
+                    partial_count += 1
+                else:
+                    processed_count += 1
+                if progress:
+                    progress.item_finished(bool(posted_to) or not failed_platforms, posted_to, failed_platforms)
             else:
                 error_msg = result.get('error', 'Unknown error')
                 error_short = error_msg[:80] + "..." if len(error_msg) > 80 else error_msg
                 print_error(f"Failed: {error_short}")
+                record_failure(request_id, error_msg)
                 failed_count += 1
+                if progress:
+                    progress.item_finished(False, failed=enabled)
                 
         except Exception as e:
             loading = False
             t.join(timeout=0.5)
             print('\r' + ' ' * 50 + '\r', end='')
             print_error(f"Error: {str(e)}")
+            record_failure(request_id, str(e))
             failed_count += 1
+            if progress:
+                progress.item_finished(False, failed=enabled)
         
         # Progress indicator
-        progress = (i / len(pending)) * 100
-        progress_bar = '█' * int(progress / 5) + '░' * (20 - int(progress / 5))
-        print(f"\n{Fore.CYAN}Progress: [{progress_bar}] {progress:.0f}%{Style.RESET_ALL}")
+        percent = (i / len(work)) * 100
+        progress_bar = '█' * int(percent / 5) + '░' * (20 - int(percent / 5))
+        print(f"\n{Fore.CYAN}Progress: [{progress_bar}] {percent:.0f}%{Style.RESET_ALL}")
         
         # Small delay between requests
-        if i < len(pending):
+        if i < len(work) and not batch and not SPREAD_PUBLISHING:
             time.sleep(2)
     
     # Clean up processed requests
     remove_processed()
     
+    if scheduled_count:
+        release_due_drafts(scheduled_count)
+    
+    elapsed = time.time() - run_started
+    items_per_hour = round(len(work) / elapsed * 3600, 1) if elapsed > 0 else None
+    
     # Print summary
     print_header("✅ QUEUE PROCESSING COMPLETED")
     
     print(f"{Fore.BLUE}{Style.BRIGHT}📊 Summary:{Style.RESET_ALL}")
-    print(f"   {Fore.CYAN}Total: {len(pending)}{Style.RESET_ALL}")
+    print(f"   {Fore.CYAN}Total: {len(work)}{Style.RESET_ALL}")
     print(f"   {Fore.GREEN}✅ Success: {processed_count}{Style.RESET_ALL}")
+    print(f"   {Fore.YELLOW}⚠️  Partial: {partial_count}{Style.RESET_ALL}")
     print(f"   {Fore.RED}❌ Failed: {failed_count}{Style.RESET_ALL}")
+    print(f"   {Fore.CYAN}⏱️  {elapsed:.0f}s total, {items_per_hour} items/hour ({'batch' if batch else 'per-item'} mode){Style.RESET_ALL}")
+    
+    limiter_stats = get_llm_limiter().stats()
+    print(f"   {Fore.CYAN}🧠 LLM limit: {limiter_stats['limit']} "
+          f"(avg wait: {limiter_stats['avg_queue_wait']}s, timeouts: {limiter_stats['timeouts']}){Style.RESET_ALL}")
     print()
     
     return {
         "status": "success",
         "processed": processed_count,
+        "partial": partial_count,
         "failed": failed_count,
-        "total": len(pending),
-        "message": f"Processed {processed_count} requests, {failed_count} failed"
+        "total": len(work),
+        "llm_limiter": limiter_stats,
+        "mode": "batch" if batch else "per_item",
+        "elapsed_seconds": round(elapsed, 1),
+        "items_per_hour": items_per_hour,
+        "message": f"Processed {processed_count} requests, {partial_count} partially, {failed_count} failed"
     }
 
 
@@ -280,11 +595,26 @@ def run_scheduler():
     print(f"{Fore.BLUE}{Style.BRIGHT}Configuration:{Style.RESET_ALL}")
     print(f"   📅 Scheduled time: {Fore.CYAN}{SCHEDULED_TIME}{Style.RESET_ALL} (daily)")
     print(f"   📊 Mode: {Fore.CYAN}Process ALL queued requests{Style.RESET_ALL}")
+    if URGENT_CHECK_MINUTES:
+        print(f"   🚨 Urgent lane: {Fore.CYAN}every {URGENT_CHECK_MINUTES} min{Style.RESET_ALL}")
+    if SPREAD_PUBLISHING:
+        print(f"   🗓️  Publishing: {Fore.CYAN}drafts every {PUBLISHING.get('generate_every_minutes', 15)} min, "
+              f"posts released into scheduler.publishing windows{Style.RESET_ALL}")
     print(f"   ⏳ Status: {Fore.GREEN}Waiting for scheduled time...{Style.RESET_ALL}")
     print()
     
     # Schedule the job to process ALL queue at scheduled time
     schedule.every().day.at(SCHEDULED_TIME).do(process_all_queue)
+    # Urgent lane: urgent and deadline-bound items between nightly runs
+    if URGENT_CHECK_MINUTES:
+        schedule.every(URGENT_CHECK_MINUTES).minutes.do(process_due_queue)
+    # Spread publishing: write drafts as requests come in (the LLM limiter
+    # paces the crews) and let the publisher thread post them in their slots
+    if SPREAD_PUBLISHING:
+        from scripts.src.utils.publish_scheduler import get_publish_scheduler
+        
+        get_publish_scheduler().start()
+        schedule.every(PUBLISHING.get('generate_every_minutes', 15)).minutes.do(process_all_queue)
     
     print(f"{Fore.YELLOW}{Style.BRIGHT}💡 Tips:{Style.RESET_ALL}")
     print(f"   • Process all now:  {Fore.CYAN}python3 scripts/src/scheduler/processor.py --now{Style.RESET_ALL}")
@@ -304,10 +634,11 @@ if __name__ == '__main__':
     
     parser = argparse.ArgumentParser(description='Queue Processor - Process ALL queue daily')
     parser.add_argument('--now', action='store_true', help='Process ALL requests immediately')
+    parser.add_argument('--batch', action='store_true', help='Summarize and hashtag all items together first')
     args = parser.parse_args()
     
     if args.now:
         print_section("🚀", "Processing ALL requests immediately (manual trigger)", Fore.MAGENTA)
-        process_all_queue()
+        process_all_queue(batch=args.batch or None)
     else:
         run_scheduler()
\ No newline at end of file
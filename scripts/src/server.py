@@ -2,16 +2,20 @@ import sys
 from pathlib import Path
 
 # Add the project root directory to Python's path
-project_root = Path(__file__).parents[3]
+project_root = Path(__file__).parents[2]
 sys.path.insert(0, str(project_root))
 
+import asyncio
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 import uvicorn
 
-from config.loader import load_config
-from utils.logger import setup_logger, log_success, log_info
-from api.social_api import SocialSummarizerAPI, EnhancementAPI
+from scripts.src.config.loader import load_config
+from scripts.src.utils.logger import setup_logger, log_success, log_info
+from scripts.src.utils.job_runner import PipelineExecutor, JobStore, QueueFullError, run_job
+from scripts.src.api.social_api import SocialSummarizerAPI, EnhancementAPI
+from scripts.src.utils.single_flight import summary_flight
 
 logger = setup_logger('Server')
 
@@ -27,6 +31,28 @@ enhance_api = EnhancementAPI()
 social_api.setup(device=None)
 enhance_api.setup(device=None)
 
+# Crews block for minutes, so they run in a dedicated pool off the event loop
+executor_config = config.get('server', {}).get('executor', {}) or {}
+pipeline_executor = PipelineExecutor(
+    max_workers=executor_config.get('workers', 2),
+    max_queue=executor_config.get('max_queue', 8)
+)
+jobs = JobStore()
+
+
+def queue_full_response(error: QueueFullError) -> JSONResponse:
+    """429 with a Retry-After hint when the pipeline backlog is full"""
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(error.retry_after)},
+        content={"error": str(error), "status": "rejected", "retry_after": error.retry_after}
+    )
+
+
+async def run_pipeline(fn, *args):
+    """Run a blocking pipeline in the executor and await its result"""
+    return await asyncio.wrap_future(pipeline_executor.submit(fn, *args))
+
 
 @app.post("/predict")
 async def predict(request: Request):
@@ -38,12 +64,14 @@ async def predict(request: Request):
         url = social_api.decode_request(data)
         
         # Process
-        result = social_api.predict(url)
+        result = await run_pipeline(social_api.predict, url)
         
         # Encode response
         response = social_api.encode_response(result)
         
         return JSONResponse(content=response)
+    except QueueFullError as e:
+        return queue_full_response(e)
     except Exception as e:
         logger.error(f"Error in /predict: {str(e)}")
         return JSONResponse(
@@ -62,12 +90,14 @@ async def enhance(request: Request):
         text = enhance_api.decode_request(data)
         
         # Process
-        result = enhance_api.predict(text)
+        result = await run_pipeline(enhance_api.predict, text)
         
         # Encode response
         response = enhance_api.encode_response(result)
         
         return JSONResponse(content=response)
+    except QueueFullError as e:
+        return queue_full_response(e)
     except Exception as e:
         logger.error(f"Error in /enhance: {str(e)}")
         return JSONResponse(
@@ -76,10 +106,58 @@ async def enhance(request: Request):
         )
 
 
+async def submit_job(request: Request, kind: str, api):
+    """Queue a pipeline as an async job; returns 202 with the job ID"""
+    try:
+        data = await request.json()
+        callback_url = data.pop("callback_url", None)
+        # Decode before creating the job, so a bad request leaves no job stuck in "queued"
+        decoded = api.decode_request(data)
+        job = jobs.create(kind, callback_url=callback_url)
+        pipeline_executor.submit(run_job, jobs, job["job_id"], api.predict, decoded)
+    except QueueFullError as e:
+        jobs.update(job["job_id"], status="rejected")
+        return queue_full_response(e)
+    except Exception as e:
+        logger.error(f"Error in /jobs/{kind}: {str(e)}")
+        return JSONResponse(status_code=500, content={"error": str(e), "status": "failed"})
+    
+    return JSONResponse(
+        status_code=202,
+        headers={"Location": f"/jobs/{job['job_id']}"},
+        content={"job_id": job["job_id"], "status": "queued", "status_url": f"/jobs/{job['job_id']}"}
+    )
+
+
+@app.post("/jobs/predict")
+async def predict_job(request: Request):
+    """Async URL processing - poll /jobs/{job_id} or pass callback_url"""
+    return await submit_job(request, "predict", social_api)
+
+
+@app.post("/jobs/enhance")
+async def enhance_job(request: Request):
+    """Async text enhancement - poll /jobs/{job_id} or pass callback_url"""
+    return await submit_job(request, "enhance", enhance_api)
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Status (and result once finished) of an async job"""
+    job = jobs.get(job_id)
+    if not job:
+        return JSONResponse(status_code=404, content={"error": "Job not found", "status": "failed"})
+    return job
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint"""
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "executor": pipeline_executor.stats(),
+        "coalescing": summary_flight.stats()
+    }
 
 
 @app.get("/")
@@ -90,6 +168,9 @@ async def root():
         "endpoints": {
             "/predict": "POST - Summarize URL and post to Telegram",
             "/enhance": "POST - Enhance text with AI",
+            "/jobs/predict": "POST - Queue URL processing, returns 202 + job ID",
+            "/jobs/enhance": "POST - Queue text enhancement, returns 202 + job ID",
+            "/jobs/{job_id}": "GET - Job status and result",
             "/health": "GET - Health check",
             "/docs": "GET - API documentation"
         }
@@ -102,6 +183,8 @@ def main():
     log_info(logger, "Endpoints:")
     log_info(logger, "  POST /predict - URL processing")
     log_info(logger, "  POST /enhance - Text enhancement")
+    log_info(logger, "  POST /jobs/predict, /jobs/enhance - Async jobs (202 + job ID)")
+    log_info(logger, "  GET  /jobs/{job_id} - Job status")
     log_info(logger, "  GET  /docs - API documentation")
     
     uvicorn.run(
@@ -0,0 +1,66 @@
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, project_root)
+
+import litserve as ls
+
+from scripts.src.config.loader import load_config
+from scripts.src.utils.logger import setup_logger, log_success, log_info
+from scripts.src.api.social_api import SocialSummarizerAPI, EnhancementAPI
+
+logger = setup_logger('LitServer')
+
+config = load_config()
+
+
+def create_server():
+    """
+    Build a LitServer that batches concurrent requests into shared pipeline runs
+    
+    Settings come from the `litserve` section of config.yaml:
+        max_batch_size, batch_timeout, workers_per_device, timeout
+    """
+    settings = config.get('litserve', {}) or {}
+    max_batch_size = settings.get('max_batch_size', 4)
+    batch_timeout = settings.get('batch_timeout', 0.5)
+    
+    social_api = SocialSummarizerAPI(
+        max_batch_size=max_batch_size,
+        batch_timeout=batch_timeout,
+        api_path="/predict"
+    )
+    enhance_api = EnhancementAPI(
+        max_batch_size=max_batch_size,
+        batch_timeout=batch_timeout,
+        api_path="/enhance"
+    )
+    
+    return ls.LitServer(
+        [social_api, enhance_api],
+        accelerator="cpu",
+        workers_per_device=settings.get('workers_per_device', 2),
+        timeout=settings.get('timeout', 900)
+    )
+
+
+def main():
+    """Start the LitServe server"""
+    settings = config.get('litserve', {}) or {}
+    port = settings.get('port', config['server']['port'])
+    
+    log_success(logger, f"Starting LitServe server on port {port}")
+    log_info(logger, f"  max_batch_size={settings.get('max_batch_size', 4)}, "
+                     f"batch_timeout={settings.get('batch_timeout', 0.5)}s, "
+                     f"workers_per_device={settings.get('workers_per_device', 2)}")
+    log_info(logger, "  POST /predict - URL processing (batched)")
+    log_info(logger, "  POST /enhance - Text enhancement (batched)")
+    
+    server = create_server()
+    server.run(host=config['server']['host'], port=port, generate_client_file=False)
+
+
+if __name__ == "__main__":
+    main()
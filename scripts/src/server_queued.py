@@ -1,6 +1,10 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Literal
+from datetime import datetime
+import asyncio
 import sys
 import os
 
@@ -8,8 +12,17 @@ import os
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 sys.path.insert(0, project_root)
 
-from scripts.src.utils.queue_manager import add_to_queue, get_queue, get_pending_requests
+from scripts.src.utils.queue_manager import add_to_queue, get_queue, get_pending_requests, get_user_positions
 from scripts.src.config.loader import load_config
+from scripts.src.utils.concurrency import get_llm_limiter
+from scripts.src.utils.http_client import http_metrics
+from scripts.src.utils.results_store import get_results_store
+from scripts.src.utils.drafts import get_draft_store
+from scripts.src.utils.publish_scheduler import publish_now
+from scripts.src.utils.dedup_index import get_dedup_index
+from scripts.src.utils.batch_progress import BatchRunner
+from scripts.src.utils.single_flight import summary_flight
+from scripts.src.bot.webhook import mount_webhook
 
 # Create FastAPI app
 app = FastAPI(
@@ -19,12 +32,27 @@ app = FastAPI(
 )
 
 config = load_config()
+batches = BatchRunner()
+
+# With telegram.mode: webhook the bot runs in this process (no run_bot.py)
+bot_webhook = mount_webhook(app, config)
+
+# Longest a GET /batches/{id} long-poll is held open
+MAX_BATCH_WAIT = 30
 
 
 class PredictRequest(BaseModel):
     """Request model for URL processing"""
     url: str
     platforms: Optional[Dict[str, bool]] = None
+    user_id: Optional[str] = None
+    priority: Literal["urgent", "normal", "low"] = "normal"
+    publish_by: Optional[datetime] = None
+
+
+class DraftUpdate(BaseModel):
+    """Reviewed text for a draft"""
+    text: str
 
 
 class EnhanceRequest(BaseModel):
@@ -32,6 +60,9 @@ class EnhanceRequest(BaseModel):
     text: str
     platforms: Optional[Dict[str, bool]] = None
     image_path: Optional[str] = None
+    user_id: Optional[str] = None
+    priority: Literal["urgent", "normal", "low"] = "normal"
+    publish_by: Optional[datetime] = None
 
 
 @app.get("/")
@@ -51,8 +82,17 @@ async def root():
             "POST /predict": "Add URL to queue",
             "POST /enhance": "Add text enhancement to queue",
             "GET /queue": "View current queue",
-            "GET /queue/status": "Get queue status",
-            "POST /process/all": "Process all requests now"
+            "GET /queue/status": "Queue status and per-user positions (?user_id= adds yours)",
+            "POST /process/all": "Process all requests now",
+            "POST /batches": "Process all requests in the background (202 + batch ID)",
+            "GET /batches/{batch_id}": "Batch progress; ?since=<version>&wait=<s> long-polls for the next change",
+            "GET /results": "Query stored results (url, platform, status, since, until)",
+            "GET /drafts": "Generated per-platform posts (status, platform, request_id)",
+            "PATCH /drafts/{draft_id}": "Edit a draft's text before it goes out",
+            "POST /drafts/{draft_id}/publish": "Publish (or re-publish a failed) draft now, without the LLM; ?force=true for a flagged duplicate",
+            "GET /dedup/check": "Published posts a url or text would duplicate (url, text, platform)",
+            "GET /metrics/llm": "LLM concurrency limiter stats",
+            "GET /metrics/http": "Outbound HTTP calls and circuit breakers"
         }
     }
 
@@ -66,8 +106,10 @@ async def predict(request: PredictRequest):
         "platforms": request.platforms or {}
     }
     
-    result = add_to_queue(request_data)
-    return result
+    # The duplicate check reads the dedup index (loaded from SQLite on first use)
+    result = await run_in_threadpool(add_to_queue, request_data, user_id=request.user_id,
+                                     priority=request.priority, publish_by=request.publish_by)
+    return queued_response(result)
 
 
 @app.post("/enhance")
@@ -80,8 +122,19 @@ async def enhance(request: EnhanceRequest):
         "image_path": request.image_path
     }
     
-    result = add_to_queue(request_data)
-    return result
+    result = await run_in_threadpool(add_to_queue, request_data, user_id=request.user_id,
+                                     priority=request.priority, publish_by=request.publish_by)
+    return queued_response(result)
+
+
+def queued_response(result: Dict):
+    """429 with Retry-After when the submitting user is over quota, 409 for a duplicate"""
+    if result.get("status") == "duplicate":
+        return JSONResponse(status_code=409, content=result)
+    if result.get("status") != "rejected":
+        return result
+    headers = {"Retry-After": str(result["retry_after"])} if result.get("retry_after") else None
+    return JSONResponse(status_code=429, headers=headers, content=result)
 
 
 @app.get("/queue")
@@ -99,34 +152,148 @@ async def view_queue():
 
 
 @app.get("/queue/status")
-async def queue_status():
-    """Get queue status"""
+async def queue_status(user_id: Optional[str] = None):
+    """Get queue status, with each user's positions in processing order"""
     queue = get_queue()
     pending = get_pending_requests()
+    users = get_user_positions()
     scheduled_time = config.get('scheduler', {}).get('time', '23:00')
     
-    return {
+    status = {
         "total": len(queue),
         "pending": len(pending),
+        "parked": sum(1 for item in queue if item.get("status") == "parked"),
         "next_processing": scheduled_time,
-        "mode": "process_all"
+        "mode": "process_all",
+        "users": users
     }
+    if user_id is not None:
+        status["you"] = users.get(user_id, {"pending": 0, "positions": []})
+    return status
 
 
 @app.post("/process/all")
 async def trigger_process_all():
     """Trigger processing of all requests immediately"""
     from scripts.src.scheduler.processor import process_all_queue
-    result = process_all_queue()
+    # Off the event loop so status endpoints keep answering meanwhile; a
+    # /batches run already going is waited for, not raced
+    result = await run_in_threadpool(process_all_queue)
     return result
 
 
+@app.post("/batches")
+async def start_batch():
+    """Process the queue in the background; a batch already running is returned instead"""
+    from scripts.src.scheduler.processor import process_all_queue
+    progress = batches.start(lambda p: process_all_queue(progress=p))
+    return JSONResponse(
+        status_code=202,
+        headers={"Location": f"/batches/{progress.batch_id}"},
+        content=progress.snapshot()
+    )
+
+
+@app.get("/batches/{batch_id}")
+async def batch_status(batch_id: str, since: Optional[int] = None, wait: float = 0):
+    """Progress of a batch, waiting up to `wait` seconds for a version newer than `since`"""
+    progress = batches.get(batch_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    if since is None or wait <= 0:
+        return progress.snapshot()
+    return await asyncio.to_thread(progress.wait_for_change, since, min(wait, MAX_BATCH_WAIT))
+
+
+@app.get("/results")
+async def results(url: Optional[str] = None, platform: Optional[str] = None, status: Optional[str] = None,
+                  since: Optional[str] = None, until: Optional[str] = None, limit: int = 50, offset: int = 0):
+    """Stored pipeline results, newest first"""
+    store = get_results_store()
+    items = store.query(url=url, platform=platform, status=status, since=since, until=until,
+                        limit=min(limit, 500), offset=offset)
+    return {"count": len(items), "items": items}
+
+
+@app.get("/results/{result_id}")
+async def result(result_id: int):
+    """One stored result"""
+    item = get_results_store().get(result_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    return item
+
+
+@app.get("/drafts")
+async def drafts(status: Optional[str] = None, platform: Optional[str] = None, request_id: Optional[int] = None,
+                 limit: int = 50, offset: int = 0):
+    """Stored drafts, newest first"""
+    items = get_draft_store().query(status=status, platform=platform, request_id=request_id,
+                                    limit=min(limit, 500), offset=offset, newest_first=True)
+    return {"count": len(items), "items": items}
+
+
+@app.get("/drafts/{draft_id}")
+async def draft(draft_id: int):
+    """One draft"""
+    item = get_draft_store().get(draft_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Draft not found")
+    return item
+
+
+@app.patch("/drafts/{draft_id}")
+async def edit_draft(draft_id: int, update: DraftUpdate):
+    """Replace the text of a draft that has not been published"""
+    store = get_draft_store()
+    if store.get(draft_id) is None:
+        raise HTTPException(status_code=404, detail="Draft not found")
+    if not store.update_text(draft_id, update.text):
+        raise HTTPException(status_code=409, detail="Draft is already published or being published")
+    return store.get(draft_id)
+
+
+@app.post("/drafts/{draft_id}/publish")
+async def publish_draft_now(draft_id: int, force: bool = False):
+    """Send a draft right away; only the platform call runs, no crew. force=true skips the duplicate check"""
+    if get_draft_store().get(draft_id) is None:
+        raise HTTPException(status_code=404, detail="Draft not found")
+    outcome = await run_in_threadpool(publish_now, draft_id, None, force)
+    if outcome is None:
+        raise HTTPException(status_code=409, detail="Draft is already published or being published")
+    return outcome
+
+
+@app.get("/dedup/check")
+async def dedup_check(url: Optional[str] = None, text: Optional[str] = None, platform: Optional[str] = None):
+    """Near-duplicates of a URL or text among published posts, closest first"""
+    matches = await run_in_threadpool(lambda: get_dedup_index().find(text=text, url=url,
+                                                                     platforms=[platform] if platform else None))
+    return {"duplicate": bool(matches), "matches": matches[:10]}
+
+
+@app.get("/metrics/llm")
+async def llm_metrics():
+    """LLM concurrency limit, queue waits and calls saved by coalescing"""
+    return {
+        "limiter": get_llm_limiter().stats(),
+        "coalescing": summary_flight.stats()
+    }
+
+
+@app.get("/metrics/http")
+async def outbound_http_metrics():
+    """Requests, retries, latency and breaker state per outbound client"""
+    return http_metrics()
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint"""
     return {
         "status": "healthy",
         "mode": "queued_unlimited",
+        "telegram_bot": "webhook" if bot_webhook else "polling (run_bot.py)",
         "scheduled_time": config.get('scheduler', {}).get('time', '23:00')
     }
 
@@ -149,6 +316,12 @@ if __name__ == '__main__':
     print("  GET  /queue         - View current queue")
     print("  GET  /queue/status  - Get queue status")
     print("  POST /process/all   - Process all NOW")
+    print("  POST /batches       - Process queue in the background")
+    print("  GET  /batches/{id}  - Batch progress (long-poll)")
+    print("  GET  /results       - Query stored results")
+    print("  GET  /drafts        - Generated posts; POST /drafts/{id}/publish re-sends one")
+    print("  GET  /metrics/llm   - LLM limiter stats")
+    print("  GET  /metrics/http  - Outbound HTTP stats")
     print("  GET  /health        - Health check")
     print()
     print("=" * 60)
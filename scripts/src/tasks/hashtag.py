@@ -1,7 +1,15 @@
 from crewai import Task, Agent
 
 
-def create_hashtag_task(agent: Agent, context_tasks: list, platform: str = "all") -> Task:
+PLATFORM_GUIDELINES = {
+    "twitter": "2-3 hashtags maximum, mix of popular and niche",
+    "linkedin": "3-5 hashtags, professional and industry-specific",
+    "telegram": "3-4 hashtags, community-focused",
+    "all": "Generate separate hashtag sets for each platform"
+}
+
+
+def create_hashtag_task(agent: Agent, context_tasks: list, platform: str = "all", content: str = None) -> Task:
     """
     Create the hashtag generation task
     
@@ -9,21 +17,16 @@ def create_hashtag_task(agent: Agent, context_tasks: list, platform: str = "all"
         agent: The hashtag generator agent
         context_tasks: Previous tasks (summary, written content)
         platform: Target platform (twitter, linkedin, telegram, or all)
+        content: Already generated summary to use instead of a context task
     """
     
-    platform_guidelines = {
-        "twitter": "2-3 hashtags maximum, mix of popular and niche",
-        "linkedin": "3-5 hashtags, professional and industry-specific",
-        "telegram": "3-4 hashtags, community-focused",
-        "all": "Generate separate hashtag sets for each platform"
-    }
-    
-    guideline = platform_guidelines.get(platform, platform_guidelines["all"])
+    guideline = PLATFORM_GUIDELINES.get(platform, PLATFORM_GUIDELINES["all"])
+    content_block = f"\n        === CONTENT ===\n        {content}\n" if content else ""
     
     return Task(
         description=f"""
         Analyze the content from previous tasks and generate relevant, effective hashtags.
-        
+        {content_block}        
         PLATFORM: {platform}
         GUIDELINE: {guideline}
         
@@ -8,9 +8,11 @@ def create_linkedin_task(
     author_urn: str,
     source_url: str = None,  # NEW!
     article_title: str = None,  # NEW!
-    article_description: str = None  # NEW!
+    article_description: str = None,  # NEW!
+    image_path: str = None
 ) -> Task:
     """Create the LinkedIn posting task"""
+    image_line = f"\n        - image_path: {image_path}" if image_path else ""
     return Task(
         description=f"""
         Take the message from the previous task and post it to LinkedIn using the LinkedIn Poster tool.
@@ -23,7 +25,7 @@ def create_linkedin_task(
         - author_urn: {author_urn}
         - source_url: {source_url or 'https://example.com'}
         - article_title: {article_title or 'Article'}
-        - article_description: {article_description or 'Read more'}
+        - article_description: {article_description or 'Read more'}{image_line}
         
         Execute the LinkedIn Poster tool NOW with these exact parameters.
         
@@ -1,8 +1,9 @@
 from crewai import Task, Agent
 from scripts.src.utils.template_loader import template_loader
+from scripts.src.utils.post_validators import make_post_guardrail
 
 
-def create_social_task(agent: Agent, context_tasks: list, source_url: str, social_links: dict) -> Task:
+def create_social_task(agent: Agent, context_tasks: list, source_url: str, social_links: dict, extra_context: str = "") -> Task:
     """Create the social media posting task"""
     
     description = template_loader.load(
@@ -15,8 +16,10 @@ def create_social_task(agent: Agent, context_tasks: list, source_url: str, socia
     )
     
     return Task(
-        description=description,
+        description=description + extra_context,
         agent=agent,
         expected_output="A simple, conversational Telegram post with HTML formatting, clickable links to article and social media.",
         context=context_tasks,
+        guardrail=make_post_guardrail('telegram', allow_split=True),
+        guardrail_max_retries=1,
     )
\ No newline at end of file
@@ -2,7 +2,8 @@ from crewai import Task, Agent
 from scripts.src.utils.template_loader import template_loader
 
 
-def create_telegram_task(agent: Agent, context_tasks: list, bot_token: str, channel_id: str) -> Task:
+def create_telegram_task(agent: Agent, context_tasks: list, bot_token: str, channel_id: str,
+                         image_path: str = None) -> Task:
     """Create the Telegram posting task"""
     
     description = template_loader.load(
@@ -10,6 +11,8 @@ def create_telegram_task(agent: Agent, context_tasks: list, bot_token: str, chan
         bot_token=bot_token,
         channel_id=channel_id
     )
+    if image_path:
+        description += f"\n\nAlso pass image_path: {image_path} to the tool so the image is posted with the message."
     
     return Task(
         description=description,
@@ -3,8 +3,10 @@ from crewai import Task, Agent
 
 def create_twitter_task(agent: Agent, context_tasks: list,
                        api_key: str, api_secret: str, 
-                       access_token: str, access_token_secret: str) -> Task:
+                       access_token: str, access_token_secret: str,
+                       image_path: str = None) -> Task:
     """Create the Twitter posting task"""
+    image_line = f"\n        - image_path: {image_path}" if image_path else ""
     return Task(
         description=f"""
         Take the message from the previous task and post it to Twitter using the Twitter Poster tool.
@@ -25,7 +27,7 @@ def create_twitter_task(agent: Agent, context_tasks: list,
         - api_key: {api_key}
         - api_secret: {api_secret}
         - access_token: {access_token}
-        - access_token_secret: {access_token_secret}
+        - access_token_secret: {access_token_secret}{image_line}
         
         After using the tool, you will see a confirmation like:
         "✅ Successfully posted to Twitter! Tweet ID: [number]"
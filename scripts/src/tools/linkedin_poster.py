@@ -1,81 +1,26 @@
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 from typing import Type, Optional
-import requests
 import logging
-from datetime import datetime
-import os
-import re
 
-# Create logs directory if it doesn't exist
-logs_dir = "/home/ubuntu7/m15kh/own/AgenticSocial/logs"
-os.makedirs(logs_dir, exist_ok=True)
+from scripts.src.utils.http_client import get_http_client
+from scripts.src.utils.logger import get_file_logger, log_event
+from scripts.src.utils.media_uploader import get_media_uploader
+from scripts.src.utils.text_normalizer import normalize_text
 
-# Setup logging with timestamp
-current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-debug_file = os.path.join(logs_dir, f"linkedin_debug_{current_time}.log")
-
-# Configure logger
+# File output is attached lazily on the first post (see get_file_logger)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-
-# File handler for debug logs
-file_handler = logging.FileHandler(debug_file)
-file_handler.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
 
 
 def clean_linkedin_text(text: str) -> str:
     """
     Clean text for LinkedIn by replacing problematic characters and formats
-    
-    Rules applied:
-    1. Replace (ABC) with [ABC] - parentheses to square brackets
-    2. Remove markdown bold **text** -> text
-    3. Remove markdown italic *text* -> text
-    4. Remove markdown headers # -> nothing
-    5. Clean up multiple spaces
-    6. Remove markdown links [text](url) -> text url
+
+    Parentheses become square brackets, markdown bold/italic/headers/links
+    are removed, and runs of spaces and blank lines are collapsed - all in
+    one pass of the shared LinkedIn rule set.
     """
-    
-    logger.debug(f"Original text length: {len(text)}")
-    logger.debug(f"Original text preview: {text[:200]}")
-    
-    # 1. CRITICAL: Replace parentheses with square brackets
-    # Matches: (ABC) or (Some Text) and replaces with [ABC] or [Some Text]
-    text = re.sub(r'\(([^)]+)\)', r'[\1]', text)
-    logger.debug("Applied parentheses replacement")
-    
-    # 2. Remove markdown bold **text**
-    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-    logger.debug("Removed markdown bold")
-    
-    # 3. Remove markdown italic *text* (but not asterisks in bullet points)
-    text = re.sub(r'(?<!\*)\*(?!\*)([^*]+)\*(?!\*)', r'\1', text)
-    logger.debug("Removed markdown italic")
-    
-    # 4. Remove markdown headers
-    text = re.sub(r'^#+\s+', '', text, flags=re.MULTILINE)
-    logger.debug("Removed markdown headers")
-    
-    # 5. Remove markdown links [text](url) -> text url
-    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'\1 \2', text)
-    logger.debug("Removed markdown links")
-    
-    # 6. Clean up multiple spaces (but preserve intentional line breaks)
-    text = re.sub(r' +', ' ', text)
-    logger.debug("Cleaned up multiple spaces")
-    
-    # 7. Clean up multiple newlines (max 2 consecutive)
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    logger.debug("Cleaned up multiple newlines")
-    
-    logger.debug(f"Cleaned text length: {len(text)}")
-    logger.debug(f"Cleaned text preview: {text[:200]}")
-    
-    return text.strip()
+    return normalize_text(text, 'linkedin')
 
 
 class LinkedInPosterInput(BaseModel):
@@ -103,33 +48,24 @@ class LinkedInPosterTool(BaseTool):
         source_url: str,
         article_title: Optional[str] = None,
         article_description: Optional[str] = None,
-        image_path: Optional[str] = None
+        image_path: Optional[str] = None,
+        media_handle: Optional[str] = None
     ) -> str:
-        logger.debug(f"=" * 80)
-        logger.debug(f"Starting LinkedIn post operation")
-        logger.debug(f"Author URN: {author_urn}")
-        logger.debug(f"Source URL: {source_url}")
-        logger.debug(f"Article title (before clean): {article_title}")
-        logger.debug(f"Image path provided: {image_path is not None}")
-        logger.debug(f"=" * 80)
+        get_file_logger(__name__)
+        log_event(logger, logging.DEBUG, "linkedin.post.start",
+                  author_urn=author_urn, source_url=source_url,
+                  article_title=article_title, has_image=image_path is not None)
         
         try:
             # CRITICAL: Clean the message text BEFORE posting
-            logger.debug("=" * 80)
-            logger.debug("CLEANING MESSAGE TEXT")
-            logger.debug("=" * 80)
-            logger.debug(f"Message BEFORE cleaning:\n{message}\n")
-            
             cleaned_message = clean_linkedin_text(message)
-            
-            logger.debug(f"\nMessage AFTER cleaning:\n{cleaned_message}\n")
-            logger.debug("=" * 80)
+            log_event(logger, logging.DEBUG, "linkedin.post.cleaned",
+                      chars_before=len(message), chars_after=len(cleaned_message),
+                      message=cleaned_message)
             
             # Also clean the article title
             if article_title:
-                logger.debug(f"Article title BEFORE cleaning: {article_title}")
                 cleaned_title = clean_linkedin_text(article_title)
-                logger.debug(f"Article title AFTER cleaning: {cleaned_title}")
             else:
                 cleaned_title = "Article"
             
@@ -146,8 +82,6 @@ class LinkedInPosterTool(BaseTool):
                 "Content-Type": "application/json"
             }
             
-            logger.debug("Headers prepared for API request")
-            
             # Build payload dynamically
             payload = {
                 "author": author_urn,
@@ -167,57 +101,35 @@ class LinkedInPosterTool(BaseTool):
                         "description": cleaned_description  # USE CLEANED DESCRIPTION
                     }
                 }
-                logger.debug(f"Article content added with cleaned data")
             
-            logger.debug("Payload prepared for API request")
-            logger.debug(f"Full payload: {payload}")
-
-            # Handle image upload if provided
-            if image_path:
-                logger.debug(f"Attempting to upload image: {image_path}")
-                
-                # Initialize upload
-                init_response = requests.post(
-                    "https://api.linkedin.com/rest/images?action=initializeUpload",
-                    headers=headers,
-                    json={"initializeUploadRequest": {"owner": author_urn}}
-                )
-                
-                logger.debug(f"Image init response: {init_response.status_code}")
-                
-                if init_response.status_code != 200:
-                    raise Exception(f"Failed to initialize image upload: {init_response.text}")
-
-                upload_data = init_response.json()
-                upload_url = upload_data["value"]["uploadUrl"]
-                image_urn = upload_data["value"]["image"]
-
-                # Upload image
-                with open(image_path, "rb") as f:
-                    upload_response = requests.put(
-                        upload_url, 
-                        data=f, 
-                        headers={"Content-Type": "image/png"}
+            log_event(logger, logging.DEBUG, "linkedin.post.payload", headers=headers, payload=payload)
+
+            # Handle image upload if provided - usually already running (or
+            # finished) in the background since the request was dequeued;
+            # a stored draft passes the image URN it recorded (media_handle).
+            # A failed upload does not cost the post: it goes out without
+            # the image (with the article card, if any)
+            if image_path or media_handle:
+                try:
+                    image_urn = media_handle or get_media_uploader().get(
+                        'linkedin', image_path, access_token=access_token, author_urn=author_urn
                     )
-                
-                logger.debug(f"Image upload response: {upload_response.status_code}")
-                
-                if upload_response.status_code != 201:
-                    raise Exception(f"Failed to upload image: {upload_response.text}")
+                    log_event(logger, logging.DEBUG, "linkedin.image.ready", image_urn=image_urn)
 
-                # Replace article with image (images and articles are mutually exclusive)
-                payload["content"] = {"media": {"id": image_urn}}
-                logger.debug("Image upload completed, replaced article content with image")
+                    # Replace article with image (images and articles are mutually exclusive)
+                    payload["content"] = {"media": {"id": image_urn}}
+                except Exception as e:
+                    logger.warning(f"Posting without image, media upload failed: {e}")
 
-            logger.debug("Sending post request to LinkedIn API")
-            response = requests.post(
+            # 429/503 are resent, a read timeout is not: the post may be up
+            response = get_http_client('linkedin').post(
                 "https://api.linkedin.com/rest/posts",
                 headers=headers,
                 json=payload
             )
             
-            logger.debug(f"LinkedIn API response status: {response.status_code}")
-            logger.debug(f"LinkedIn API response: {response.text[:500]}")
+            log_event(logger, logging.DEBUG, "linkedin.post.response",
+                      status=response.status_code, body=response.text)
 
             if response.status_code == 201:
                 logger.info("Post successfully created on LinkedIn")
@@ -1,9 +1,12 @@
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
-from typing import Type
+from typing import Optional, Type
 import requests
 import logging
 
+from scripts.src.utils.post_validators import validate_post, fix_post
+from scripts.src.utils.telegram_publisher import TelegramError, get_telegram_publisher
+
 logger = logging.getLogger(__name__)
 
 
@@ -12,6 +15,7 @@ class TelegramPosterInput(BaseModel):
     message: str = Field(..., description="Message to post to Telegram channel")
     bot_token: str = Field(..., description="Telegram bot token")
     channel_id: str = Field(..., description="Telegram channel ID")
+    image_path: Optional[str] = Field(None, description="Optional path to an image to post with the message")
 
 
 class TelegramPosterTool(BaseTool):
@@ -19,44 +23,41 @@ class TelegramPosterTool(BaseTool):
     description: str = "Posts messages to a Telegram channel"
     args_schema: Type[BaseModel] = TelegramPosterInput
 
-    def _run(self, message: str, bot_token: str, channel_id: str) -> str:
+    def _run(self, message: str, bot_token: str, channel_id: str, image_path: Optional[str] = None,
+             media_handle: Optional[str] = None) -> str:
         """
-        Post message to Telegram using synchronous requests
+        Post message to Telegram through the shared publisher
         
-        This method is completely synchronous - no async/await needed
+        Long posts are split into several messages, an attached image goes
+        out as a photo (captioned when the post is short enough), and 429s
+        are retried after Telegram's retry_after. media_handle is a file_id
+        recorded earlier for the image (stored drafts), used instead of it.
         """
         try:
-            # Build Telegram API URL
-            url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-            
-            # Prepare payload
-            payload = {
-                "chat_id": channel_id,
-                "text": message,
-                "parse_mode": "HTML",
-                "disable_web_page_preview": False
-            }
-            
-            # Send request (synchronous)
-            response = requests.post(url, json=payload, timeout=10)
+            # The poster agent may have altered the validated draft; repair
+            # locally rather than spending an API call on a 400
+            violations = validate_post('telegram', message, allow_split=True)
+            if violations:
+                logger.warning(f"Repairing Telegram post before sending: {violations[0]}")
+                message = fix_post('telegram', message)
             
-            # Check response
-            if response.status_code == 200:
-                result = response.json()
-                if result.get('ok'):
-                    message_id = result['result']['message_id']
-                    return f"✅ Successfully posted to Telegram! Message ID: {message_id}"
-                else:
-                    error_description = result.get('description', 'Unknown error')
-                    logger.error(f"Telegram API error: {error_description}")
-                    return f"❌ Telegram API error: {error_description}"
+            publisher = get_telegram_publisher(bot_token)
+            if media_handle:
+                photos = [media_handle]
             else:
-                error_text = response.text
-                logger.error(f"HTTP Error {response.status_code}: {error_text}")
-                return f"❌ HTTP Error {response.status_code}: {error_text}"
-                
+                photos = [self._photo(bot_token, image_path)] if image_path else []
+            message_ids = publisher.publish(channel_id, message, photos)
+            
+            if len(message_ids) == 1:
+                return f"✅ Successfully posted to Telegram! Message ID: {message_ids[0]}"
+            return f"✅ Successfully posted to Telegram! Message ID: {message_ids[0]} ({len(message_ids)} messages)"
+        
+        except TelegramError as e:
+            error_msg = f"❌ Telegram API error: {e.description}"
+            logger.error(error_msg)
+            return error_msg
         except requests.exceptions.Timeout:
-            error_msg = "❌ Telegram request timed out (10s limit)"
+            error_msg = "❌ Telegram request timed out"
             logger.error(error_msg)
             return error_msg
         except requests.exceptions.RequestException as e:
@@ -66,4 +67,18 @@ class TelegramPosterTool(BaseTool):
         except Exception as e:
             error_msg = f"❌ Error posting to Telegram: {str(e)}"
             logger.error(error_msg)
-            return error_msg
\ No newline at end of file
+            return error_msg
+
+    def _photo(self, bot_token: str, image_path: str) -> str:
+        """file_id from the background upload when there is one, else the processed file"""
+        from scripts.src.config.loader import load_config
+        from scripts.src.utils.media_uploader import get_media_uploader, platform_credentials
+        from scripts.src.utils.image_processor import prepare_image
+        
+        credentials = platform_credentials('telegram', load_config())
+        if credentials and credentials['bot_token'] == bot_token:
+            try:
+                return get_media_uploader().get('telegram', image_path, **credentials)
+            except Exception as e:
+                logger.warning(f"No Telegram file_id for image, sending the file: {e}")
+        return prepare_image(image_path, 'telegram').path
@@ -1,12 +1,178 @@
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
-from typing import Type
+from typing import Dict, Optional, Type
 import tweepy
+import requests
+import hashlib
+import threading
 import logging
-import re
+import time
+
+from scripts.src.utils.http_client import get_http_client
+from scripts.src.utils.twitter_text import MAX_WEIGHTED_LENGTH, fits_in_tweet, split_thread
 
 logger = logging.getLogger(__name__)
 
+# Longest we sleep for a rate-limit window to reopen before giving up
+MAX_RATE_LIMIT_WAIT = 900
+
+TWEET_ENDPOINT = "POST /2/tweets"
+MEDIA_ENDPOINT = "POST /1.1/media/upload"
+ME_ENDPOINT = "GET /2/users/me"
+
+
+def credential_fingerprint(api_key: str, api_secret: str, access_token: str, access_token_secret: str) -> str:
+    """Stable, non-reversible key for a set of Twitter credentials"""
+    raw = "\x00".join([api_key, api_secret, access_token, access_token_secret])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class RateLimitWindow:
+    """Last seen x-rate-limit-* values for one endpoint"""
+    
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset_at = 0.0
+    
+    def update(self, headers):
+        if "x-rate-limit-remaining" in headers:
+            self.limit = int(headers.get("x-rate-limit-limit", 0)) or self.limit
+            self.remaining = int(headers["x-rate-limit-remaining"])
+            self.reset_at = float(headers.get("x-rate-limit-reset", 0))
+    
+    def wait_time(self) -> float:
+        """Seconds to wait before the next call is allowed (0 if free)"""
+        if self.remaining is None or self.remaining > 0:
+            return 0.0
+        return max(0.0, self.reset_at - time.time() + 1)
+
+
+class TwitterSession:
+    """
+    Authenticated tweepy client plus what we learned about the account
+    
+    Lives for the whole process: the username is looked up once, and the
+    rate-limit headers from every response decide whether to wait before
+    the next call instead of running into a 429.
+    """
+    
+    def __init__(self, api_key: str, api_secret: str, access_token: str, access_token_secret: str):
+        # Raw requests.Response gives us the rate-limit headers
+        self.client = tweepy.Client(
+            consumer_key=api_key,
+            consumer_secret=api_secret,
+            access_token=access_token,
+            access_token_secret=access_token_secret,
+            return_type=requests.Response
+        )
+        # Share the pooled session (and its default timeout) of the twitter client
+        self.http = get_http_client('twitter')
+        self.client.session = self.http.session
+        # Media upload is only on the v1.1 API, which closes its session after
+        # every call - it keeps its own
+        self.api = tweepy.API(tweepy.OAuth1UserHandler(api_key, api_secret, access_token, access_token_secret),
+                              timeout=self.http.policy.timeout[1])
+        self._username = None
+        self._lock = threading.Lock()
+        self.windows: Dict[str, RateLimitWindow] = {}
+    
+    def _window(self, endpoint: str) -> RateLimitWindow:
+        return self.windows.setdefault(endpoint, RateLimitWindow())
+    
+    def _call(self, endpoint: str, fn, **kwargs):
+        """Run one API call, waiting out an exhausted window first"""
+        window = self._window(endpoint)
+        wait = window.wait_time()
+        if wait > MAX_RATE_LIMIT_WAIT:
+            raise RuntimeError(f"Twitter rate limit for {endpoint} resets in {wait:.0f}s")
+        if wait:
+            logger.warning(f"Twitter {endpoint} quota used up, waiting {wait:.0f}s")
+            time.sleep(wait)
+        
+        try:
+            with self.http.guard(endpoint):
+                response = fn(**kwargs)
+        except tweepy.TooManyRequests as e:
+            window.update(e.response.headers)
+            wait = window.wait_time()
+            if not wait or wait > MAX_RATE_LIMIT_WAIT:
+                raise
+            logger.warning(f"Twitter {endpoint} returned 429, retrying in {wait:.0f}s")
+            time.sleep(wait)
+            with self.http.guard(endpoint):
+                response = fn(**kwargs)
+        
+        window.update(response.headers)
+        return response.json()
+    
+    @property
+    def username(self) -> str:
+        """Account handle, looked up once per process ("i" if the lookup fails)"""
+        if self._username is None:
+            with self._lock:
+                if self._username is None:
+                    try:
+                        data = self._call(ME_ENDPOINT, self.client.get_me, user_auth=True)
+                        self._username = data["data"]["username"]
+                    except Exception as e:
+                        # x.com/i/status/<id> resolves without the handle
+                        logger.warning(f"Could not look up Twitter username: {e}")
+                        return "i"
+        return self._username
+    
+    def create_tweet(self, **kwargs) -> Dict:
+        return self._call(TWEET_ENDPOINT, self.client.create_tweet, **kwargs)["data"]
+    
+    def upload_media(self, path: str) -> str:
+        """Upload an image file and return its media id"""
+        window = self._window(MEDIA_ENDPOINT)
+        wait = window.wait_time()
+        if wait > MAX_RATE_LIMIT_WAIT:
+            raise RuntimeError(f"Twitter rate limit for {MEDIA_ENDPOINT} resets in {wait:.0f}s")
+        if wait:
+            time.sleep(wait)
+        try:
+            with self.http.guard(MEDIA_ENDPOINT):
+                media = self.api.media_upload(filename=path)
+        except tweepy.TooManyRequests as e:
+            window.update(e.response.headers)
+            raise
+        # tweepy.API keeps the raw response of its last request (the final
+        # chunk of a chunked upload)
+        last_response = getattr(self.api, "last_response", None)
+        if last_response is not None:
+            window.update(last_response.headers)
+        return media.media_id_string
+    
+    def rate_limits(self) -> Dict:
+        return {
+            endpoint: {"remaining": w.remaining, "limit": w.limit, "reset_at": w.reset_at}
+            for endpoint, w in self.windows.items()
+        }
+
+
+_sessions: Dict[str, TwitterSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_twitter_session(api_key: str, api_secret: str, access_token: str, access_token_secret: str) -> TwitterSession:
+    """Cached session for these credentials, created on first use"""
+    key = credential_fingerprint(api_key, api_secret, access_token, access_token_secret)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = TwitterSession(api_key, api_secret, access_token, access_token_secret)
+            _sessions[key] = session
+        return session
+
+
+def drop_twitter_session(api_key: str, api_secret: str, access_token: str, access_token_secret: str):
+    """Forget a session after an auth error so the next call re-authenticates"""
+    key = credential_fingerprint(api_key, api_secret, access_token, access_token_secret)
+    with _sessions_lock:
+        _sessions.pop(key, None)
+
 
 class TwitterPosterInput(BaseModel):
     """Input schema for Twitter Poster"""
@@ -15,6 +181,7 @@ class TwitterPosterInput(BaseModel):
     api_secret: str = Field(..., description="Twitter API secret")
     access_token: str = Field(..., description="Twitter access token")
     access_token_secret: str = Field(..., description="Twitter access token secret")
+    image_path: Optional[str] = Field(None, description="Optional path to an image to attach")
 
 
 class TwitterPosterTool(BaseTool):
@@ -23,113 +190,85 @@ class TwitterPosterTool(BaseTool):
     args_schema: Type[BaseModel] = TwitterPosterInput
 
     def _run(self, message: str, api_key: str, api_secret: str, 
-             access_token: str, access_token_secret: str) -> str:
-        """Post message to Twitter using API v2"""
+             access_token: str, access_token_secret: str, image_path: Optional[str] = None,
+             media_handle: Optional[str] = None) -> str:
+        """Post message to Twitter using API v2 (media_handle: a media id recorded earlier for the image)"""
+        credentials = (api_key, api_secret, access_token, access_token_secret)
+        media_ids = [media_handle] if media_handle else self._media_ids(image_path, *credentials)
+        # Ids of the tweets created so far, so a retry resumes the thread
+        posted = []
         try:
-            # Authenticate with Twitter API v2
-            client = tweepy.Client(
-                consumer_key=api_key,
-                consumer_secret=api_secret,
-                access_token=access_token,
-                access_token_secret=access_token_secret
-            )
-            
-            # Verify credentials
             try:
-                me = client.get_me()
-                username = me.data.username
-            except Exception as auth_error:
-                return f"❌ Twitter authentication failed: {str(auth_error)}"
-            
-            # Twitter has a 280 character limit
-            if len(message) > 280:
-                # Create a thread - KEEP HASHTAGS IN FIRST TWEET
-                tweets = self._split_into_tweets_smart(message)
-                previous_tweet_id = None
-                first_tweet_id = None
-                
-                for i, tweet_text in enumerate(tweets):
-                    if previous_tweet_id:
-                        response = client.create_tweet(
-                            text=tweet_text,
-                            in_reply_to_tweet_id=previous_tweet_id
-                        )
-                    else:
-                        response = client.create_tweet(text=tweet_text)
-                        first_tweet_id = response.data['id']
-                    
-                    previous_tweet_id = response.data['id']
-                
-                return f"✅ Successfully posted to Twitter as a thread ({len(tweets)} tweets)! https://x.com/{username}/status/{first_tweet_id}"
-            else:
-                # Single tweet
-                response = client.create_tweet(text=message)
-                tweet_id = response.data['id']
-                return f"✅ Successfully posted to Twitter! Tweet ID: {tweet_id}\nhttps://x.com/{username}/status/{tweet_id}"
+                return self._post(get_twitter_session(*credentials), message, media_ids, posted)
+            except (tweepy.Unauthorized, tweepy.Forbidden) as auth_error:
+                # Tokens may have been rotated - rebuild the client once
+                if isinstance(auth_error, tweepy.Forbidden) and "authenticat" not in str(auth_error).lower():
+                    raise
+                logger.warning(f"Twitter auth error, refreshing client: {auth_error}")
+                drop_twitter_session(*credentials)
+                try:
+                    return self._post(get_twitter_session(*credentials), message, media_ids, posted)
+                except tweepy.Unauthorized as retry_error:
+                    drop_twitter_session(*credentials)
+                    return f"❌ Twitter authentication failed: {str(retry_error)}"
                 
         except Exception as e:
             error_msg = f"❌ Error posting to Twitter: {str(e)}"
             logger.error(error_msg)
             return error_msg
     
-    def _split_into_tweets_smart(self, text: str, max_length: int = 270) -> list:
+    def _media_ids(self, image_path: Optional[str], api_key: str, api_secret: str,
+                   access_token: str, access_token_secret: str) -> Optional[list]:
+        """Media id for the attached image (uploaded in the background when possible)"""
+        if not image_path:
+            return None
+        from scripts.src.utils.media_uploader import get_media_uploader
+        
+        try:
+            return [get_media_uploader().get(
+                'twitter', image_path, api_key=api_key, api_secret=api_secret,
+                access_token=access_token, access_token_secret=access_token_secret
+            )]
+        except Exception as e:
+            logger.warning(f"Posting without image, media upload failed: {e}")
+            return None
+    
+    def _post(self, session: TwitterSession, message: str, media_ids: Optional[list] = None,
+              posted: Optional[list] = None) -> str:
         """
-        Smart split that keeps hashtags and URLs in the first tweet
+        Post a single tweet or a thread through a cached session (image on the first tweet)
+
+        Created tweet ids are appended to `posted`; tweets already in it
+        (from an attempt that failed part-way) are not posted again.
         """
-        # Extract hashtags and URLs
-        hashtags = re.findall(r'#\w+', text)
-        urls = re.findall(r'https?://[^\s]+', text)
-        
-        # Remove hashtags and URLs temporarily for splitting
-        text_without_special = text
-        for hashtag in hashtags:
-            text_without_special = text_without_special.replace(hashtag, '')
-        for url in urls:
-            text_without_special = text_without_special.replace(url, '')
-        
-        # Clean up extra spaces
-        text_without_special = ' '.join(text_without_special.split())
-        
-        # Split main content
-        words = text_without_special.split()
-        tweets = []
-        current_tweet = ""
-        
-        for word in words:
-            if len(current_tweet) + len(word) + 1 <= max_length - 50:  # Leave room for hashtags/URLs
-                current_tweet += word + " "
-            else:
-                if current_tweet:
-                    tweets.append(current_tweet.strip())
-                current_tweet = word + " "
-        
-        if current_tweet:
-            tweets.append(current_tweet.strip())
-        
-        # Add hashtags and URLs ONLY to the first tweet
-        if tweets:
-            first_tweet = tweets[0]
+        posted = posted if posted is not None else []
+        # Twitter has a 280 weighted-character limit
+        if not fits_in_tweet(message):
+            # Create a thread - KEEP HASHTAGS IN FIRST TWEET
+            tweets = self._split_into_tweets_smart(message)
             
-            # Add URLs first (higher priority)
-            for url in urls:
-                if len(first_tweet) + len(url) + 2 <= max_length:
-                    first_tweet += f"\n{url}"
+            for tweet_text in tweets[len(posted):]:
+                if posted:
+                    data = session.create_tweet(
+                        text=tweet_text,
+                        in_reply_to_tweet_id=posted[-1]
+                    )
+                else:
+                    data = session.create_tweet(text=tweet_text, media_ids=media_ids)
+                posted.append(data['id'])
             
-            # Add hashtags if there's space
-            hashtag_str = " ".join(hashtags)
-            if len(first_tweet) + len(hashtag_str) + 2 <= max_length:
-                first_tweet += f"\n{hashtag_str}"
-            else:
-                # Try to fit as many hashtags as possible
-                for hashtag in hashtags:
-                    if len(first_tweet) + len(hashtag) + 1 <= max_length:
-                        first_tweet += f" {hashtag}"
-            
-            tweets[0] = first_tweet
-        
-        # Add tweet numbers for threads
-        total = len(tweets)
-        if total > 1:
-            tweets = [f"{i+1}/{total} {tweet}" for i, tweet in enumerate(tweets)]
+            return f"✅ Successfully posted to Twitter as a thread ({len(tweets)} tweets)! https://x.com/{session.username}/status/{posted[0]}"
+        else:
+            # Single tweet
+            if not posted:
+                posted.append(session.create_tweet(text=message, media_ids=media_ids)['id'])
+            tweet_id = posted[0]
+            return f"✅ Successfully posted to Twitter! Tweet ID: {tweet_id}\nhttps://x.com/{session.username}/status/{tweet_id}"
+    
+    def _split_into_tweets_smart(self, text: str, max_length: int = MAX_WEIGHTED_LENGTH) -> list:
+        """
+        Smart split that keeps hashtags and URLs in the first tweet
         
-        return tweets
\ No newline at end of file
+        Uses X's weighted counting (URLs = 23, CJK/emoji = 2), see utils/twitter_text.py
+        """
+        return split_thread(text, max_weight=max_length)
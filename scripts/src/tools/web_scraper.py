@@ -1,9 +1,10 @@
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 from typing import Type
-import requests
 from bs4 import BeautifulSoup
 
+from scripts.src.utils.http_client import get_http_client
+
 class WebScraperInput(BaseModel):
     """Input schema for WebScraperTool"""
     url: str = Field(..., description="Website URL to scrape")
@@ -19,7 +20,7 @@ class WebScraperTool(BaseTool):
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=10)
+            response = get_http_client('scraper').get(url, headers=headers)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -0,0 +1,146 @@
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional
+
+from scripts.src.utils.logger import setup_logger, log_info, log_error
+
+logger = setup_logger('BatchProgress')
+
+
+class BatchProgress:
+    """
+    Live state of one queue-processing run
+
+    The processor reports each item as it starts and finishes; readers take
+    snapshot() or block in wait_for_change() until the version moves on,
+    which lets the API long-poll instead of clients hammering it.
+    """
+
+    def __init__(self, batch_id: str):
+        self.batch_id = batch_id
+        self._cond = threading.Condition()
+        self._version = 0
+        self._state = {
+            "batch_id": batch_id,
+            "status": "queued",
+            "created_at": datetime.now().isoformat(),
+            "total": 0,
+            "done": 0,
+            "succeeded": 0,
+            "partial": 0,
+            "failed": 0,
+            "current": None,
+            "platforms": {},
+            "result": None,
+            "error": None,
+        }
+        self._started = None
+
+    def _update(self, **fields):
+        with self._cond:
+            self._state.update(fields)
+            self._version += 1
+            self._cond.notify_all()
+
+    def start(self, total: int):
+        self._started = time.monotonic()
+        self._update(status="running", total=total, started_at=datetime.now().isoformat())
+
+    def add_items(self, count: int):
+        """More items joined the running batch (urgent arrivals)"""
+        with self._cond:
+            self._state["total"] += count
+            self._version += 1
+            self._cond.notify_all()
+
+    def item_started(self, index: int, label: str):
+        self._update(current={"index": index, "label": label})
+
+    def item_finished(self, ok: bool, posted: Iterable[str] = (), failed: Iterable[str] = ()):
+        """ok: the item went out; with some failed platforms it also counts as partial"""
+        failed = list(failed)
+        with self._cond:
+            state = self._state
+            platforms = {name: dict(counts) for name, counts in state["platforms"].items()}
+            for name in posted:
+                platforms.setdefault(name, {"ok": 0, "failed": 0})["ok"] += 1
+            for name in failed:
+                platforms.setdefault(name, {"ok": 0, "failed": 0})["failed"] += 1
+            state.update(
+                done=state["done"] + 1,
+                succeeded=state["succeeded"] + ok,
+                partial=state["partial"] + (ok and bool(failed)),
+                failed=state["failed"] + (not ok),
+                platforms=platforms,
+            )
+            self._version += 1
+            self._cond.notify_all()
+
+    def finish(self, result: Dict = None, error: str = None):
+        self._update(status="failed" if error else "completed", current=None, result=result, error=error,
+                     finished_at=datetime.now().isoformat())
+
+    def snapshot(self) -> Dict:
+        with self._cond:
+            state = dict(self._state, version=self._version)
+        state["eta_seconds"] = self._eta(state)
+        return state
+
+    def _eta(self, state: Dict) -> Optional[int]:
+        """Average time per finished item times what is left"""
+        if state["status"] != "running" or not state["done"] or self._started is None:
+            return None
+        per_item = (time.monotonic() - self._started) / state["done"]
+        return round(per_item * (state["total"] - state["done"]))
+
+    def wait_for_change(self, version: int, timeout: float) -> Dict:
+        """Snapshot once the version differs from `version` (or after timeout)"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._version != version, timeout=timeout)
+        return self.snapshot()
+
+    @property
+    def finished(self) -> bool:
+        return self._state["status"] in ("completed", "failed")
+
+
+class BatchRunner:
+    """
+    Runs queue processing in a background thread, one batch at a time
+
+    Starting while a batch is running returns the running one, so a double
+    tap on /processall does not process the queue twice.
+    """
+
+    def __init__(self, max_history: int = 20):
+        self.max_history = max_history
+        self._lock = threading.Lock()
+        self._batches: Dict[str, BatchProgress] = {}
+        self._running: Optional[BatchProgress] = None
+
+    def start(self, fn: Callable[[BatchProgress], Dict]) -> BatchProgress:
+        with self._lock:
+            if self._running is not None and not self._running.finished:
+                return self._running
+            progress = BatchProgress(uuid.uuid4().hex[:12])
+            self._batches[progress.batch_id] = progress
+            while len(self._batches) > self.max_history:
+                del self._batches[next(iter(self._batches))]
+            self._running = progress
+
+        def run():
+            try:
+                progress.finish(result=fn(progress))
+            except Exception as e:
+                log_error(logger, f"Batch {progress.batch_id} failed: {e}")
+                progress.finish(error=str(e))
+            log_info(logger, f"Batch {progress.batch_id} {progress.snapshot()['status']}")
+
+        threading.Thread(target=run, name=f"batch-{progress.batch_id}", daemon=True).start()
+        return progress
+
+    def get(self, batch_id: str) -> Optional[BatchProgress]:
+        with self._lock:
+            return self._batches.get(batch_id)
@@ -0,0 +1,197 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from scripts.src.utils.logger import setup_logger, log_info, log_warning
+
+logger = setup_logger('Concurrency')
+
+TIMEOUT_MARKERS = ('timeout', 'timed out', 'readtimeout')
+
+
+class LimiterTimeout(Exception):
+    """Raised when a caller waited too long for a free slot"""
+
+
+def is_timeout_error(error: BaseException) -> bool:
+    """Best-effort check whether an exception came from a timed out LLM call"""
+    if isinstance(error, (TimeoutError, LimiterTimeout)):
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in TIMEOUT_MARKERS)
+
+
+class AIMDLimiter:
+    """
+    Adaptive concurrency limiter (additive increase, multiplicative decrease)
+
+    While callers are queueing, the limit grows by one slot for every `limit`
+    calls that finish under the latency target. It is cut by `backoff`
+    whenever a call times out or the latency drifts above the target.
+    """
+
+    def __init__(
+        self,
+        name: str = 'llm',
+        initial_limit: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 8,
+        target_latency: float = 60.0,
+        backoff: float = 0.5,
+        tolerance: float = 1.5,
+        window: int = 50,
+    ):
+        self.name = name
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.target_latency = float(target_latency)
+        self.backoff = float(backoff)
+        self.tolerance = float(tolerance)
+
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+
+        self._latencies = deque(maxlen=window)
+        self._queue_waits = deque(maxlen=window)
+        self._completed = 0
+        self._timeouts = 0
+        self._errors = 0
+
+    @property
+    def limit(self) -> int:
+        """Current number of calls allowed to run at once"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """Block until a slot is free; returns the time spent waiting"""
+        started = time.monotonic()
+        with self._cond:
+            self._waiting += 1
+            try:
+                while self._in_flight >= int(self._limit):
+                    remaining = None
+                    if timeout is not None:
+                        remaining = timeout - (time.monotonic() - started)
+                        if remaining <= 0:
+                            raise LimiterTimeout(
+                                f"No free {self.name} slot after {timeout:.0f}s "
+                                f"(limit={self.limit}, in_flight={self._in_flight})"
+                            )
+                    self._cond.wait(remaining)
+                self._in_flight += 1
+            finally:
+                self._waiting -= 1
+
+        waited = time.monotonic() - started
+        self._queue_waits.append(waited)
+        return waited
+
+    def release(self, latency: Optional[float] = None, timed_out: bool = False, failed: bool = False):
+        """Free a slot and feed the observed outcome back into the limit"""
+        with self._cond:
+            # Only grow when the limit was actually the bottleneck
+            saturated = self._waiting > 0 or self._in_flight >= int(self._limit)
+            self._in_flight = max(0, self._in_flight - 1)
+            self._completed += 1
+
+            if timed_out:
+                self._timeouts += 1
+                self._decrease("timeout")
+            elif failed:
+                # Plain failures say nothing about backend load
+                self._errors += 1
+            elif latency is not None:
+                self._latencies.append(latency)
+                if latency > self.target_latency * self.tolerance:
+                    self._decrease(f"latency {latency:.1f}s > target {self.target_latency:.1f}s")
+                elif latency <= self.target_latency and saturated:
+                    self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+            self._cond.notify_all()
+
+    def _decrease(self, reason: str):
+        old_limit = self.limit
+        self._limit = max(float(self.min_limit), self._limit * self.backoff)
+        if self.limit != old_limit:
+            log_warning(logger, f"[{self.name}] Backing off {old_limit} -> {self.limit} ({reason})")
+
+    @contextmanager
+    def slot(self, units: int = 1, timeout: Optional[float] = None):
+        """
+        Hold a slot for the duration of the block
+
+        Args:
+            units: Number of LLM calls the block makes; latency is divided
+                by this so a 6-task crew is judged per task, not as a whole
+            timeout: Max seconds to wait for a free slot
+        """
+        self.acquire(timeout=timeout)
+        started = time.monotonic()
+        try:
+            yield self
+        except BaseException as e:
+            self.release(timed_out=is_timeout_error(e), failed=True)
+            raise
+        else:
+            elapsed = time.monotonic() - started
+            self.release(latency=elapsed / max(1, units))
+
+    def run(self, fn: Callable, *args, units: int = 1, **kwargs):
+        """Call fn(*args, **kwargs) inside a slot"""
+        with self.slot(units=units):
+            return fn(*args, **kwargs)
+
+    def stats(self) -> Dict:
+        """Snapshot of the limiter state for status endpoints and logs"""
+        with self._cond:
+            waits = sorted(self._queue_waits)
+            latencies = list(self._latencies)
+            return {
+                "name": self.name,
+                "limit": self.limit,
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "target_latency": self.target_latency,
+                "avg_latency": round(sum(latencies) / len(latencies), 2) if latencies else None,
+                "avg_queue_wait": round(sum(waits) / len(waits), 2) if waits else None,
+                "p95_queue_wait": round(waits[int(0.95 * (len(waits) - 1))], 2) if waits else None,
+                "max_queue_wait": round(waits[-1], 2) if waits else None,
+                "completed": self._completed,
+                "timeouts": self._timeouts,
+                "errors": self._errors,
+            }
+
+
+_llm_limiter = None
+_llm_limiter_lock = threading.Lock()
+
+
+def get_llm_limiter() -> AIMDLimiter:
+    """Process-wide limiter shared by every crew kickoff against the LLM backend"""
+    global _llm_limiter
+    if _llm_limiter is None:
+        with _llm_limiter_lock:
+            if _llm_limiter is None:
+                from scripts.src.config.loader import load_config
+
+                settings = load_config().get('llm', {}).get('concurrency', {}) or {}
+                _llm_limiter = AIMDLimiter(
+                    name='llm',
+                    initial_limit=settings.get('initial', 2),
+                    min_limit=settings.get('min', 1),
+                    max_limit=settings.get('max', 8),
+                    target_latency=settings.get('target_latency', 60),
+                    backoff=settings.get('backoff', 0.5),
+                )
+                log_info(logger, f"LLM limiter ready: {_llm_limiter.stats()}")
+    return _llm_limiter
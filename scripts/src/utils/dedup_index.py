@@ -0,0 +1,299 @@
+import datetime
+import functools
+import hashlib
+import itertools
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from scripts.src.utils.logger import setup_logger, log_info, log_warning
+from scripts.src.utils.single_flight import normalize_url
+
+logger = setup_logger('DedupIndex')
+
+DEFAULT_PATH = str(Path(__file__).parents[3] / "data" / "dedup.db")
+
+BITS = 64
+BANDS = 4
+BAND_BITS = BITS // BANDS
+# Shorter texts have too few words for SimHash to mean much; they are
+# only checked by URL
+MIN_WORDS = 8
+# Words every post has; left out so they do not pull unrelated posts together
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how in is it its of on or our so that the their this "
+    "to was we what when which who why will with you your".split()
+)
+URL_PATTERN = re.compile(r'https?://[^\s<>"\]\)]+')
+WORD_PATTERN = re.compile(r'[^\W_]+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    platform TEXT NOT NULL,
+    fingerprint INTEGER NOT NULL,
+    url TEXT,
+    ref TEXT,
+    preview TEXT,
+    published_at TEXT NOT NULL
+);
+"""
+
+
+def tokens(text: str) -> List[str]:
+    """Lowercased content words of a post; links, emojis, punctuation, '#' and stopwords are dropped"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return [word for word in WORD_PATTERN.findall(URL_PATTERN.sub(" ", text)) if word not in STOPWORDS]
+
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash over the set of content words of the text
+
+    Word order, repeats, emojis, hashtag signs and formatting do not
+    count, so posts that differ in a word or two end up a few bits apart
+    while unrelated posts differ in about half the bits. (Word pairs would
+    also catch reordering, but one edited word then moves a short post by
+    up to ten bits.)
+    """
+    weights = [0] * BITS
+    for feature in set(tokens(text)):
+        value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for bit in range(BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def urls_in(text: str) -> List[str]:
+    return URL_PATTERN.findall(text or "")
+
+
+# int.bit_count is Python 3.10+
+_popcount = getattr(int, "bit_count", None) or (lambda value: bin(value).count("1"))
+
+
+def _signed(value: int) -> int:
+    """SQLite integers are signed 64-bit"""
+    return value - (1 << BITS) if value >= 1 << (BITS - 1) else value
+
+
+class DedupIndex:
+    """
+    Local index of published posts for near-duplicate checks
+
+    Every post is kept as a SimHash fingerprint of its normalized text plus
+    its normalized source URL. Fingerprints are split into four 16-bit
+    bands and each post sits in one bucket per band. Two posts at most
+    max_distance bits apart have a band that differs in at most
+    max_distance // 4 bits, so a lookup probes each band's bucket and the
+    buckets that many bits away, and only compares the handful of posts
+    found there instead of the whole history. Buckets live in memory (four
+    entries per post) and are rebuilt from SQLite at startup; posts other
+    processes add (the scheduler publishing while the API takes requests)
+    are read in before each lookup. Nothing leaves the machine.
+    """
+
+    def __init__(self, path: str, max_distance: int = 7, url_window_days: float = 30):
+        self.path = path
+        self.max_distance = max_distance
+        self.url_window = datetime.timedelta(days=url_window_days) if url_window_days else None
+        # Pigeonhole: max_distance differing bits leave some band with at most `radius` of them
+        radius = max_distance // BANDS
+        self._probes = [sum(1 << bit for bit in bits) for flipped in range(radius + 1)
+                        for bits in itertools.combinations(range(BAND_BITS), flipped)]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._posts: Dict[int, tuple] = {}
+        self._buckets: Dict[int, List[tuple]] = defaultdict(list)
+        self._urls: Dict[str, List[int]] = defaultdict(list)
+        # Highest posts.id already in memory
+        self._last_id = 0
+        self._refresh()
+
+    def _refresh(self):
+        """Load rows added since the last call, by this or any other process (call with _lock held)"""
+        rows = self._conn.execute(
+            "SELECT id, platform, fingerprint, url, ref, preview, published_at FROM posts WHERE id > ? ORDER BY id",
+            (self._last_id,)
+        ).fetchall()
+        for row in rows:
+            self._remember(row[0], row[1], row[2] % (1 << BITS), *row[3:])
+        if rows:
+            self._last_id = rows[-1][0]
+
+    @staticmethod
+    def _band_keys(fingerprint: int) -> List[int]:
+        """Bucket key per band: band number in the high bits, band value in the low ones"""
+        mask = (1 << BAND_BITS) - 1
+        return [band << BAND_BITS | fingerprint >> (band * BAND_BITS) & mask for band in range(BANDS)]
+
+    def _remember(self, post_id, platform, fingerprint, url, ref, preview, published_at):
+        self._posts[post_id] = (platform, fingerprint, url, ref, preview, published_at)
+        for key in self._band_keys(fingerprint):
+            self._buckets[key].append((fingerprint, post_id))
+        if url:
+            self._urls[url].append(post_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._posts)
+
+    def _match(self, post_id: int, reason: str, distance: int = None) -> Dict:
+        platform, _, url, ref, preview, published_at = self._posts[post_id]
+        match = {"id": post_id, "reason": reason, "platform": platform, "url": url, "ref": ref, "preview": preview,
+                 "published_at": published_at}
+        if distance is not None:
+            match.update(distance=distance, similarity=round(1 - distance / BITS, 3))
+        return match
+
+    def find(self, text: str = None, url: str = None, platforms: Iterable[str] = None) -> List[Dict]:
+        """
+        Published posts that `text` or `url` would duplicate, closest first
+
+        text matches are posts at most max_distance bits away; url matches
+        are posts of the same source URL within url_window_days. platforms
+        limits both to those platforms (None: any).
+        """
+        platforms = set(platforms) if platforms else None
+        fingerprint = simhash(text) if text and len(tokens(text)) >= MIN_WORDS else None
+        matches = []
+        with self._lock:
+            self._refresh()
+            if fingerprint is not None:
+                close = {}
+                buckets = self._buckets
+                for key in [key ^ mask for key in self._band_keys(fingerprint) for mask in self._probes]:
+                    for other, post_id in buckets.get(key, ()):
+                        distance = _popcount(fingerprint ^ other)
+                        if distance <= self.max_distance:
+                            close[post_id] = distance
+                for post_id, distance in close.items():
+                    if not platforms or self._posts[post_id][0] in platforms:
+                        matches.append(self._match(post_id, "text", distance))
+                matches.sort(key=lambda match: match["distance"])
+            if url:
+                cutoff = (datetime.datetime.now() - self.url_window).isoformat() if self.url_window else ""
+                seen = {match["id"] for match in matches}
+                for post_id in reversed(self._urls.get(normalize_url(url), ())):
+                    platform, published_at = self._posts[post_id][0], self._posts[post_id][5]
+                    if (not platforms or platform in platforms) and published_at >= cutoff and post_id not in seen:
+                        matches.append(self._match(post_id, "url"))
+        return matches
+
+    def add(self, platform: str, text: str, url: str = None, ref=None, published_at: str = None) -> int:
+        """Record a published post (published now unless published_at, an ISO string, says otherwise)"""
+        fingerprint = simhash(text)
+        url = normalize_url(url) if url else None
+        ref = str(ref) if ref is not None else None
+        preview = " ".join((text or "").split())[:80]
+        published_at = published_at or datetime.datetime.now().isoformat()
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(
+                    "INSERT INTO posts (platform, fingerprint, url, ref, preview, published_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (platform, _signed(fingerprint), url, ref, preview, published_at)
+                )
+            self._refresh()
+        return cursor.lastrowid
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._refresh()
+            sizes = [len(bucket) for bucket in self._buckets.values()]
+            return {"posts": len(self._posts), "urls": len(self._urls), "probes": BANDS * len(self._probes),
+                    "largest_bucket": max(sizes, default=0)}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+@functools.lru_cache(maxsize=1)
+def _settings() -> Dict:
+    """config.yaml's dedup section, read once per process"""
+    try:
+        from scripts.src.config.loader import load_config
+
+        return load_config().get('dedup', {}) or {}
+    except Exception:
+        return {}
+
+
+def dedup_action() -> Optional[str]:
+    """"skip" (default) or "flag" for near-duplicates; None when dedup.enabled is false"""
+    settings = _settings()
+    if not settings.get('enabled', True):
+        return None
+    return settings.get('action', 'skip')
+
+
+def backfill_from_drafts(index: DedupIndex) -> int:
+    from scripts.src.utils.drafts import get_draft_store
+
+    try:
+        store = get_draft_store()
+        count, after_id = 0, 0
+        while True:
+            page = store.query(status="published", after_id=after_id, limit=500)
+            if not page:
+                break
+            for draft in page:
+                index.add(draft["platform"], draft["text"], draft_url(draft), ref=draft["id"],
+                          published_at=draft["published_at"])
+            count += len(page)
+            after_id = page[-1]["id"]
+    except Exception as e:
+        log_warning(logger, f"Could not backfill from published drafts: {e}")
+        return 0
+    if count:
+        log_info(logger, f"Indexed {count} published draft(s)")
+    return count
+
+
+def draft_url(draft: Dict) -> Optional[str]:
+    """Source URL of a draft: the queued URL, else the article link it posts"""
+    source = draft.get("source") or ""
+    if URL_PATTERN.fullmatch(source.strip()):
+        return source.strip()
+    return (draft.get("post_args") or {}).get("source_url")
+
+
+_dedup_index: Optional[DedupIndex] = None
+_dedup_index_lock = threading.Lock()
+
+
+def get_dedup_index() -> DedupIndex:
+    """
+    Process-wide index at dedup.path (default data/dedup.db)
+
+    A new index is filled from the drafts already published, so history
+    from before dedup was turned on counts too.
+    """
+    global _dedup_index
+    if _dedup_index is None:
+        with _dedup_index_lock:
+            if _dedup_index is None:
+                settings = _settings()
+                index = DedupIndex(settings.get('path', DEFAULT_PATH), settings.get('max_distance', 7),
+                                   settings.get('url_window_days', 30))
+                if not len(index):
+                    backfill_from_drafts(index)
+                _dedup_index = index
+    return _dedup_index
+
+
+def describe(match: Dict) -> str:
+    """One line for logs, API responses and the bot"""
+    when = match["published_at"][:16].replace("T", " ")
+    if match["reason"] == "url":
+        return f"same link posted to {match['platform']} on {when}"
+    return f"{match['similarity']:.0%} similar to the {match['platform']} post of {when}: \"{match['preview']}\""
@@ -0,0 +1,246 @@
+import datetime
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from scripts.src.utils.logger import setup_logger
+
+logger = setup_logger('DraftStore')
+
+DEFAULT_PATH = str(Path(__file__).parents[3] / "data" / "drafts.db")
+
+# pending: written, not yet given a slot; scheduled: has a publish_at;
+# publishing: claimed by a publisher; published / failed / skipped:
+# outcome of the publish attempt
+STATUSES = ("pending", "scheduled", "publishing", "published", "failed", "skipped")
+# States a draft can be (re-)published or edited from (skipped: a
+# duplicate, which can be edited or forced out)
+PUBLISHABLE = ("pending", "scheduled", "failed", "skipped")
+# Drafts a retry leaves alone: out already, going out, or a duplicate
+SETTLED = ("published", "publishing", "skipped")
+# A claim this old belongs to a publisher that died before recording the
+# outcome (the longest legitimate publish waits out a 15-minute rate limit)
+STALE_CLAIM = datetime.timedelta(minutes=30)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    id INTEGER PRIMARY KEY,
+    request_id INTEGER,
+    platform TEXT NOT NULL,
+    status TEXT NOT NULL,
+    text TEXT NOT NULL,
+    hashtags TEXT,
+    post_args TEXT NOT NULL,
+    media TEXT,
+    source TEXT,
+    created_at TEXT NOT NULL,
+    publish_at TEXT,
+    published_at TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_at TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS drafts_due ON drafts (status, publish_at);
+CREATE INDEX IF NOT EXISTS drafts_platform ON drafts (platform, publish_at);
+CREATE INDEX IF NOT EXISTS drafts_request ON drafts (request_id);
+CREATE INDEX IF NOT EXISTS drafts_source ON drafts (source);
+"""
+
+# Columns added after the first release of the table
+ADDED_COLUMNS = {
+    "hashtags": "TEXT",
+    "media": "TEXT",
+    "attempts": "INTEGER NOT NULL DEFAULT 0",
+    "claimed_at": "TEXT",
+}
+
+
+def draft_source(url: str = None, text: str = None) -> str:
+    """What a draft was written from: the URL, else the start of the text"""
+    return url or (text or "")[:200]
+
+
+def draft_payload(draft: Dict) -> Dict:
+    """A stored draft in the API's draft shape: text, hashtags and the posting arguments"""
+    return {"text": draft["text"], "hashtags": draft["hashtags"], **draft["post_args"]}
+
+
+def _row(row) -> Dict:
+    draft = dict(row)
+    draft["post_args"] = json.loads(draft["post_args"])
+    draft["media"] = json.loads(draft["media"]) if draft["media"] else {}
+    return draft
+
+
+class DraftStore:
+    """
+    Generated posts waiting to be published
+
+    One row per platform post: the writer's text and hashtags, the extra
+    tool arguments (article link, image) publishing needs, the media
+    handles it used, and when it is due. Publishing a draft is only the
+    platform HTTP call, so a failed or edited post can be sent again
+    without rerunning the crews. Times are naive local ISO strings, like
+    the queue's.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(drafts)")}
+        if existing:
+            for column, definition in ADDED_COLUMNS.items():
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE drafts ADD COLUMN {column} {definition}")
+        self._conn.executescript(SCHEMA)
+
+    def add(self, platform: str, text: str, post_args: Dict = None, source: str = None,
+            request_id: int = None, hashtags: str = None) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO drafts (request_id, platform, status, text, hashtags, post_args, source, created_at) "
+                "VALUES (?, ?, 'pending', ?, ?, ?, ?, ?)",
+                (request_id, platform, text, hashtags, json.dumps(post_args or {}), source,
+                 datetime.datetime.now().isoformat())
+            )
+        return cursor.lastrowid
+
+    def get(self, draft_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM drafts WHERE id = ?", (draft_id,)).fetchone()
+        return _row(row) if row else None
+
+    def query(self, status: str = None, platform: str = None, request_id: int = None, after_id: int = 0,
+              limit: int = 50, offset: int = 0, newest_first: bool = False) -> List[Dict]:
+        """Drafts matching the filters, oldest first unless newest_first"""
+        clauses, params = ["id > ?"], [after_id]
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if platform:
+            clauses.append("platform = ?")
+            params.append(platform)
+        if request_id is not None:
+            clauses.append("request_id = ?")
+            params.append(request_id)
+        order = "DESC" if newest_first else ""
+        sql = f"SELECT * FROM drafts WHERE {' AND '.join(clauses)} ORDER BY id {order} LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit, offset]).fetchall()
+        return [_row(row) for row in rows]
+
+    def latest_by_source(self, source: str) -> Dict[str, Dict]:
+        """{platform: newest draft} written from source (see draft_source)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM drafts WHERE source = ? ORDER BY id", (source,)).fetchall()
+        return {row["platform"]: _row(row) for row in rows}
+
+    def slots_taken(self, platform: str, since: datetime.datetime, until: datetime.datetime) -> List[str]:
+        """publish_at of scheduled and published drafts for a platform in [since, until)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT COALESCE(published_at, publish_at) AS at FROM drafts "
+                "WHERE platform = ? AND status IN ('scheduled', 'publishing', 'published') "
+                "AND COALESCE(published_at, publish_at) >= ? AND COALESCE(published_at, publish_at) < ? "
+                "ORDER BY at",
+                (platform, since.isoformat(), until.isoformat())
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def schedule(self, draft_id: int, publish_at: datetime.datetime):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE drafts SET status = 'scheduled', publish_at = ? WHERE id = ?",
+                               (publish_at.isoformat(), draft_id))
+
+    def claim(self, draft_id: int, statuses=("scheduled",)) -> bool:
+        """Take a draft in one of `statuses` for publishing; False if it is not (anymore)"""
+        placeholders = ", ".join("?" for _ in statuses)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE drafts SET status = 'publishing', attempts = attempts + 1, claimed_at = ? "
+                f"WHERE id = ? AND status IN ({placeholders})",
+                (datetime.datetime.now().isoformat(), draft_id, *statuses)
+            )
+        return cursor.rowcount == 1
+
+    def release_stale(self, older_than: datetime.timedelta = STALE_CLAIM) -> int:
+        """
+        Fail drafts left in "publishing" by a publisher that died
+
+        Whether the post went out is unknown, so they are not re-sent
+        automatically; as failed drafts they can be checked and sent again
+        with publish_now().
+        """
+        cutoff = (datetime.datetime.now() - older_than).isoformat()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE drafts SET status = 'failed', "
+                "result = '❌ Publisher stopped before recording the outcome; check the platform before re-sending' "
+                "WHERE status = 'publishing' AND (claimed_at IS NULL OR claimed_at < ?)",
+                (cutoff,)
+            )
+        if cursor.rowcount:
+            logger.warning(f"Released {cursor.rowcount} draft(s) stuck in publishing")
+        return cursor.rowcount
+
+    def update_text(self, draft_id: int, text: str) -> bool:
+        """Replace the text of a draft that has not gone out yet (review edits)"""
+        placeholders = ", ".join("?" for _ in PUBLISHABLE)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE drafts SET text = ? WHERE id = ? AND status IN ({placeholders})",
+                (text, draft_id, *PUBLISHABLE)
+            )
+        return cursor.rowcount == 1
+
+    def set_media(self, draft_id: int, media: Dict):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE drafts SET media = ? WHERE id = ?", (json.dumps(media), draft_id))
+
+    def mark(self, draft_id: int, status: str, result: str = None):
+        if status not in STATUSES:
+            raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+        published_at = datetime.datetime.now().isoformat() if status == "published" else None
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE drafts SET status = ?, result = ?, published_at = ? WHERE id = ?",
+                               (status, result, published_at, draft_id))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            by_status = dict(self._conn.execute("SELECT status, COUNT(*) FROM drafts GROUP BY status").fetchall())
+            next_due = self._conn.execute(
+                "SELECT MIN(publish_at) FROM drafts WHERE status = 'scheduled'").fetchone()[0]
+        return {"by_status": by_status, "next_publish_at": next_due}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_draft_store: Optional[DraftStore] = None
+_draft_store_lock = threading.Lock()
+
+
+def get_draft_store() -> DraftStore:
+    """Process-wide store at storage.drafts_path (default data/drafts.db)"""
+    global _draft_store
+    if _draft_store is None:
+        with _draft_store_lock:
+            if _draft_store is None:
+                try:
+                    from scripts.src.config.loader import load_config
+
+                    settings = load_config().get('storage', {}) or {}
+                except Exception:
+                    settings = {}
+                store = DraftStore(settings.get('drafts_path', DEFAULT_PATH))
+                store.release_stale()
+                _draft_store = store
+    return _draft_store
@@ -0,0 +1,456 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from typing import Dict, FrozenSet, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from scripts.src.utils.logger import setup_logger, log_warning
+
+logger = setup_logger('HttpClient')
+
+DEFAULT_TIMEOUT = (5, 30)
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    When a request is sent again
+
+    Connection errors are always safe to retry (nothing reached the server).
+    A status in `statuses` is retried for idempotent methods; for POST only
+    the ones in `post_statuses`, which mean the request was not processed.
+    """
+    attempts: int = 3
+    backoff: float = 1.0
+    max_backoff: float = 30.0
+    statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+    post_statuses: FrozenSet[int] = frozenset({429, 503})
+    retry_read_timeout: bool = False
+    failure_threshold: int = 5
+    reset_timeout: float = 60.0
+    timeout: tuple = DEFAULT_TIMEOUT
+
+    def delay(self, attempt: int, response: requests.Response = None) -> float:
+        """Retry-After when the server sent one, else capped exponential backoff with jitter"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff)
+        return min(self.backoff * 2 ** (attempt - 1), self.max_backoff) * random.uniform(0.8, 1.2)
+
+
+# Telegram retries live in the publisher (retry_after comes in the JSON
+# body and penalizes one chat); posting endpoints are never resent on a
+# read timeout because the post may already be up
+POLICIES: Dict[str, RetryPolicy] = {
+    'telegram': RetryPolicy(attempts=1, timeout=(5, 30)),
+    'linkedin': RetryPolicy(attempts=3, backoff=2.0, timeout=(5, 60)),
+    'twitter': RetryPolicy(attempts=1, failure_threshold=3, reset_timeout=120.0),
+    'scraper': RetryPolicy(attempts=2, backoff=0.5, post_statuses=frozenset(), retry_read_timeout=True,
+                           failure_threshold=20, reset_timeout=30.0, timeout=(5, 10)),
+    'api': RetryPolicy(attempts=2, backoff=0.5, timeout=(3, 30)),
+    'callback': RetryPolicy(attempts=3, backoff=1.0, failure_threshold=10, timeout=(5, 10)),
+}
+
+
+class _TimeoutAdapter(HTTPAdapter):
+    """Pool adapter that applies a default timeout, also to SDKs sharing the session"""
+
+    def __init__(self, timeout, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=timeout or self.timeout, **kwargs)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Request refused locally because the breaker for its client is open"""
+
+
+class CircuitBreaker:
+    """
+    Stops calling a dependency that keeps failing
+
+    After failure_threshold consecutive failures the breaker opens and
+    requests fail at once; after reset_timeout one trial request is let
+    through (half-open) and its outcome closes or reopens the breaker.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+            # Half-open: a single trial request at a time
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; True if this opened the breaker"""
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                opened = self._state != self.OPEN
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                return opened
+            return False
+
+
+@dataclass
+class RequestMetrics:
+    """Counters for one client"""
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    rejected: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    statuses: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'rejected': self.rejected,
+            'avg_ms': round(self.total_seconds / self.requests * 1000, 1) if self.requests else 0.0,
+            'max_ms': round(self.max_seconds * 1000, 1),
+            'statuses': dict(self.statuses),
+        }
+
+
+class _MeteredClient:
+    """Breaker, metrics and policy shared by the sync and async clients"""
+
+    def __init__(self, name: str, policy: RetryPolicy = None):
+        self.name = name
+        self.policy = policy or RetryPolicy()
+        self.breaker = CircuitBreaker(self.policy.failure_threshold, self.policy.reset_timeout)
+        self._metrics = RequestMetrics()
+        self._lock = threading.Lock()
+
+    def _record(self, seconds: float, status: str, failed: bool):
+        with self._lock:
+            m = self._metrics
+            m.requests += 1
+            m.errors += failed
+            m.total_seconds += seconds
+            m.max_seconds = max(m.max_seconds, seconds)
+            m.statuses[status] = m.statuses.get(status, 0) + 1
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self._metrics, counter, getattr(self._metrics, counter) + 1)
+
+    def _check_breaker(self, what: str):
+        if not self.breaker.allow():
+            self._count('rejected')
+            raise CircuitOpenError(f"{self.name} circuit open, not calling {what}")
+
+    def _failed(self):
+        if self.breaker.record_failure():
+            log_warning(logger, f"[{self.name}] Circuit opened after repeated failures "
+                                f"(retrying in {self.policy.reset_timeout:.0f}s)")
+
+    @contextmanager
+    def guard(self, what: str):
+        """
+        Breaker and metrics around a call made by a third-party SDK
+
+        Any exception counts as a failure except ones carrying a 4xx response
+        (bad input, auth or rate limit - the dependency itself is healthy).
+        """
+        self._check_breaker(what)
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            response = getattr(e, 'response', None)
+            status = getattr(response, 'status_code', None)
+            client_error = status is not None and status < 500
+            self._record(time.monotonic() - started, str(status or type(e).__name__), not client_error)
+            if client_error:
+                self.breaker.record_success()
+            else:
+                self._failed()
+            raise
+        self._record(time.monotonic() - started, 'ok', False)
+        self.breaker.record_success()
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            data = self._metrics.to_dict()
+        data['circuit'] = self.breaker.state
+        return data
+
+
+class HttpClient(_MeteredClient):
+    """
+    Pooled requests.Session with a default timeout, retries and a breaker
+
+    One client per outbound dependency (platform API, scraped sites, the
+    local API server), so a hung LinkedIn endpoint opens LinkedIn's breaker
+    without affecting Telegram, and every call is counted in metrics().
+    """
+
+    def __init__(self, name: str, policy: RetryPolicy = None, pool_maxsize: int = 16):
+        super().__init__(name, policy)
+        self.session = requests.Session()
+        adapter = _TimeoutAdapter(self.policy.timeout, pool_connections=4, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @staticmethod
+    def _rewind(kwargs: Dict) -> bool:
+        """Seek file bodies back to the start; False if one cannot be resent"""
+        bodies = [kwargs.get('data')] + [f[1] if isinstance(f, tuple) else f
+                                         for f in (kwargs.get('files') or {}).values()]
+        for body in bodies:
+            if hasattr(body, 'read'):
+                if not hasattr(body, 'seek'):
+                    return False
+                body.seek(0)
+        return True
+
+    def request(self, method: str, url: str, retry: bool = True, **kwargs) -> requests.Response:
+        """
+        Send a request under this client's policy
+
+        Returns the last response whatever its status (callers keep their
+        own status handling). 5xx and network errors count against the
+        breaker, 4xx do not.
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+            requests.exceptions.RequestException: When out of retries
+        """
+        method = method.upper()
+        policy = self.policy
+        retry_statuses = policy.statuses if method in IDEMPOTENT_METHODS else policy.post_statuses
+        attempts = policy.attempts if retry else 1
+
+        for attempt in range(1, attempts + 1):
+            self._check_breaker(url.split('?')[0])
+            last = attempt == attempts or not self._rewind(kwargs)
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                self._record(time.monotonic() - started, type(e).__name__, True)
+                self._failed()
+                resend = isinstance(e, requests.exceptions.ConnectTimeout) or (
+                    isinstance(e, requests.exceptions.ConnectionError)
+                    and not isinstance(e, requests.exceptions.ReadTimeout)
+                ) or (isinstance(e, requests.exceptions.ReadTimeout) and policy.retry_read_timeout)
+                if last or not resend:
+                    raise
+                self._count('retries')
+                time.sleep(policy.delay(attempt))
+                continue
+
+            status = response.status_code
+            self._record(time.monotonic() - started, str(status), status >= 500)
+            if status >= 500:
+                self._failed()
+            else:
+                self.breaker.record_success()
+            if last or status not in retry_statuses:
+                return response
+            self._count('retries')
+            log_warning(logger, f"[{self.name}] {method} {url.split('?')[0]} returned {status}, retrying")
+            time.sleep(policy.delay(attempt, response))
+            response.close()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request('PUT', url, **kwargs)
+
+
+class AsyncHttpClient(_MeteredClient):
+    """
+    httpx.AsyncClient counterpart of HttpClient for code running on an event loop
+
+    Same policy, breaker and metrics; waits between retries with
+    asyncio.sleep so other coroutines keep running. The connection pool is
+    created on first use, inside the loop that uses it.
+    """
+
+    def __init__(self, name: str, policy: RetryPolicy = None, max_connections: int = 100):
+        super().__init__(name, policy)
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @staticmethod
+    def _timeout(value) -> httpx.Timeout:
+        """(connect, read) tuple or a number of seconds, as with requests"""
+        if isinstance(value, httpx.Timeout):
+            return value
+        if isinstance(value, (list, tuple)):
+            return httpx.Timeout(value[1], connect=value[0])
+        return httpx.Timeout(value)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self._timeout(self.policy.timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=min(20, self.max_connections)),
+            )
+        return self._client
+
+    async def request(self, method: str, url: str, retry: bool = True, **kwargs) -> httpx.Response:
+        """
+        Send a request under this client's policy (see HttpClient.request)
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+            httpx.HTTPError: When out of retries
+        """
+        method = method.upper()
+        policy = self.policy
+        if 'timeout' in kwargs:
+            kwargs['timeout'] = self._timeout(kwargs['timeout'])
+        retry_statuses = policy.statuses if method in IDEMPOTENT_METHODS else policy.post_statuses
+        attempts = policy.attempts if retry else 1
+
+        for attempt in range(1, attempts + 1):
+            self._check_breaker(url.split('?')[0])
+            last = attempt == attempts
+            started = time.monotonic()
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                self._record(time.monotonic() - started, type(e).__name__, True)
+                self._failed()
+                resend = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)) or (
+                    isinstance(e, httpx.ReadTimeout) and policy.retry_read_timeout)
+                if last or not resend:
+                    raise
+                self._count('retries')
+                await asyncio.sleep(policy.delay(attempt))
+                continue
+
+            status = response.status_code
+            self._record(time.monotonic() - started, str(status), status >= 500)
+            if status >= 500:
+                self._failed()
+            else:
+                self.breaker.record_success()
+            if last or status not in retry_statuses:
+                return response
+            self._count('retries')
+            log_warning(logger, f"[{self.name}] {method} {url.split('?')[0]} returned {status}, retrying")
+            await asyncio.sleep(policy.delay(attempt, response))
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('POST', url, **kwargs)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_clients: Dict[str, HttpClient] = {}
+_async_clients: Dict[str, AsyncHttpClient] = {}
+_clients_lock = threading.Lock()
+
+
+def _configured_policy(name: str) -> RetryPolicy:
+    """Built-in policy for name with overrides from the `http` config section"""
+    policy = POLICIES.get(name, RetryPolicy())
+    try:
+        from scripts.src.config.loader import load_config
+
+        settings = load_config().get('http', {}) or {}
+    except Exception:
+        return policy
+    overrides = {**(settings.get('default') or {}), **(settings.get(name) or {})}
+    if 'timeout' in overrides:
+        timeout = overrides['timeout']
+        overrides['timeout'] = tuple(timeout) if isinstance(timeout, (list, tuple)) else (5, float(timeout))
+    for key in ('statuses', 'post_statuses'):
+        if key in overrides:
+            overrides[key] = frozenset(overrides[key])
+    known = RetryPolicy.__dataclass_fields__
+    return replace(policy, **{k: v for k, v in overrides.items() if k in known})
+
+
+def get_http_client(name: str) -> HttpClient:
+    """Process-wide client for an outbound dependency (telegram, linkedin, twitter, scraper, api, callback)"""
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = HttpClient(name, _configured_policy(name))
+                _clients[name] = client
+    return client
+
+
+def get_async_http_client(name: str) -> AsyncHttpClient:
+    """Process-wide async client for an outbound dependency; same policies as get_http_client"""
+    client = _async_clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _async_clients.get(name)
+            if client is None:
+                client = AsyncHttpClient(name, _configured_policy(name))
+                _async_clients[name] = client
+    return client
+
+
+def http_metrics() -> Dict[str, Dict]:
+    """Metrics and breaker state of every client created so far (async ones as `<name>.async`)"""
+    with _clients_lock:
+        clients = [(c.name, c) for c in _clients.values()]
+        clients += [(f"{c.name}.async", c) for c in _async_clients.values()]
+    return {name: client.metrics() for name, client in clients}
@@ -0,0 +1,207 @@
+import hashlib
+import io
+import os
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from scripts.src.utils.logger import setup_logger, log_info, log_warning
+
+logger = setup_logger('ImageProcessor')
+
+# Longest side in pixels and byte budget per platform. LinkedIn and X show
+# feed images at ~1200px wide, Telegram recompresses photos to 1280px.
+PLATFORM_SPECS = {
+    'linkedin': {'max_side': 1200, 'target_bytes': 1_000_000},
+    'twitter': {'max_side': 1600, 'target_bytes': 1_000_000},
+    'telegram': {'max_side': 1280, 'target_bytes': 1_000_000},
+}
+
+MIME_TYPES = {'JPEG': 'image/jpeg', 'PNG': 'image/png', 'GIF': 'image/gif', 'WEBP': 'image/webp'}
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp'}
+
+MIN_JPEG_QUALITY = 45
+MAX_JPEG_QUALITY = 90
+
+
+@dataclass
+class ProcessedImage:
+    """A platform-ready image on disk"""
+    path: str
+    mime_type: str
+    width: int
+    height: int
+    size: int
+    source_hash: str
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def file_hash(path: str) -> str:
+    """sha256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _encode(image: Image.Image, fmt: str, quality: int = None) -> bytes:
+    buffer = io.BytesIO()
+    if fmt == 'JPEG':
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buffer, fmt, optimize=True)
+    return buffer.getvalue()
+
+
+def _fit_jpeg(image: Image.Image, target_bytes: int) -> Tuple[bytes, Image.Image]:
+    """Highest JPEG quality under target_bytes, shrinking the image if even the lowest is too big"""
+    image = image.convert('RGB')
+    while True:
+        low, high, best = MIN_JPEG_QUALITY, MAX_JPEG_QUALITY, None
+        while low <= high:
+            quality = (low + high) // 2
+            data = _encode(image, 'JPEG', quality)
+            if len(data) <= target_bytes:
+                best, low = data, quality + 1
+            else:
+                high = quality - 1
+        if best is not None or min(image.size) <= 64:
+            return best or _encode(image, 'JPEG', MIN_JPEG_QUALITY), image
+        image = image.resize((int(image.width * 0.8), int(image.height * 0.8)), Image.LANCZOS)
+
+
+class ImageProcessor:
+    """
+    Detects the real format, strips metadata, resizes and re-encodes images
+
+    Results are cached on disk by content hash and spec, so platforms with
+    the same spec (and retries) reuse one processed file.
+    """
+
+    def __init__(self, cache_dir: str, specs: Dict[str, Dict] = None):
+        self.cache_dir = cache_dir
+        self.specs = specs or PLATFORM_SPECS
+        self._cache: Dict[Tuple[str, int, int], ProcessedImage] = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def prepare(self, image_path: str, platform: str) -> ProcessedImage:
+        """
+        Platform-ready copy of an image
+
+        Raises:
+            ValueError: If the file is not an image Pillow can read
+        """
+        spec = self.specs.get(platform, PLATFORM_SPECS['linkedin'])
+        source_hash = file_hash(image_path)
+        key = (source_hash, spec['max_side'], spec['target_bytes'])
+
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached and os.path.exists(cached.path):
+            return cached
+
+        processed = self._from_disk(source_hash, spec) or self._process(image_path, source_hash, spec)
+        with self._lock:
+            self._cache[key] = processed
+        return processed
+
+    def prepare_all(self, image_path: str, platforms: Iterable[str]) -> Dict[str, ProcessedImage]:
+        return {platform: self.prepare(image_path, platform) for platform in platforms}
+
+    def _cache_path(self, source_hash: str, spec: Dict, out_format: str) -> str:
+        name = f"{source_hash[:24]}_{spec['max_side']}_{spec['target_bytes']}.{EXTENSIONS[out_format]}"
+        return os.path.join(self.cache_dir, name)
+
+    def _from_disk(self, source_hash: str, spec: Dict) -> Optional[ProcessedImage]:
+        """Result of an earlier process (e.g. before a restart)"""
+        for out_format in ('JPEG', 'PNG'):
+            path = self._cache_path(source_hash, spec, out_format)
+            if os.path.exists(path):
+                with Image.open(path) as image:
+                    return ProcessedImage(path, MIME_TYPES[out_format], image.width, image.height,
+                                          os.path.getsize(path), source_hash)
+        return None
+
+    def _process(self, image_path: str, source_hash: str, spec: Dict) -> ProcessedImage:
+        try:
+            source = Image.open(image_path)
+            source.load()
+        except (UnidentifiedImageError, OSError) as e:
+            raise ValueError(f"Not a readable image: {image_path} ({e})")
+
+        fmt = source.format or 'JPEG'
+        max_side, target_bytes = spec['max_side'], spec['target_bytes']
+        original_size = os.path.getsize(image_path)
+
+        # Animations lose their frames when re-encoded; pass them through
+        if getattr(source, 'is_animated', False):
+            log_warning(logger, f"Animated {fmt} kept as is ({original_size} bytes)")
+            return ProcessedImage(image_path, MIME_TYPES.get(fmt, 'application/octet-stream'),
+                                  source.width, source.height, original_size, source_hash)
+
+        has_alpha = source.mode in ('RGBA', 'LA', 'PA') or 'transparency' in source.info
+
+        # Apply the EXIF rotation, then drop EXIF/GPS/ICC/text chunks - the
+        # encoders only write metadata found in info or passed explicitly
+        image = ImageOps.exif_transpose(source).copy()
+        image.info = {}
+        if has_alpha:
+            image = image.convert('RGBA')
+        elif image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        data, out_format = None, 'JPEG'
+        if has_alpha:
+            data = _encode(image, 'PNG')
+            out_format = 'PNG'
+            if len(data) > target_bytes:
+                # Too big as PNG: flatten onto white and use JPEG
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel('A'))
+                image, data, out_format = background, None, 'JPEG'
+        if data is None:
+            data, image = _fit_jpeg(image, target_bytes)
+
+        path = self._cache_path(source_hash, spec, out_format)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+        log_info(logger, f"{fmt} {source.width}x{source.height} {original_size}B -> "
+                         f"{out_format} {image.width}x{image.height} {len(data)}B")
+        return ProcessedImage(path, MIME_TYPES[out_format], image.width, image.height, len(data), source_hash)
+
+
+_image_processor: Optional[ImageProcessor] = None
+_image_processor_lock = threading.Lock()
+
+
+def get_image_processor() -> ImageProcessor:
+    """Process-wide image processor configured from the `images` config section"""
+    global _image_processor
+    if _image_processor is None:
+        with _image_processor_lock:
+            if _image_processor is None:
+                from scripts.src.config.loader import load_config
+
+                settings = load_config().get('images', {}) or {}
+                specs = {
+                    platform: {**spec, **(settings.get(platform) or {})}
+                    for platform, spec in PLATFORM_SPECS.items()
+                }
+                _image_processor = ImageProcessor(
+                    cache_dir=settings.get('cache_dir', '/tmp/agentic_social_images'),
+                    specs=specs,
+                )
+    return _image_processor
+
+
+def prepare_image(image_path: str, platform: str) -> ProcessedImage:
+    """Platform-ready copy of image_path (cached by content hash)"""
+    return get_image_processor().prepare(image_path, platform)
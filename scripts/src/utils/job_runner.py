@@ -0,0 +1,139 @@
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import requests
+
+from scripts.src.utils.http_client import get_http_client
+from scripts.src.utils.logger import setup_logger, log_info, log_warning
+
+logger = setup_logger('JobRunner')
+
+
+class QueueFullError(Exception):
+    """Raised when the pipeline executor has no free worker or queue slot"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Pipeline queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PipelineExecutor:
+    """
+    Thread pool for blocking crew pipelines with a bounded backlog
+
+    At most `max_workers` pipelines run at once and at most `max_queue`
+    more wait for a worker. Anything beyond that is refused right away
+    instead of piling up behind minutes-long crews.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 8, name: str = 'pipeline'):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._durations = deque(maxlen=20)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Queue fn(*args, **kwargs); raises QueueFullError when saturated"""
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError(self.retry_after())
+
+        with self._lock:
+            self._pending += 1
+
+        def run():
+            started = time.monotonic()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._durations.append(time.monotonic() - started)
+                with self._lock:
+                    self._pending -= 1
+                self._slots.release()
+
+        return self._pool.submit(run)
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up, for the Retry-After header"""
+        avg = sum(self._durations) / len(self._durations) if self._durations else 60.0
+        ahead = max(1, self._pending - self.max_workers + 1)
+        return max(1, math.ceil(avg * ahead / self.max_workers))
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "running": min(self._pending, self.max_workers),
+            "queued": max(0, self._pending - self.max_workers),
+        }
+
+
+class JobStore:
+    """In-memory registry of async jobs, oldest finished jobs evicted first"""
+
+    def __init__(self, max_jobs: int = 1000):
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, kind: str, callback_url: Optional[str] = None) -> Dict:
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "created_at": datetime.now().isoformat(),
+            "callback_url": callback_url,
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+            self._evict()
+        return dict(job)
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _evict(self):
+        while len(self._jobs) > self.max_jobs:
+            for job_id, job in self._jobs.items():
+                if job["status"] in ("completed", "failed"):
+                    del self._jobs[job_id]
+                    break
+            else:
+                self._jobs.popitem(last=False)
+
+
+def run_job(jobs: JobStore, job_id: str, fn: Callable, *args):
+    """Run a pipeline for an async job and record (and deliver) its result"""
+    jobs.update(job_id, status="running", started_at=datetime.now().isoformat())
+    try:
+        result = fn(*args)
+        status = "failed" if isinstance(result, dict) and result.get("status") == "failed" else "completed"
+        jobs.update(job_id, status=status, result=result, finished_at=datetime.now().isoformat())
+    except Exception as e:
+        jobs.update(job_id, status="failed", error=str(e), finished_at=datetime.now().isoformat())
+
+    job = jobs.get(job_id)
+    log_info(logger, f"Job {job_id} {job['status']}")
+
+    if job.get("callback_url"):
+        try:
+            get_http_client('callback').post(job["callback_url"], json=job)
+        except requests.exceptions.RequestException as e:
+            log_warning(logger, f"Callback for job {job_id} failed: {e}")
+    return job
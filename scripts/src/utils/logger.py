@@ -1,4 +1,8 @@
+import json
 import logging
+import random
+import re
+import threading
 from colorama import Fore, Style, init
 from logging.handlers import RotatingFileHandler
 import os
@@ -52,6 +56,118 @@ def setup_file_logger(name, log_dir='logs'):
     
     return file_handler
 
+# Keys whose values never reach a log file
+REDACT_KEYS = re.compile(r'authorization|token|secret|api_key|password|cookie', re.IGNORECASE)
+BEARER_RE = re.compile(r'(Bearer\s+)[A-Za-z0-9._~+/=-]+')
+
+_file_loggers = set()
+_file_loggers_lock = threading.Lock()
+
+
+def redact(value):
+    """Copy of value with credentials masked (dict keys and Bearer tokens)"""
+    if isinstance(value, dict):
+        return {
+            key: '***' if REDACT_KEYS.search(str(key)) else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, str):
+        return BEARER_RE.sub(r'\1***', value)
+    return value
+
+
+def _bounded(value, max_bytes: int):
+    """value as JSON-friendly data, truncated to about max_bytes when serialized"""
+    text = value if isinstance(value, str) else json.dumps(value, default=str, ensure_ascii=False)
+    if len(text) <= max_bytes:
+        return value
+    return f"{text[:max_bytes]}…(+{len(text) - max_bytes} chars)"
+
+
+class SamplingFilter(logging.Filter):
+    """Keep every WARNING and above, and only a sample of DEBUG/INFO records"""
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line
+
+    Structured fields passed as extra={'fields': {...}} are redacted and
+    size-bounded here, so nothing is serialized unless the record is written.
+    """
+
+    def __init__(self, max_field_bytes: int = 2048):
+        super().__init__()
+        self.max_field_bytes = max_field_bytes
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": redact(record.getMessage()),
+        }
+        for key, value in redact(getattr(record, 'fields', None) or {}).items():
+            entry[key] = _bounded(value, self.max_field_bytes)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def get_file_logger(name: str) -> logging.Logger:
+    """
+    Logger with a rotating JSON file handler, attached on first use
+
+    Settings come from the `logging` section of config.yaml: dir, level,
+    max_bytes, backup_count, sample_rate and payload_max_bytes. Nothing is
+    created at import time and every process shares one file per logger.
+    """
+    logger = logging.getLogger(name)
+    if name in _file_loggers:
+        return logger
+
+    with _file_loggers_lock:
+        if name in _file_loggers:
+            return logger
+        try:
+            from scripts.src.config.loader import load_config
+
+            settings = (load_config() or {}).get('logging', {}) or {}
+        except Exception:
+            settings = {}
+
+        log_dir = settings.get('dir', 'logs')
+        os.makedirs(log_dir, exist_ok=True)
+        handler = RotatingFileHandler(
+            os.path.join(log_dir, f"{name.rsplit('.', 1)[-1]}.jsonl"),
+            maxBytes=settings.get('max_bytes', 5 * 1024 * 1024),
+            backupCount=settings.get('backup_count', 3),
+            delay=True,
+        )
+        handler.setFormatter(JsonFormatter(settings.get('payload_max_bytes', 2048)))
+        handler.addFilter(SamplingFilter(settings.get('sample_rate', 1.0)))
+
+        logger.setLevel(getattr(logging, str(settings.get('level', 'INFO')).upper(), logging.INFO))
+        logger.addHandler(handler)
+        _file_loggers.add(name)
+    return logger
+
+
+def log_event(logger, level: int, event: str, **fields):
+    """Structured log record; fields are only serialized if the record is emitted"""
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={'fields': fields})
+
+
 def log_info(logger, message):
     """Log info message with color"""
     logger.info(f"{Fore.BLUE}{message}{Style.RESET_ALL}")
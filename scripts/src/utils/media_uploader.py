@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from scripts.src.utils.http_client import get_http_client
+from scripts.src.utils.image_processor import get_image_processor, ProcessedImage
+from scripts.src.utils.logger import setup_logger, log_info, log_success, log_warning
+
+logger = setup_logger('MediaUploader')
+
+# How long a handle stays usable: X drops unused media after 24h, LinkedIn
+# image URNs and Telegram file_ids do not expire
+HANDLE_TTL = {
+    'linkedin': 30 * 24 * 3600,
+    'twitter': 23 * 3600,
+    'telegram': 365 * 24 * 3600,
+}
+
+
+def _account(platform: str, credentials: Dict) -> str:
+    """Which account a handle belongs to - handles are not portable between accounts"""
+    if platform == 'linkedin':
+        raw = credentials.get('author_urn', '')
+    elif platform == 'telegram':
+        raw = f"{credentials.get('bot_token', '')}:{credentials.get('media_chat_id', '')}"
+    else:
+        raw = "\x00".join(credentials.get(k, '') for k in
+                          ('api_key', 'api_secret', 'access_token', 'access_token_secret'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def upload_linkedin_image(image: ProcessedImage, access_token: str, author_urn: str, **_) -> str:
+    """initializeUpload + PUT; returns the image URN"""
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "LinkedIn-Version": "202502",
+        "X-Restli-Protocol-Version": "2.0.0",
+        "Content-Type": "application/json"
+    }
+    http = get_http_client('linkedin')
+    init_response = http.post(
+        "https://api.linkedin.com/rest/images?action=initializeUpload",
+        headers=headers,
+        json={"initializeUploadRequest": {"owner": author_urn}}
+    )
+    if init_response.status_code != 200:
+        raise RuntimeError(f"Failed to initialize image upload: {init_response.text}")
+    value = init_response.json()["value"]
+
+    with open(image.path, "rb") as f:
+        upload_response = http.put(
+            value["uploadUrl"],
+            data=f,
+            headers={"Content-Type": image.mime_type},
+            timeout=(5, 120)
+        )
+    if upload_response.status_code != 201:
+        raise RuntimeError(f"Failed to upload image: {upload_response.text}")
+    return value["image"]
+
+
+def upload_twitter_media(image: ProcessedImage, **credentials) -> str:
+    """v1.1 media upload through the cached session; returns the media id"""
+    from scripts.src.tools.twitter_poster import get_twitter_session
+
+    session = get_twitter_session(
+        credentials['api_key'], credentials['api_secret'],
+        credentials['access_token'], credentials['access_token_secret']
+    )
+    return session.upload_media(image.path)
+
+
+def upload_telegram_photo(image: ProcessedImage, bot_token: str, media_chat_id: str, **_) -> str:
+    """
+    Send the photo to a private staging chat and keep its file_id
+
+    Telegram has no upload-only call; a file_id from any chat the bot can
+    post to can be reused when publishing to the channel.
+    """
+    from scripts.src.utils.telegram_publisher import get_telegram_publisher
+
+    message = get_telegram_publisher(bot_token).send_photo(media_chat_id, image.path, disable_notification=True)
+    # Largest size is last
+    return message["photo"][-1]["file_id"]
+
+
+UPLOADERS = {
+    'linkedin': upload_linkedin_image,
+    'twitter': upload_twitter_media,
+    'telegram': upload_telegram_photo,
+}
+
+
+class MediaUploader:
+    """
+    Background media uploads keyed by platform, account and image content
+
+    start() returns at once with a Future, so uploads overlap with the LLM
+    stages; the posting tools call get() with the same image and credentials
+    and only wait for whatever is left. Finished handles are kept on disk so
+    retries (and restarts) do not upload the same image again.
+    """
+
+    def __init__(self, cache_path: str, max_workers: int = 4):
+        self.cache_path = cache_path
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='media')
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._handles = self._load()
+        self._uploads = 0
+        self._reused = 0
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._handles, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _cached(self, key: str, platform: str) -> Optional[str]:
+        entry = self._handles.get(key)
+        if entry and time.time() - entry['at'] < HANDLE_TTL[platform]:
+            return entry['handle']
+        return None
+
+    def start(self, platform: str, image_path: str, **credentials) -> Future:
+        """Begin (or join) the upload of image_path for platform"""
+        image = get_image_processor().prepare(image_path, platform)
+        key = f"{platform}:{_account(platform, credentials)}:{image.source_hash}"
+
+        with self._lock:
+            handle = self._cached(key, platform)
+            if handle:
+                self._reused += 1
+                future = Future()
+                future.set_result(handle)
+                return future
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future
+            future = self._pool.submit(self._upload, key, platform, image, credentials)
+            self._in_flight[key] = future
+            return future
+
+    def _upload(self, key: str, platform: str, image: ProcessedImage, credentials: Dict) -> str:
+        started = time.time()
+        try:
+            handle = UPLOADERS[platform](image, **credentials)
+        except Exception as e:
+            log_warning(logger, f"[{platform}] Background upload failed: {e}")
+            with self._lock:
+                self._in_flight.pop(key, None)
+            raise
+        # Record the handle before leaving in-flight so no caller slips in between
+        with self._lock:
+            self._uploads += 1
+            self._handles[key] = {'handle': handle, 'at': time.time()}
+            self._in_flight.pop(key, None)
+            self._save()
+        log_success(logger, f"[{platform}] Uploaded {image.size}B in {time.time() - started:.1f}s -> {handle}")
+        return handle
+
+    def get(self, platform: str, image_path: str, timeout: float = 300, **credentials) -> str:
+        """Handle for image_path, waiting for a running upload or uploading now"""
+        return self.start(platform, image_path, **credentials).result(timeout=timeout)
+
+    def start_all(self, image_path: str, platforms: Iterable[str], config: Dict) -> Dict[str, Future]:
+        """Kick off uploads for every enabled platform that has credentials configured"""
+        futures = {}
+        for platform in platforms:
+            credentials = platform_credentials(platform, config)
+            if credentials is None:
+                continue
+            try:
+                futures[platform] = self.start(platform, image_path, **credentials)
+            except (ValueError, OSError) as e:
+                log_warning(logger, f"[{platform}] Not uploading {image_path}: {e}")
+        if futures:
+            log_info(logger, f"Started background uploads for {', '.join(futures)}")
+        return futures
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._in_flight),
+                "uploads": self._uploads,
+                "reused": self._reused,
+                "cached_handles": len(self._handles),
+            }
+
+
+def platform_credentials(platform: str, config: Dict) -> Optional[Dict]:
+    """Upload credentials for a platform from config.yaml (None if it cannot upload ahead)"""
+    section = config.get(platform, {}) or {}
+    if platform == 'linkedin':
+        return {'access_token': section.get('access_token', ''), 'author_urn': section.get('author_urn', '')}
+    if platform == 'twitter':
+        return {k: section.get(k, '') for k in ('api_key', 'api_secret', 'access_token', 'access_token_secret')}
+    if platform == 'telegram' and section.get('media_chat_id'):
+        return {'bot_token': section.get('bot_token', ''), 'media_chat_id': str(section['media_chat_id'])}
+    return None
+
+
+_media_uploader: Optional[MediaUploader] = None
+_media_uploader_lock = threading.Lock()
+
+
+def get_media_uploader() -> MediaUploader:
+    """Process-wide uploader; handles live next to the processed images"""
+    global _media_uploader
+    if _media_uploader is None:
+        with _media_uploader_lock:
+            if _media_uploader is None:
+                _media_uploader = MediaUploader(
+                    os.path.join(get_image_processor().cache_dir, 'media_handles.json')
+                )
+    return _media_uploader
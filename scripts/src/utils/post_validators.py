@@ -0,0 +1,255 @@
+import html
+import re
+from html.parser import HTMLParser
+from typing import Callable, List, Tuple
+
+from scripts.src.utils.logger import setup_logger, log_warning
+from scripts.src.utils.text_normalizer import TELEGRAM_TAGS, normalize_text
+from scripts.src.utils.twitter_text import (
+    MAX_WEIGHTED_LENGTH, URL_RE, HASHTAG_RE, SENTENCE_END_RE, weighted_length
+)
+
+logger = setup_logger('PostValidators')
+
+TELEGRAM_MAX_LENGTH = 4096
+LINKEDIN_MAX_LENGTH = 3000
+
+MARKDOWN_PATTERNS = (
+    (re.compile(r'\*\*[^*\n]+\*\*'), "markdown bold (**text**)"),
+    (re.compile(r'(?<![\*\w])\*(?!\s)[^*\n]+(?<!\s)\*(?![\*\w])'), "markdown italic (*text*)"),
+    (re.compile(r'^#{1,6}\s+', re.MULTILINE), "markdown headers (# Title)"),
+    (re.compile(r'\[[^\]\n]+\]\([^)\s]+\)'), "markdown links ([text](url))"),
+)
+
+
+def _markdown_violations(text: str) -> List[str]:
+    return [f"Contains {name} - the platform shows it literally" for pattern, name in MARKDOWN_PATTERNS
+            if pattern.search(text)]
+
+
+# ---------------------------------------------------------------- Twitter
+
+def validate_twitter(text: str, allow_thread: bool = False) -> List[str]:
+    """Problems X would reject or render badly (length is fine when threads are allowed)"""
+    violations = []
+    length = weighted_length(text)
+    if length > MAX_WEIGHTED_LENGTH and not allow_thread:
+        violations.append(
+            f"Post is {length} weighted characters, the limit is {MAX_WEIGHTED_LENGTH} "
+            f"(URLs count 23, emoji count 2) - shorten it"
+        )
+    violations.extend(_markdown_violations(text))
+    if re.search(r'</?(b|i|a|strong|em)\b[^>]*>', text):
+        violations.append("Contains HTML tags - X shows them literally")
+    return violations
+
+
+def fix_twitter(text: str, allow_thread: bool = False) -> str:
+    """Strip formatting and trim at a sentence (or word) boundary to fit one tweet"""
+    text = normalize_text(text, 'twitter')
+    if allow_thread or weighted_length(text) <= MAX_WEIGHTED_LENGTH:
+        return text
+
+    urls = URL_RE.findall(text)
+    tags = HASHTAG_RE.findall(URL_RE.sub(' ', text))
+    body = ' '.join(URL_RE.sub(' ', text).split())
+    tail = '\n'.join(urls[:1])
+    room = MAX_WEIGHTED_LENGTH - (weighted_length(tail) + 1 if tail else 0) - 1
+
+    kept = ''
+    for sentence in SENTENCE_END_RE.split(body):
+        candidate = f"{kept} {sentence}".strip()
+        if weighted_length(candidate) > room:
+            break
+        kept = candidate
+    if not kept:
+        for word in body.split():
+            candidate = f"{kept} {word}".strip()
+            if weighted_length(candidate) > room:
+                break
+            kept = candidate
+        kept += '…'
+
+    # Keep at least one hashtag if trimming cut them all
+    if tags and not HASHTAG_RE.search(kept):
+        for tag in tags:
+            if weighted_length(f"{kept} {tag}") <= room:
+                kept = f"{kept} {tag}"
+                break
+    return f"{kept}\n{tail}".strip()
+
+
+# ---------------------------------------------------------------- Telegram
+
+class _TelegramHTMLChecker(HTMLParser):
+    """Walks Telegram HTML, collecting problems and a repaired copy"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.problems = []
+        self.stack = []
+        self.out = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in TELEGRAM_TAGS:
+            self.problems.append(f"Unsupported tag <{tag}> for Telegram HTML")
+            self.out.append(html.escape(self.get_starttag_text()))
+            return
+        if tag == 'a' and not dict(attrs).get('href'):
+            self.problems.append("<a> tag without href")
+            self.out.append(html.escape(self.get_starttag_text()))
+            return
+        self.stack.append(tag)
+        self.out.append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if tag not in self.stack:
+            self.problems.append(f"Closing </{tag}> without a matching opening tag")
+            self.out.append(html.escape(f"</{tag}>"))
+            return
+        # Close anything left open inside this tag first
+        while self.stack:
+            open_tag = self.stack.pop()
+            if open_tag == tag:
+                break
+            self.problems.append(f"<{open_tag}> is never closed")
+            self.out.append(f"</{open_tag}>")
+        self.out.append(f"</{tag}>")
+
+    def handle_startendtag(self, tag, attrs):
+        self.problems.append(f"Self-closing <{tag}/> is not allowed in Telegram HTML")
+        self.out.append(html.escape(self.get_starttag_text()))
+
+    def handle_data(self, data):
+        if '<' in data or '>' in data:
+            self.problems.append("Bare '<' or '>' must be written as &lt; / &gt;")
+        self.out.append(data.replace('<', '&lt;').replace('>', '&gt;'))
+
+    def handle_entityref(self, name):
+        self.out.append(f"&{name};")
+
+    def handle_charref(self, name):
+        self.out.append(f"&#{name};")
+
+    def close(self):
+        super().close()
+        # Whatever the parser could not tokenize (e.g. a lone '<')
+        if self.rawdata:
+            self.problems.append("Bare '<' or '>' must be written as &lt; / &gt;")
+            self.out.append(html.escape(self.rawdata, quote=False))
+            self.rawdata = ''
+        for open_tag in reversed(self.stack):
+            self.problems.append(f"<{open_tag}> is never closed")
+            self.out.append(f"</{open_tag}>")
+        self.stack = []
+
+
+def _check_telegram_html(text: str) -> Tuple[List[str], str]:
+    # Bare ampersands that do not start an entity break the parser on Telegram's side
+    escaped = re.sub(r'&(?!(?:[a-zA-Z]+|#\d+|#x[0-9a-fA-F]+);)', '&amp;', text)
+    checker = _TelegramHTMLChecker()
+    checker.feed(escaped)
+    checker.close()
+    problems = list(dict.fromkeys(checker.problems))
+    if escaped != text:
+        problems.insert(0, "Bare '&' must be written as &amp;")
+    return problems, ''.join(checker.out)
+
+
+def validate_telegram(text: str, allow_split: bool = False, **options) -> List[str]:
+    """Problems that make sendMessage with parse_mode=HTML fail (length is fine when splitting is allowed)"""
+    violations, _ = _check_telegram_html(text)
+    violations.extend(v for v in _markdown_violations(text) if 'header' not in v)
+    if len(text) > TELEGRAM_MAX_LENGTH and not allow_split:
+        violations.append(f"Post is {len(text)} characters, Telegram's limit is {TELEGRAM_MAX_LENGTH}")
+    return violations
+
+
+def fix_telegram(text: str, **options) -> str:
+    """Convert markdown to Telegram HTML, escape stray characters and balance tags"""
+    _, repaired = _check_telegram_html(normalize_text(text, 'telegram'))
+    return repaired
+
+
+# ---------------------------------------------------------------- LinkedIn
+
+def validate_linkedin(text: str, **options) -> List[str]:
+    """Problems with LinkedIn's plain-text commentary"""
+    violations = _markdown_violations(text)
+    if re.search(r'\([^)]+\)', text):
+        violations.append("Contains parentheses ( ) - use square brackets [ ] instead")
+    if len(text) > LINKEDIN_MAX_LENGTH:
+        violations.append(f"Post is {len(text)} characters, LinkedIn's limit is {LINKEDIN_MAX_LENGTH}")
+    return violations
+
+
+def fix_linkedin(text: str, **options) -> str:
+    """Strip markdown, swap parentheses and trim to LinkedIn's limit"""
+    text = normalize_text(text, 'linkedin')
+    if len(text) > LINKEDIN_MAX_LENGTH:
+        cut = text.rfind('\n', 0, LINKEDIN_MAX_LENGTH - 1)
+        text = text[:cut if cut > LINKEDIN_MAX_LENGTH // 2 else LINKEDIN_MAX_LENGTH - 1].rstrip() + '…'
+    return text
+
+
+VALIDATORS = {
+    'twitter': (validate_twitter, fix_twitter),
+    'telegram': (validate_telegram, fix_telegram),
+    'linkedin': (validate_linkedin, fix_linkedin),
+}
+
+
+def validate_post(platform: str, text: str, **options) -> List[str]:
+    """List of rule violations for a post, empty when it can be published as is"""
+    validate, _ = VALIDATORS[platform]
+    return validate(text, **options)
+
+
+def fix_post(platform: str, text: str, **options) -> str:
+    """Deterministic repair for a post that failed validation"""
+    _, fix = VALIDATORS[platform]
+    return fix(text, **options)
+
+
+def _needs_rewrite(violations: List[str]) -> bool:
+    """Whether any violation is a length rule, which the fix can only meet by cutting text"""
+    return any(violation.startswith("Post is ") for violation in violations)
+
+
+def make_post_guardrail(platform: str, **options) -> Callable:
+    """
+    CrewAI guardrail for a writer task
+
+    Formatting-only violations (markdown, HTML, LinkedIn parentheses) get
+    the deterministic fix right away. Otherwise the first invalid draft goes
+    back to the writer once with the exact violations; if the rewrite is
+    still invalid the fix is applied instead of failing the task. Use with
+    guardrail_max_retries=1.
+
+    Options (e.g. allow_thread=True for Twitter) go to the validator and fix.
+    """
+    attempts = {'count': 0}
+
+    def guardrail(output) -> Tuple[bool, str]:
+        text = output.raw.strip()
+        violations = validate_post(platform, text, **options)
+        if not violations:
+            return True, text
+
+        if not _needs_rewrite(violations):
+            fixed = fix_post(platform, text, **options)
+            if not validate_post(platform, fixed, **options):
+                return True, fixed
+
+        attempts['count'] += 1
+        if attempts['count'] == 1:
+            return False, (
+                f"The {platform} post breaks these rules:\n- " + "\n- ".join(violations) +
+                "\nRewrite it fixing ONLY these problems and return just the post."
+            )
+
+        fixed = fix_post(platform, text, **options)
+        log_warning(logger, f"[{platform}] Rewrite still invalid ({violations[0]}), applied deterministic fix")
+        return True, fixed
+
+    return guardrail
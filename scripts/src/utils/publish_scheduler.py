@@ -0,0 +1,452 @@
+import datetime
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from scripts.src.utils.drafts import PUBLISHABLE, DraftStore, get_draft_store
+from scripts.src.utils.dedup_index import dedup_action, describe, draft_url, get_dedup_index
+from scripts.src.utils.logger import setup_logger, log_info, log_success, log_warning, log_error
+
+logger = setup_logger('PublishScheduler')
+
+# Posting tools start every message with one of these
+POST_MARKERS = {"✅": "published", "⚠️": "skipped", "❌": "failed"}
+
+# How far ahead plan() looks for a free slot before giving up on windows
+MAX_DAYS_AHEAD = 14
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel: `size` buckets of `tick` seconds each
+
+    add() drops an entry into the bucket of its due tick (modulo size) in
+    O(1); advance() visits only the buckets passed since the last call and
+    fires the entries in them that are due, leaving ones that are whole
+    turns of the wheel away. Entries already due land in the next bucket.
+    """
+
+    def __init__(self, tick: float = 60.0, size: int = 1440, now: float = None):
+        self.tick = tick
+        self.size = size
+        self._buckets: List[list] = [[] for _ in range(size)]
+        self._current = int((now if now is not None else time.time()) // tick)
+        self._lock = threading.Lock()
+        self._count = 0
+
+    def add(self, at: float, key):
+        with self._lock:
+            due = max(int(at // self.tick), self._current)
+            self._buckets[due % self.size].append((due, key))
+            self._count += 1
+
+    def advance(self, now: float = None) -> list:
+        """Keys that became due up to `now`, in due order"""
+        target = int((now if now is not None else time.time()) // self.tick)
+        fired = []
+        with self._lock:
+            if target < self._current:
+                return fired
+            # After a long pause every bucket is visited once, not every tick
+            ticks = range(self._current, target + 1) if target - self._current < self.size else range(self.size)
+            for tick in ticks:
+                bucket = self._buckets[tick % self.size]
+                if not bucket:
+                    continue
+                keep = []
+                for due, key in bucket:
+                    (fired if due <= target else keep).append((due, key))
+                self._buckets[tick % self.size] = keep
+            self._current = target + 1
+            self._count -= len(fired)
+        return [key for _, key in sorted(fired, key=lambda entry: entry[0])]
+
+    def __len__(self) -> int:
+        return self._count
+
+
+def _minutes(hhmm: str) -> int:
+    hours, minutes = map(int, hhmm.split(':'))
+    return hours * 60 + minutes
+
+
+class PlatformSlots:
+    """
+    When a platform may be posted to
+
+    windows: "HH:MM-HH:MM" ranges in local time (default: all day);
+    min_spacing_minutes between two posts; daily_cap posts per day at most
+    (None for no cap).
+    """
+
+    def __init__(self, windows: List[str] = None, min_spacing_minutes: float = 30, daily_cap: int = None):
+        self.windows = [tuple(_minutes(part) for part in window.split('-')) for window in windows or ["00:00-24:00"]]
+        self.spacing = datetime.timedelta(minutes=min_spacing_minutes)
+        self.daily_cap = daily_cap
+
+    @classmethod
+    def from_config(cls, settings: Dict, defaults: Dict = None) -> 'PlatformSlots':
+        merged = {**(defaults or {}), **(settings or {})}
+        return cls(merged.get('windows'), merged.get('min_spacing_minutes', 30), merged.get('daily_cap'))
+
+
+def _spaced(candidate: datetime.datetime, taken: List[datetime.datetime],
+            spacing: datetime.timedelta) -> datetime.datetime:
+    """First time at or after candidate at least `spacing` away from every taken slot (sorted)"""
+    for slot in taken:
+        if slot + spacing <= candidate:
+            continue
+        if slot - spacing >= candidate:
+            break
+        candidate = slot + spacing
+    return candidate
+
+
+def post_status(result: str) -> str:
+    """
+    Outcome of a posting tool message: "published" (✅), "skipped" (⚠️,
+    e.g. LinkedIn rejected a duplicate) or "failed" (❌, or no message)
+
+    The first marker counts, so an agent answer that wraps the tool's
+    message in other words is read the same as the message itself.
+    """
+    found = [(index, status) for index, status in
+             (((result or "").find(marker), status) for marker, status in POST_MARKERS.items()) if index != -1]
+    return min(found)[1] if found else "failed"
+
+
+def duplicate_of(draft: Dict) -> Optional[Dict]:
+    """Closest published post the draft would repeat on its platform (see DedupIndex.find)"""
+    try:
+        matches = get_dedup_index().find(draft["text"], draft_url(draft), platforms=[draft["platform"]])
+    except Exception as e:
+        log_warning(logger, f"Duplicate check failed, publishing anyway: {e}")
+        return None
+    return matches[0] if matches else None
+
+
+def record_published(draft: Dict):
+    try:
+        get_dedup_index().add(draft["platform"], draft["text"], draft_url(draft), ref=draft.get("id"))
+    except Exception as e:
+        log_warning(logger, f"Could not add draft {draft.get('id')} to the duplicate index: {e}")
+
+
+def publish_draft(draft: Dict, config: Dict = None, force: bool = False) -> Tuple[str, str]:
+    """
+    Send one draft with its platform's posting tool - no LLM involved
+
+    A near-duplicate of something already published on the platform is
+    skipped (dedup.action: skip) or only logged (flag) unless force.
+    Returns (status, tool message), status as in post_status().
+    """
+    if config is None:
+        from scripts.src.config.loader import load_config
+
+        config = load_config()
+    platform, text, args = draft["platform"], draft["text"], draft.get("post_args") or {}
+    action = None if force else dedup_action()
+    if action:
+        match = duplicate_of(draft)
+        if match and action == "skip":
+            return "skipped", f"⚠️ Skipped: near-duplicate, {describe(match)}"
+        if match:
+            log_warning(logger, f"Publishing a possible duplicate to {platform}: {describe(match)}")
+    # Handle recorded by resolve_media, so the tool does not upload again
+    media_handle = (draft.get("media") or {}).get("handle")
+    try:
+        if platform == "telegram":
+            from scripts.src.tools.telegram_poster import TelegramPosterTool
+
+            result = TelegramPosterTool()._run(
+                message=text,
+                bot_token=config['telegram']['bot_token'],
+                channel_id=config['telegram']['channel_id'],
+                image_path=args.get("image_path"),
+                media_handle=media_handle
+            )
+        elif platform == "twitter":
+            from scripts.src.tools.twitter_poster import TwitterPosterTool
+
+            result = TwitterPosterTool()._run(
+                message=text,
+                api_key=config['twitter']['api_key'],
+                api_secret=config['twitter']['api_secret'],
+                access_token=config['twitter']['access_token'],
+                access_token_secret=config['twitter']['access_token_secret'],
+                image_path=args.get("image_path"),
+                media_handle=media_handle
+            )
+        elif platform == "linkedin":
+            from scripts.src.tools.linkedin_poster import LinkedInPosterTool
+
+            result = LinkedInPosterTool()._run(
+                message=text,
+                access_token=config['linkedin']['access_token'],
+                author_urn=config['linkedin']['author_urn'],
+                source_url=args.get("source_url") or "",
+                article_title=args.get("article_title"),
+                article_description=args.get("article_description"),
+                image_path=args.get("image_path"),
+                media_handle=media_handle
+            )
+        else:
+            return "failed", f"❌ Unknown platform: {platform}"
+    except Exception as e:
+        return "failed", f"❌ Error posting to {platform}: {e}"
+
+    status = post_status(result)
+    if status == "published":
+        record_published(draft)
+    return status, result
+
+
+def resolve_media(draft: Dict, config: Dict) -> Dict:
+    """
+    Media handle for the draft's image, recorded on the draft
+
+    The uploader keeps handles by content and account, so this is a cache
+    hit after the first upload and re-publishing never uploads again. When
+    the image file is gone (e.g. a cleaned-up /tmp), the handle recorded
+    on the draft is used.
+    """
+    image_path = (draft.get("post_args") or {}).get("image_path")
+    if not image_path:
+        return {}
+    if not os.path.exists(image_path):
+        return draft.get("media") or {}
+    from scripts.src.utils.media_uploader import get_media_uploader, platform_credentials
+
+    credentials = platform_credentials(draft["platform"], config)
+    if credentials is None:
+        return {}
+    try:
+        return {"handle": get_media_uploader().get(draft["platform"], image_path, **credentials)}
+    except Exception as e:
+        log_warning(logger, f"No media handle for draft {draft['id']}: {e}")
+        return {}
+
+
+def _publish_claimed(store: DraftStore, draft: Dict, force: bool = False) -> Dict:
+    """Publish a draft already claimed in the store and record the outcome"""
+    from scripts.src.config.loader import load_config
+
+    started = time.monotonic()
+    try:
+        config = load_config()
+        media = resolve_media(draft, config)
+        if media:
+            store.set_media(draft["id"], media)
+            draft = {**draft, "media": media}
+        status, result = publish_draft(draft, config, force=force)
+    except Exception as e:
+        # Never leave a draft stuck in "publishing"
+        status, result = "failed", f"❌ Error posting to {draft['platform']}: {e}"
+    store.mark(draft["id"], status, result)
+    return {
+        "id": draft["id"],
+        "platform": draft["platform"],
+        "status": status,
+        "result": result,
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+    }
+
+
+def publish_now(draft_id: int, store: DraftStore = None, force: bool = False) -> Optional[Dict]:
+    """
+    Publish-only path: send a stored draft right away
+
+    Works for pending, scheduled, failed and skipped drafts (a scheduled
+    one is taken off its slot); force sends a near-duplicate anyway.
+    Returns the outcome, or None when the draft does not exist or is
+    published or being published already.
+    """
+    store = store or get_draft_store()
+    if not store.claim(draft_id, PUBLISHABLE):
+        return None
+    outcome = _publish_claimed(store, store.get(draft_id), force=force)
+    log_info(logger, f"Draft {draft_id} ({outcome['platform']}) {outcome['status']} in {outcome['elapsed_ms']}ms")
+    return outcome
+
+
+class PublishScheduler:
+    """
+    Releases drafts into per-platform slots through the day
+
+    schedule_draft() picks the first slot that lies in one of the
+    platform's windows, keeps min_spacing from every other post and stays
+    under the daily cap, records it in the draft store and puts the draft
+    on a timing wheel. A background thread advances the wheel every tick
+    and publishes what is due. Drafts scheduled by other processes (the
+    API server) are picked up from the store on each tick.
+    """
+
+    def __init__(self, store: DraftStore, settings: Dict = None):
+        settings = settings or {}
+        defaults = settings.get('default') or {}
+        self.store = store
+        self.defaults = PlatformSlots.from_config({}, defaults)
+        self.platforms = {
+            name: PlatformSlots.from_config(platform_settings, defaults)
+            for name, platform_settings in (settings.get('platforms') or {}).items()
+        }
+        self.tick = settings.get('tick_seconds', 60)
+        self.wheel = TimingWheel(self.tick)
+        self._lock = threading.Lock()
+        self._last_seen_id = 0
+        self._thread = None
+        self.published = 0
+        self.failed = 0
+
+    def slots_for(self, platform: str) -> PlatformSlots:
+        return self.platforms.get(platform, self.defaults)
+
+    def _taken(self, platform: str, since: datetime.datetime, until: datetime.datetime) -> List[datetime.datetime]:
+        return [datetime.datetime.fromisoformat(at) for at in self.store.slots_taken(platform, since, until)]
+
+    def plan(self, platform: str, not_before: datetime.datetime = None,
+             deadline: datetime.datetime = None, urgent: bool = False) -> datetime.datetime:
+        """
+        Next free slot for a platform
+
+        Urgent drafts, and drafts whose deadline comes before the next
+        window slot, only keep min_spacing and ignore windows and caps;
+        when even that misses the deadline, spacing is reduced (with a
+        warning) so the post still goes out before it.
+        """
+        slots = self.slots_for(platform)
+        now = datetime.datetime.now().replace(microsecond=0)
+        start = max(not_before or now, now)
+
+        def asap():
+            taken = self._taken(platform, start - slots.spacing, start + datetime.timedelta(days=1))
+            candidate = _spaced(start, taken, slots.spacing)
+            if deadline is None or candidate <= deadline:
+                return candidate
+            if deadline < start:
+                log_warning(logger, f"{platform} deadline {deadline:%Y-%m-%d %H:%M} has already passed")
+                return candidate
+            # Spacing would push the post past its deadline: give up spacing
+            # (halving it down to none) rather than the deadline
+            spacing = slots.spacing
+            while candidate > deadline:
+                spacing = spacing / 2 if spacing > datetime.timedelta(minutes=1) else datetime.timedelta(0)
+                candidate = _spaced(start, taken, spacing)
+            log_warning(logger, f"{platform} spacing cut to {spacing.total_seconds() / 60:.0f} min "
+                                f"to publish by {deadline:%Y-%m-%d %H:%M}")
+            return candidate
+
+        if urgent:
+            return asap()
+
+        for offset in range(MAX_DAYS_AHEAD):
+            day = datetime.datetime.combine(start.date() + datetime.timedelta(days=offset), datetime.time())
+            next_day = day + datetime.timedelta(days=1)
+            taken = self._taken(platform, day - slots.spacing, next_day + slots.spacing)
+            if slots.daily_cap is not None and sum(day <= at < next_day for at in taken) >= slots.daily_cap:
+                continue
+            for window_start, window_end in slots.windows:
+                candidate = _spaced(max(day + datetime.timedelta(minutes=window_start), start), taken, slots.spacing)
+                if candidate < day + datetime.timedelta(minutes=window_end):
+                    if deadline is not None and candidate > deadline:
+                        return asap()
+                    return candidate
+
+        log_warning(logger, f"No {platform} slot within {MAX_DAYS_AHEAD} days, publishing as soon as spacing allows")
+        return asap()
+
+    def schedule_draft(self, draft_id: int, platform: str, not_before: datetime.datetime = None,
+                       deadline: datetime.datetime = None, urgent: bool = False) -> datetime.datetime:
+        with self._lock:
+            publish_at = self.plan(platform, not_before, deadline, urgent)
+            self.store.schedule(draft_id, publish_at)
+        self.wheel.add(publish_at.timestamp(), draft_id)
+        log_info(logger, f"Draft {draft_id} ({platform}) scheduled for {publish_at:%Y-%m-%d %H:%M}")
+        return publish_at
+
+    def sync(self):
+        """Put drafts scheduled elsewhere (or before a restart) on the wheel"""
+        while True:
+            drafts = self.store.query(status="scheduled", after_id=self._last_seen_id, limit=500)
+            if not drafts:
+                return
+            for draft in drafts:
+                self.wheel.add(datetime.datetime.fromisoformat(draft["publish_at"]).timestamp(), draft["id"])
+            self._last_seen_id = drafts[-1]["id"]
+
+    def run_pending(self, now: float = None) -> List[Tuple[int, str]]:
+        """Publish every draft whose slot has come; returns (draft_id, status) pairs"""
+        self.store.release_stale()
+        self.sync()
+        now = now if now is not None else time.time()
+        outcomes = []
+        for draft_id in self.wheel.advance(now):
+            draft = self.store.get(draft_id)
+            # Rescheduled, cancelled or taken by another publisher meanwhile
+            if draft is None or draft["status"] != "scheduled":
+                continue
+            publish_at = datetime.datetime.fromisoformat(draft["publish_at"]).timestamp()
+            if publish_at > now:
+                self.wheel.add(publish_at, draft_id)
+                continue
+            if not self.store.claim(draft_id):
+                continue
+            outcome = _publish_claimed(self.store, draft)
+            status = outcome["status"]
+            if status == "failed":
+                self.failed += 1
+                log_error(logger, f"Draft {draft_id} ({draft['platform']}) failed: {outcome['result']}")
+            else:
+                self.published += status == "published"
+                log_success(logger, f"Draft {draft_id} ({draft['platform']}) {status}")
+            outcomes.append((draft_id, status))
+        return outcomes
+
+    def start(self) -> threading.Thread:
+        """Publish in a background thread, one wheel tick at a time"""
+        if self._thread is None:
+            def loop():
+                while True:
+                    try:
+                        self.run_pending()
+                    except Exception as e:
+                        log_error(logger, f"Publishing tick failed: {e}")
+                    time.sleep(self.tick)
+
+            self._thread = threading.Thread(target=loop, name="publish-scheduler", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    @property
+    def running(self) -> bool:
+        """Whether this process has a publisher thread (see start())"""
+        return self._thread is not None
+
+    def stats(self) -> Dict:
+        return {
+            "on_wheel": len(self.wheel),
+            "published": self.published,
+            "failed": self.failed,
+            **self.store.stats(),
+        }
+
+
+_publish_scheduler: Optional[PublishScheduler] = None
+_publish_scheduler_lock = threading.Lock()
+
+
+def get_publish_scheduler() -> PublishScheduler:
+    """Process-wide scheduler configured from scheduler.publishing"""
+    global _publish_scheduler
+    if _publish_scheduler is None:
+        with _publish_scheduler_lock:
+            if _publish_scheduler is None:
+                try:
+                    from scripts.src.config.loader import load_config
+
+                    settings = load_config().get('scheduler', {}).get('publishing', {}) or {}
+                except Exception:
+                    settings = {}
+                _publish_scheduler = PublishScheduler(get_draft_store(), settings)
+    return _publish_scheduler
@@ -1,13 +1,153 @@
+import functools
 import json
 import os
-from datetime import datetime
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 QUEUE_FILE = "/home/ubuntu7/m15kh/own/AgenticSocial/data/request_queue.json"
-MAX_QUEUE_SIZE = 5
+
+# Items queued without a submitting user (direct API calls)
+ANONYMOUS_USER = "anonymous"
+
+# Priority classes, most urgent first
+PRIORITIES = ("urgent", "normal", "low")
+DEFAULT_PRIORITY = "normal"
+
+# Failed items are retried after retry_backoff_minutes, doubling per
+# attempt up to MAX_BACKOFF, and parked after queue.max_attempts failures
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF_MINUTES = 15
+MAX_BACKOFF = timedelta(hours=24)
+
+# Serializes read-modify-write of the queue file within this process
+_queue_lock = threading.RLock()
+
+
+@functools.lru_cache(maxsize=1)
+def _settings() -> Dict:
+    """config.yaml's queue section, read once per process"""
+    try:
+        from scripts.src.config.loader import load_config
+
+        return load_config().get('queue', {}) or {}
+    except Exception:
+        return {}
+
+
+class TokenBucket:
+    """
+    Per-user submission quota
+
+    Holds up to `capacity` tokens and regains `per_hour` of them per hour;
+    each queued request takes one.
+    """
+
+    def __init__(self, capacity: float, per_hour: float):
+        self.capacity = capacity
+        self.rate = per_hour / 3600
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self) -> Optional[float]:
+        """Take a token; returns None, or seconds until one is available"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return None
+        if self.rate <= 0:
+            return float('inf')
+        return (1 - self.tokens) / self.rate
+
+    def give_back(self):
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+
+
+def _quota_for(user_id: str) -> Optional[Dict]:
+    """queue.quota with per-user overrides from queue.quotas; None means unlimited"""
+    settings = _settings()
+    quota = (settings.get('quotas') or {}).get(user_id, settings.get('quota'))
+    if not quota or not quota.get('capacity'):
+        return None
+    return quota
+
+
+def _take_quota(user_id: str) -> Optional[float]:
+    quota = _quota_for(user_id)
+    if quota is None:
+        return None
+    bucket = _buckets.get(user_id)
+    if bucket is None:
+        bucket = _buckets[user_id] = TokenBucket(quota['capacity'], quota.get('per_hour', quota['capacity']))
+    return bucket.take()
+
+
+def fair_order(items: List[Dict]) -> List[Dict]:
+    """
+    Weighted fair order across users
+
+    Each user's items keep their FIFO order and get finish tags 1/w, 2/w,
+    ... (w = queue.weights[user], default 1); sorting by tag interleaves
+    users round-robin, so someone who queued 50 links gets one turn per
+    round like everyone else instead of blocking the queue. Ties go to the
+    earlier submission.
+    """
+    weights = _settings().get('weights') or {}
+    seen = defaultdict(int)
+    tagged = []
+    for item in sorted(items, key=lambda item: (item.get("added_at", ""), item.get("id", 0))):
+        user_id = item.get("user_id", ANONYMOUS_USER)
+        weight = weights.get(user_id, 1)
+        seen[user_id] += 1
+        tagged.append((seen[user_id] / (weight if weight > 0 else 1), item.get("added_at", ""), item.get("id", 0), item))
+    tagged.sort(key=lambda entry: entry[:3])
+    return [entry[3] for entry in tagged]
+
+
+def _priority(item: Dict) -> str:
+    priority = item.get("priority")
+    return priority if priority in PRIORITIES else DEFAULT_PRIORITY
+
+
+def schedule_order(items: List[Dict]) -> List[Dict]:
+    """
+    Processing order: priority class first, then earliest deadline first
+
+    Within a class, items with a publish_by deadline come first, earliest
+    deadline first; the rest follow in fair order across users.
+    """
+    ordered = []
+    for priority in PRIORITIES:
+        lane = [item for item in items if _priority(item) == priority]
+        with_deadline = sorted((item for item in lane if item.get("publish_by")), key=lambda item: item["publish_by"])
+        ordered += with_deadline + fair_order([item for item in lane if not item.get("publish_by")])
+    return ordered
+
+
+def is_due(item: Dict, before: datetime) -> bool:
+    """Urgent, or has to be published before `before` (e.g. the next nightly run)"""
+    if item.get("priority") == "urgent":
+        return True
+    return bool(item.get("publish_by")) and item["publish_by"] <= before.isoformat()
+
+
+def is_ready(item: Dict, now: Optional[datetime] = None) -> bool:
+    """False while a failed item waits out its retry backoff"""
+    retry_at = item.get("retry_at")
+    return not retry_at or retry_at <= (now or datetime.now()).isoformat()
 
 
 def ensure_queue_file():
@@ -39,43 +179,135 @@ def save_queue(queue: List[Dict]):
         logger.error(f"Error saving queue: {e}")
 
 
-def add_to_queue(request_data: Dict) -> Dict:
+def find_duplicate(request_data: Dict) -> Optional[Dict]:
+    """
+    A published post this request would repeat, if any
+
+    A URL request matches posts of the same link on its platforms; a text
+    request matches posts close to its text or of the links in it.
+    """
+    from scripts.src.utils.dedup_index import get_dedup_index, urls_in
+
+    try:
+        index = get_dedup_index()
+        platforms = [name for name, on in (request_data.get("platforms") or {}).items() if on]
+        if request_data.get("url"):
+            matches = index.find(url=request_data["url"], platforms=platforms)
+        else:
+            text = request_data.get("text") or ""
+            matches = index.find(text)
+            for url in urls_in(text):
+                if matches:
+                    break
+                matches = index.find(url=url, platforms=platforms)
+    except Exception as e:
+        logger.warning(f"Duplicate check failed, queueing anyway: {e}")
+        return None
+    return matches[0] if matches else None
+
+
+def add_to_queue(request_data: Dict, user_id: Optional[str] = None, priority: str = DEFAULT_PRIORITY,
+                 publish_by: Optional[datetime] = None) -> Dict:
     """
     Add a request to the queue
     
+    Args:
+        request_data: Request payload
+        user_id: Submitting user, for fair ordering and quotas
+        priority: One of PRIORITIES
+        publish_by: Optional deadline; earlier deadlines go first within
+            the priority class
+    
     Returns:
-        Dict with status and position in queue
+        Dict with status and position in queue ("rejected" with
+        retry_after when the user's quota is used up, "duplicate" when it
+        repeats a published post and dedup.action is skip)
     """
-    queue = load_queue()
+    from scripts.src.utils.dedup_index import dedup_action, describe
+
+    if priority not in PRIORITIES:
+        raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+    user_id = str(user_id) if user_id is not None else ANONYMOUS_USER
     
-    # Check queue size
-    if len(queue) >= MAX_QUEUE_SIZE:
+    action = dedup_action()
+    duplicate = find_duplicate(request_data) if action else None
+    if duplicate and action == "skip":
+        logger.info(f"Not queueing a duplicate from user {user_id}: {describe(duplicate)}")
         return {
-            "status": "rejected",
-            "message": f"Queue is full (max {MAX_QUEUE_SIZE} requests). Please try again later.",
-            "queue_size": len(queue)
+            "status": "duplicate",
+            "message": f"Already published: {describe(duplicate)}",
+            "duplicate_of": duplicate
         }
     
-    # Add request with metadata
-    queue_item = {
-        "id": len(queue) + 1,
-        "data": request_data,
-        "added_at": datetime.now().isoformat(),
-        "status": "pending"
-    }
+    with _queue_lock:
+        retry_after = _take_quota(user_id)
+        if retry_after is not None:
+            logger.info(f"Quota exceeded for user {user_id}")
+            return {
+                "status": "rejected",
+                "message": "Too many requests queued recently. Please try again later.",
+                "retry_after": None if retry_after == float('inf') else int(retry_after) + 1
+            }
+        
+        try:
+            queue = load_queue()
+            
+            # Add request with metadata
+            queue_item = {
+                "id": max((item.get("id", 0) for item in queue), default=0) + 1,
+                "user_id": user_id,
+                "priority": priority,
+                "publish_by": _local_iso(publish_by),
+                "data": request_data,
+                "added_at": datetime.now().isoformat(),
+                "status": "pending"
+            }
+            if duplicate:
+                queue_item["duplicate_of"] = describe(duplicate)
+            
+            queue.append(queue_item)
+            save_queue(queue)
+        except Exception:
+            if user_id in _buckets:
+                _buckets[user_id].give_back()
+            raise
+        
+        pending = get_pending_requests()
     
-    queue.append(queue_item)
-    save_queue(queue)
+    position = next(i for i, item in enumerate(pending, 1) if item["id"] == queue_item["id"])
+    scheduled_time = _scheduled_time()
+    logger.info(f"Added request {queue_item['id']} from user {user_id}. Position: {position}/{len(pending)}")
     
-    logger.info(f"Added request to queue. Position: {len(queue)}/{MAX_QUEUE_SIZE}")
-    
-    return {
+    result = {
         "status": "queued",
-        "message": f"Request added to queue. Position: {len(queue)}/{MAX_QUEUE_SIZE}. Will be processed at 23:00.",
-        "position": len(queue),
-        "queue_size": len(queue),
-        "scheduled_time": "23:00"
+        "message": f"Request added to queue. Position: {position}/{len(pending)}. Will be processed at {scheduled_time}.",
+        "id": queue_item["id"],
+        "position": position,
+        "queue_size": len(pending),
+        "scheduled_time": scheduled_time
     }
+    if duplicate:
+        result["duplicate_of"] = duplicate
+    return result
+
+
+def _local_iso(value: Optional[datetime]) -> Optional[str]:
+    """Deadlines are stored like added_at: naive local time, ISO format"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat()
+
+
+@functools.lru_cache(maxsize=1)
+def _scheduled_time() -> str:
+    try:
+        from scripts.src.config.loader import load_config
+
+        return load_config().get('scheduler', {}).get('time', '23:00')
+    except Exception:
+        return '23:00'
 
 
 def get_queue() -> List[Dict]:
@@ -84,30 +316,73 @@ def get_queue() -> List[Dict]:
 
 
 def get_pending_requests() -> List[Dict]:
-    """Get only pending requests"""
+    """Get only pending requests, in processing order"""
     queue = load_queue()
-    return [item for item in queue if item.get("status") == "pending"]
+    return schedule_order([item for item in queue if item.get("status") == "pending"])
+
+
+def get_user_positions() -> Dict[str, Dict]:
+    """Pending count and 1-based positions in processing order, per user"""
+    users = {}
+    for position, item in enumerate(get_pending_requests(), 1):
+        entry = users.setdefault(item.get("user_id", ANONYMOUS_USER), {"pending": 0, "positions": []})
+        entry["pending"] += 1
+        entry["positions"].append(position)
+    return users
 
 
 def clear_queue():
     """Clear all items from queue"""
-    save_queue([])
+    with _queue_lock:
+        save_queue([])
     logger.info("Queue cleared")
 
 
 def mark_as_processed(request_id: int):
     """Mark a request as processed"""
-    queue = load_queue()
-    for item in queue:
-        if item.get("id") == request_id:
-            item["status"] = "processed"
-            item["processed_at"] = datetime.now().isoformat()
-    save_queue(queue)
+    with _queue_lock:
+        queue = load_queue()
+        for item in queue:
+            if item.get("id") == request_id:
+                item["status"] = "processed"
+                item["processed_at"] = datetime.now().isoformat()
+        save_queue(queue)
+
+
+def mark_failed(request_id: int, error: str) -> Optional[Dict]:
+    """
+    Record a failed attempt at a request
+
+    The item stays pending with a retry_at backoff, or becomes "parked"
+    (kept in the queue but no longer retried) once it has failed
+    queue.max_attempts times. Returns the updated item.
+    """
+    settings = _settings()
+    max_attempts = settings.get('max_attempts', DEFAULT_MAX_ATTEMPTS)
+    backoff = timedelta(minutes=settings.get('retry_backoff_minutes', DEFAULT_BACKOFF_MINUTES))
+    with _queue_lock:
+        queue = load_queue()
+        failed = None
+        for item in queue:
+            if item.get("id") == request_id:
+                failed = item
+                item["attempts"] = item.get("attempts", 0) + 1
+                item["last_error"] = error[:500]
+                if max_attempts and item["attempts"] >= max_attempts:
+                    item["status"] = "parked"
+                    item.pop("retry_at", None)
+                    logger.warning(f"Parked request {request_id} after {item['attempts']} failed attempts")
+                else:
+                    delay = min(backoff * 2 ** (item["attempts"] - 1), MAX_BACKOFF)
+                    item["retry_at"] = (datetime.now() + delay).isoformat()
+        save_queue(queue)
+    return failed
 
 
 def remove_processed():
     """Remove all processed items from queue"""
-    queue = load_queue()
-    queue = [item for item in queue if item.get("status") != "processed"]
-    save_queue(queue)
+    with _queue_lock:
+        queue = load_queue()
+        queue = [item for item in queue if item.get("status") != "processed"]
+        save_queue(queue)
     logger.info("Removed processed items from queue")
\ No newline at end of file
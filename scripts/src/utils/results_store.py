@@ -0,0 +1,289 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from scripts.src.utils.logger import setup_logger, log_info, log_success, log_warning
+from scripts.src.utils.single_flight import normalize_url
+
+logger = setup_logger('ResultsStore')
+
+DEFAULT_PATH = str(Path(__file__).parents[3] / "data" / "results.db")
+LEGACY_NAME_RE = re.compile(r'^(\d{8}_\d{6})_.*\.json$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    url TEXT,
+    url_hash TEXT,
+    created_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    source TEXT UNIQUE,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_url ON results (url_hash, created_at);
+CREATE INDEX IF NOT EXISTS results_created ON results (created_at);
+CREATE INDEX IF NOT EXISTS results_status ON results (status, created_at);
+CREATE TABLE IF NOT EXISTS result_platforms (
+    platform TEXT NOT NULL,
+    result_id INTEGER NOT NULL REFERENCES results (id) ON DELETE CASCADE,
+    PRIMARY KEY (platform, result_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS result_platforms_result ON result_platforms (result_id);
+"""
+
+
+def url_hash(url: str) -> str:
+    """Index key for a URL; variants that normalize_url() folds together share it"""
+    return hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()[:32]
+
+
+def _encode(data: Dict) -> bytes:
+    return zlib.compress(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def _decode(blob: bytes) -> Dict:
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+def _timestamp(value) -> str:
+    """ISO timestamp for a datetime, date or ISO string (as used in the index)"""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
+
+
+class ResultsStore:
+    """
+    Append-only SQLite store for pipeline results
+
+    Each result is one row with its JSON payload zlib-compressed, indexed by
+    URL hash, creation time and status; the platforms it was posted to are
+    a separate indexed table. Rows are only ever added, and removed by
+    compact() according to the retention policy.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def append(self, data: Dict, source: str = None) -> Optional[int]:
+        """
+        Store one result; returns its id
+
+        `source` identifies where a migrated result came from, so importing
+        the same file twice is a no-op (None is returned then).
+        """
+        url = data.get("url")
+        created_at = _timestamp(data.get("timestamp") or datetime.datetime.now())
+        status = data.get("status", "success")
+        platforms = data.get("posted_to") or []
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO results (url, url_hash, created_at, status, source, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, url_hash(url) if url else None, created_at, status, source, _encode(data))
+            )
+            if not cursor.rowcount:
+                return None
+            result_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO result_platforms (platform, result_id) VALUES (?, ?)",
+                [(platform, result_id) for platform in platforms]
+            )
+        return result_id
+
+    def get(self, result_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT id, payload FROM results WHERE id = ?", (result_id,)).fetchone()
+        return dict(_decode(row[1]), id=row[0]) if row else None
+
+    def query(self, url: str = None, platform: str = None, status: str = None,
+              since=None, until=None, limit: int = 50, offset: int = 0) -> List[Dict]:
+        """
+        Results matching every given filter, newest first
+
+        Args:
+            url: Exact article URL (matched through its hash)
+            platform: Only results posted to this platform
+            status: "success", "partial" (some platforms failed) or "failed"
+            since, until: datetimes or ISO strings bounding created_at
+        """
+        clauses, params = [], []
+        if url:
+            clauses.append("r.url_hash = ?")
+            params.append(url_hash(url))
+        if platform:
+            clauses.append("r.id IN (SELECT result_id FROM result_platforms WHERE platform = ?)")
+            params.append(platform)
+        if status:
+            clauses.append("r.status = ?")
+            params.append(status)
+        if since:
+            clauses.append("r.created_at >= ?")
+            params.append(_timestamp(since))
+        if until:
+            clauses.append("r.created_at < ?")
+            params.append(_timestamp(until))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT r.id, r.payload FROM results r {where} ORDER BY r.created_at DESC, r.id DESC LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit, offset]).fetchall()
+        return [dict(_decode(payload), id=result_id) for result_id, payload in rows]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total, oldest, newest = self._conn.execute(
+                "SELECT COUNT(*), MIN(created_at), MAX(created_at) FROM results").fetchone()
+            by_status = dict(self._conn.execute("SELECT status, COUNT(*) FROM results GROUP BY status"))
+            by_platform = dict(self._conn.execute(
+                "SELECT platform, COUNT(*) FROM result_platforms GROUP BY platform"))
+        return {
+            "total": total,
+            "oldest": oldest,
+            "newest": newest,
+            "by_status": by_status,
+            "by_platform": by_platform,
+            "size_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+    def migrate_files(self, data_dir: str, remove: bool = False) -> int:
+        """
+        Import the old per-result `<timestamp>_<url>.json` files
+
+        Safe to run repeatedly: each file is recorded as the row's source.
+        With remove=True imported files are deleted afterwards.
+        """
+        imported = 0
+        for path in sorted(Path(data_dir).glob("*.json")):
+            match = LEGACY_NAME_RE.match(path.name)
+            if not match:
+                continue
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                log_warning(logger, f"Skipping unreadable result {path.name}: {e}")
+                continue
+            if not isinstance(data, dict):
+                continue
+            if not data.get("timestamp"):
+                data["timestamp"] = datetime.datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").isoformat()
+            if self.append(data, source=path.name) is not None:
+                imported += 1
+            if remove:
+                path.unlink()
+        if imported:
+            log_success(logger, f"Imported {imported} result file(s) from {data_dir}")
+        return imported
+
+    def compact(self, retention_days: Optional[float] = None, keep_per_url: int = 1) -> int:
+        """
+        Apply the retention policy and reclaim space; returns rows removed
+
+        Results older than retention_days are dropped, except the newest
+        keep_per_url for each URL, so "what did we post for X" keeps an
+        answer. None keeps everything.
+        """
+        if retention_days is None:
+            return 0
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=retention_days)).isoformat()
+        with self._lock, self._conn:
+            removed = self._conn.execute(
+                """
+                DELETE FROM results WHERE created_at < ? AND id NOT IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY COALESCE(url_hash, 'id:' || id) ORDER BY created_at DESC, id DESC
+                        ) AS rank FROM results
+                    ) WHERE rank <= ?
+                )
+                """,
+                (cutoff, keep_per_url)
+            ).rowcount
+        if removed:
+            with self._lock:
+                self._conn.execute("VACUUM")
+            log_info(logger, f"Compacted results store: removed {removed} result(s) older than {retention_days} days")
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_results_store: Optional[ResultsStore] = None
+_results_store_lock = threading.Lock()
+
+
+def _settings() -> Dict:
+    try:
+        from scripts.src.config.loader import load_config
+
+        return load_config().get('storage', {}) or {}
+    except Exception:
+        return {}
+
+
+def get_results_store() -> ResultsStore:
+    """
+    Process-wide store configured from the `storage` config section
+
+    On first use the retention policy is applied once and, unless
+    `migrate: false`, legacy JSON files next to the database are imported.
+    """
+    global _results_store
+    if _results_store is None:
+        with _results_store_lock:
+            if _results_store is None:
+                settings = _settings()
+                store = ResultsStore(settings.get('path', DEFAULT_PATH))
+                if settings.get('migrate', True):
+                    store.migrate_files(os.path.dirname(os.path.abspath(store.path)))
+                store.compact(settings.get('retention_days'), settings.get('keep_per_url', 1))
+                _results_store = store
+    return _results_store
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Results store maintenance')
+    parser.add_argument('--path', default=None, help='Database file (default: storage.path or data/results.db)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    migrate = commands.add_parser('migrate', help='Import legacy <timestamp>_<url>.json files')
+    migrate.add_argument('data_dir')
+    migrate.add_argument('--remove', action='store_true', help='Delete files once imported')
+    compact = commands.add_parser('compact', help='Apply retention and vacuum')
+    compact.add_argument('--retention-days', type=float, required=True)
+    compact.add_argument('--keep-per-url', type=int, default=1)
+    query = commands.add_parser('query', help='Print matching results as JSON lines')
+    query.add_argument('--url')
+    query.add_argument('--platform')
+    query.add_argument('--status')
+    query.add_argument('--since')
+    query.add_argument('--until')
+    query.add_argument('--limit', type=int, default=20)
+    commands.add_parser('stats', help='Counts per status and platform')
+    args = parser.parse_args()
+
+    store = ResultsStore(args.path or _settings().get('path', DEFAULT_PATH))
+    if args.command == 'migrate':
+        store.migrate_files(args.data_dir, remove=args.remove)
+    elif args.command == 'compact':
+        store.compact(args.retention_days, args.keep_per_url)
+    elif args.command == 'query':
+        for result in store.query(args.url, args.platform, args.status, args.since, args.until, args.limit):
+            print(json.dumps(result, ensure_ascii=False))
+    else:
+        print(json.dumps(store.stats(), indent=2))
@@ -0,0 +1,116 @@
+import threading
+from typing import Any, Callable, Dict, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from scripts.src.utils.logger import setup_logger, log_info
+
+logger = setup_logger('SingleFlight')
+
+# Query parameters that never change the page content
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref_src')
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for deduplication
+
+    Lowercases scheme and host, drops the fragment, default ports,
+    tracking parameters and trailing slashes, and sorts the query.
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'https').lower()
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and not ((scheme == 'http' and parts.port == 80) or (scheme == 'https' and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not any(key == p or (p.endswith('_') and key.startswith(p)) for p in TRACKING_PARAMS)
+    )
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution
+
+    The first caller for a key runs the function; everyone arriving while it
+    is still running blocks and receives the same result (or exception).
+    Nothing is cached once the call finishes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._executions = 0
+        self._coalesced = 0
+        self._saved_llm_calls = 0
+
+    def do(self, key: str, fn: Callable[[], Any], llm_calls: int = 1) -> Tuple[Any, bool]:
+        """
+        Run fn() once per in-flight key
+
+        Args:
+            key: Deduplication key (e.g. a normalized URL)
+            fn: Zero-argument function doing the work
+            llm_calls: LLM calls one execution costs, for the savings counter
+
+        Returns:
+            (result, shared) - shared is True when another caller's run was reused
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._coalesced += 1
+                self._saved_llm_calls += llm_calls
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executions += 1
+                leader = True
+
+        if not leader:
+            log_info(logger, f"[{self.name}] Reusing in-flight run for {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "in_flight": len(self._calls),
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "llm_calls_saved": self._saved_llm_calls,
+            }
+
+
+# Summaries are the expensive shared stage between platform requests
+summary_flight = SingleFlight('summarize')
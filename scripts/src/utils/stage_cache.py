@@ -0,0 +1,104 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from scripts.src.utils.logger import setup_logger, log_info
+
+logger = setup_logger('StageCache')
+
+DEFAULT_PATH = str(Path(__file__).parents[3] / "data" / "stages.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stages (
+    key TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (key, stage)
+);
+CREATE INDEX IF NOT EXISTS stages_updated ON stages (updated_at);
+"""
+
+
+class StageCache:
+    """
+    Intermediate pipeline outputs of recent runs
+
+    One row per (request key, stage): the summary and per-platform
+    hashtags a run produced. A retry of the same URL loads them instead
+    of rerunning those LLM stages; its drafts come from the draft store.
+    Entries older than ttl_hours are ignored and dropped by purge().
+    """
+
+    def __init__(self, path: str, ttl_hours: float = 24):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, key: str) -> Dict:
+        """{stage: value} of the fresh stages cached for key"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, value FROM stages WHERE key = ? AND updated_at >= ?",
+                (key, time.time() - self.ttl)
+            ).fetchall()
+        return {stage: json.loads(value) for stage, value in rows}
+
+    def put(self, key: str, **stages):
+        """Store stage outputs for key; None values are left as they were"""
+        now = time.time()
+        rows = [(key, stage, json.dumps(value), now) for stage, value in stages.items() if value]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO stages (key, stage, value, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key, stage) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                rows
+            )
+
+    def merge(self, key: str, stage: str, values: Dict):
+        """Update some platforms of a {platform: value} stage, keeping the others"""
+        if values:
+            self.put(key, **{stage: {**self.get(key).get(stage, {}), **values}})
+
+    def purge(self) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM stages WHERE updated_at < ?", (time.time() - self.ttl,))
+        if cursor.rowcount:
+            log_info(logger, f"Dropped {cursor.rowcount} expired stage output(s)")
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_stage_cache: Optional[StageCache] = None
+_stage_cache_lock = threading.Lock()
+
+
+def get_stage_cache() -> StageCache:
+    """Process-wide cache at storage.stages_path (default data/stages.db)"""
+    global _stage_cache
+    if _stage_cache is None:
+        with _stage_cache_lock:
+            if _stage_cache is None:
+                try:
+                    from scripts.src.config.loader import load_config
+
+                    settings = load_config().get('storage', {}) or {}
+                except Exception:
+                    settings = {}
+                _stage_cache = StageCache(settings.get('stages_path', DEFAULT_PATH),
+                                          settings.get('stage_ttl_hours', 24))
+                _stage_cache.purge()
+    return _stage_cache
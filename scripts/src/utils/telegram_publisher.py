@@ -0,0 +1,284 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Sequence
+
+import requests
+
+from scripts.src.utils.http_client import CircuitOpenError, get_http_client
+from scripts.src.utils.logger import setup_logger, log_info, log_warning
+
+logger = setup_logger('TelegramPublisher')
+
+MESSAGE_LIMIT = 4096
+CAPTION_LIMIT = 1024
+MEDIA_GROUP_LIMIT = 10
+
+# Bot API limits: about one message per second in a private chat, 20 per
+# minute in a group or channel, and 30 per second overall
+PRIVATE_CHAT_INTERVAL = 1.0
+GROUP_CHAT_INTERVAL = 3.0
+GLOBAL_INTERVAL = 1 / 30
+
+MAX_ATTEMPTS = 4
+MAX_RETRY_AFTER = 120
+
+TAG_RE = re.compile(r'<(/?)([a-zA-Z][\w-]*)[^>]*>')
+
+
+class TelegramError(Exception):
+    """Bot API call that failed for good (bad request, or out of retries)"""
+
+    def __init__(self, description: str, error_code: int = None):
+        super().__init__(description)
+        self.description = description
+        self.error_code = error_code
+
+
+class ChatRateLimiter:
+    """
+    Spaces out sends per chat and overall
+
+    Channels and groups get one message every GROUP_CHAT_INTERVAL seconds,
+    private chats (positive ids) one per second, and the bot as a whole
+    stays under 30 per second.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_for_chat: Dict[str, float] = {}
+        self._next_global = 0.0
+
+    def wait(self, chat_id) -> float:
+        chat_id = str(chat_id)
+        # Users have positive ids; groups and channels are negative or @names
+        interval = PRIVATE_CHAT_INTERVAL if chat_id.isdigit() else GROUP_CHAT_INTERVAL
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next_for_chat.get(chat_id, 0.0), self._next_global)
+            self._next_for_chat[chat_id] = at + interval
+            self._next_global = at + GLOBAL_INTERVAL
+        delay = at - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def penalize(self, chat_id, seconds: float):
+        """Telegram said retry_after: nothing goes to that chat before then"""
+        with self._lock:
+            self._next_for_chat[str(chat_id)] = time.monotonic() + seconds
+
+
+def _safe_cut(text: str, limit: int) -> int:
+    """Best position <= limit to split at, never inside a tag or an entity"""
+    window = text[:limit]
+    for separator in ('\n\n', '\n', '. ', ' '):
+        position = window.rfind(separator)
+        if position > limit // 3:
+            cut = position + len(separator)
+            break
+    else:
+        cut = limit
+    # Step back out of a tag or entity the cut landed in
+    tag_open, tag_close = text.rfind('<', 0, cut), text.rfind('>', 0, cut)
+    if tag_open > tag_close:
+        cut = tag_open
+    amp, semi = text.rfind('&', 0, cut), text.rfind(';', 0, cut)
+    if amp > semi and cut - amp < 10:
+        cut = amp
+    return max(cut, 1)
+
+
+def _open_tags(html: str) -> List[re.Match]:
+    stack = []
+    for match in TAG_RE.finditer(html):
+        closing, name = match.group(1), match.group(2).lower()
+        if not closing:
+            stack.append(match)
+        else:
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i].group(2).lower() == name:
+                    del stack[i:]
+                    break
+    return stack
+
+
+def split_html(text: str, limit: int = MESSAGE_LIMIT) -> List[str]:
+    """
+    Split Telegram HTML into messages of at most limit characters
+
+    Prefers paragraph, then line, sentence and word boundaries. Tags still
+    open at a cut are closed at the end of the chunk and reopened at the
+    start of the next one, so every chunk is valid on its own.
+    """
+    chunks = []
+    while len(text) > limit:
+        reserve = 0
+        while True:
+            cut = _safe_cut(text, limit - reserve)
+            head, rest = text[:cut], text[cut:]
+            still_open = _open_tags(head)
+            opening = ''.join(m.group(0) for m in still_open)
+            closing = ''.join(f"</{m.group(2)}>" for m in reversed(still_open))
+            if len(opening) + len(closing) > limit // 4:
+                # Pathologically deep nesting: drop the markup rather than
+                # carry more tags than text into every chunk
+                head, rest = TAG_RE.sub('', head), TAG_RE.sub('', rest)
+                opening = closing = ''
+            if len(head.rstrip()) + len(closing) <= limit:
+                break
+            reserve += len(head.rstrip()) + len(closing) - limit
+        chunks.append(head.rstrip() + closing)
+        text = opening + rest.lstrip()
+    if text.strip():
+        chunks.append(text.strip())
+    return chunks
+
+
+class TelegramPublisher:
+    """
+    Bot API client for publishing posts
+
+    Requests go through the shared telegram HTTP client (pooling, breaker,
+    metrics); on top of it a per-chat rate limiter, retries that
+    honour retry_after on 429 and back off on 5xx/connection errors, long
+    posts split at HTML-safe boundaries, and photos sent as a captioned
+    photo or media group.
+    """
+
+    def __init__(self, bot_token: str, limiter: ChatRateLimiter = None, timeout: float = 30):
+        self.base_url = f"https://api.telegram.org/bot{bot_token}"
+        self.limiter = limiter or ChatRateLimiter()
+        self.timeout = timeout
+        self.http = get_http_client('telegram')
+
+    def _call(self, method: str, chat_id, data: Dict = None, files: Dict = None) -> Dict:
+        """One Bot API call with rate limiting and retries; returns `result`"""
+        data = dict(data or {}, chat_id=chat_id)
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            self.limiter.wait(chat_id)
+            for handle in (files or {}).values():
+                handle[1].seek(0)
+            try:
+                if files:
+                    response = self.http.post(f"{self.base_url}/{method}", data=data, files=files,
+                                                 timeout=(5, self.timeout))
+                else:
+                    response = self.http.post(f"{self.base_url}/{method}", json=data,
+                                                 timeout=(5, self.timeout))
+            except CircuitOpenError as e:
+                raise TelegramError(str(e))
+            except requests.exceptions.ConnectionError as e:
+                # Nothing reached Telegram, safe to resend
+                if attempt == MAX_ATTEMPTS:
+                    raise TelegramError(f"Network error: {e}")
+                time.sleep(2 ** attempt)
+                continue
+
+            try:
+                body = response.json()
+            except ValueError:
+                body = {"ok": False, "description": response.text[:200]}
+            if body.get("ok"):
+                return body["result"]
+
+            description = body.get("description", f"HTTP {response.status_code}")
+            if response.status_code == 429:
+                retry_after = (body.get("parameters") or {}).get("retry_after", 2 ** attempt)
+                if retry_after > MAX_RETRY_AFTER or attempt == MAX_ATTEMPTS:
+                    raise TelegramError(description, 429)
+                log_warning(logger, f"Telegram {method} rate limited, retrying in {retry_after}s")
+                self.limiter.penalize(chat_id, retry_after)
+                continue
+            if response.status_code >= 500 and attempt < MAX_ATTEMPTS:
+                log_warning(logger, f"Telegram {method} returned {response.status_code}, retrying")
+                time.sleep(2 ** attempt)
+                continue
+            raise TelegramError(description, response.status_code)
+        raise TelegramError(f"{method} failed after {MAX_ATTEMPTS} attempts")
+
+    def send_message(self, chat_id, text: str, parse_mode: str = "HTML",
+                     disable_web_page_preview: bool = False) -> List[int]:
+        """Send text, split into several messages if needed; returns their ids"""
+        ids = []
+        for chunk in split_html(text, MESSAGE_LIMIT):
+            result = self._call("sendMessage", chat_id, {
+                "text": chunk,
+                "parse_mode": parse_mode,
+                # Only the first message previews the link
+                "disable_web_page_preview": disable_web_page_preview or bool(ids),
+            })
+            ids.append(result["message_id"])
+        return ids
+
+    def send_photo(self, chat_id, photo: str, caption: str = None, **options) -> Dict:
+        """
+        Send one photo
+
+        Args:
+            photo: A file_id/URL, or a path to a local file to upload
+            caption: Optional HTML caption (at most CAPTION_LIMIT characters)
+        """
+        data = dict(options)
+        if caption:
+            data.update(caption=caption, parse_mode="HTML")
+        if not os.path.isfile(photo):
+            return self._call("sendPhoto", chat_id, dict(data, photo=photo))
+        with open(photo, "rb") as f:
+            return self._call("sendPhoto", chat_id, data, files={"photo": (os.path.basename(photo), f)})
+
+    def send_media_group(self, chat_id, photos: Sequence[str], caption: str = None) -> List[Dict]:
+        """Up to ten photos as one album, caption on the first"""
+        media, files = [], {}
+        try:
+            for i, photo in enumerate(photos[:MEDIA_GROUP_LIMIT]):
+                item = {"type": "photo", "media": photo}
+                if os.path.isfile(photo):
+                    name = f"photo{i}"
+                    files[name] = (os.path.basename(photo), open(photo, "rb"))
+                    item["media"] = f"attach://{name}"
+                if i == 0 and caption:
+                    item.update(caption=caption, parse_mode="HTML")
+                media.append(item)
+            return self._call("sendMediaGroup", chat_id, {"media": json.dumps(media)}, files=files or None)
+        finally:
+            for _, handle in files.values():
+                handle.close()
+
+    def publish(self, chat_id, text: str, photos: Sequence[str] = ()) -> List[int]:
+        """
+        Post text with optional photos the way Telegram allows
+
+        Short text becomes the caption of the photo (or album); longer text
+        follows the media as its own message(s). Returns all message ids.
+        """
+        if not photos:
+            return self.send_message(chat_id, text)
+
+        caption = text if len(text) <= CAPTION_LIMIT else None
+        if len(photos) == 1:
+            ids = [self.send_photo(chat_id, photos[0], caption)["message_id"]]
+        else:
+            ids = [message["message_id"] for message in self.send_media_group(chat_id, photos, caption)]
+        if caption is None:
+            ids += self.send_message(chat_id, text)
+        log_info(logger, f"Published to {chat_id}: {len(ids)} message(s)")
+        return ids
+
+
+# One limiter for the whole process: every publisher shares the same quotas
+_chat_limiter = ChatRateLimiter()
+_publishers: Dict[str, TelegramPublisher] = {}
+_publishers_lock = threading.Lock()
+
+
+def get_telegram_publisher(bot_token: str) -> TelegramPublisher:
+    """Cached publisher for a bot token"""
+    with _publishers_lock:
+        publisher = _publishers.get(bot_token)
+        if publisher is None:
+            publisher = TelegramPublisher(bot_token, _chat_limiter)
+            _publishers[bot_token] = publisher
+        return publisher
@@ -0,0 +1,148 @@
+import html
+import logging
+import re
+from collections import Counter
+from typing import Callable, Dict, NamedTuple, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Replacement = Union[str, Callable[[Tuple[str, ...]], str]]
+
+
+class Rule(NamedTuple):
+    """
+    One rewrite in a rule set
+
+    replace is a str.format template over the rule's groups ({0}, {1}, ...)
+    or a callable taking the groups tuple. With nested=True the first group
+    is normalized with the same rule set before it is substituted, so e.g.
+    **Mixture of Experts (MoE)** loses the bold and gets its brackets fixed.
+    first lists what a match can start with: single characters, or a
+    longer literal prefix for rules that would otherwise fire on every
+    space or newline.
+    """
+    name: str
+    pattern: str
+    replace: Replacement
+    first: str
+    nested: bool = False
+
+
+class Normalizer:
+    """
+    Precompiled rule set applied as a single tokenizer pass
+
+    All rules are joined into one alternation, so the text is scanned once
+    and every match is dispatched to its rule. Earlier rules win where
+    patterns overlap (links must come before parentheses, bold before italic).
+    A lookahead on the rules' first characters lets the scanner skip plain
+    text without trying every alternative at every position.
+    """
+
+    def __init__(self, name: str, rules: Sequence[Rule], flags: int = re.MULTILINE):
+        self.name = name
+        self.rules = list(rules)
+        self._by_group: Dict[int, Tuple[Rule, int]] = {}
+
+        parts = []
+        group = 1
+        for rule in self.rules:
+            inner = re.compile(rule.pattern, flags).groups
+            self._by_group[group] = (rule, inner)
+            parts.append(f"({rule.pattern})")
+            group += inner + 1
+        chars = sorted({rule.first for rule in self.rules if len(rule.first) == 1})
+        prefixes = sorted({re.escape(rule.first) for rule in self.rules if len(rule.first) > 1})
+        gate = '|'.join(([f"[{re.escape(''.join(chars))}]"] if chars else []) + prefixes)
+        self._regex = re.compile(f"(?={gate})(?:{'|'.join(parts)})", flags)
+
+    def _apply(self, text: str, hits: Counter = None) -> str:
+        def dispatch(match):
+            # The wrapping group of the matched rule is the last one to close
+            rule, inner = self._by_group[match.lastindex]
+            start = match.lastindex + 1
+            groups = tuple(match.group(i) or '' for i in range(start, start + inner))
+            if hits is not None:
+                hits[rule.name] += 1
+            if rule.nested and groups:
+                groups = (self._apply(groups[0], hits),) + groups[1:]
+            if callable(rule.replace):
+                return rule.replace(groups)
+            return rule.replace.format(*groups)
+
+        return self._regex.sub(dispatch, text)
+
+    def normalize(self, text: str) -> str:
+        if not text:
+            return text
+        if not logger.isEnabledFor(logging.DEBUG):
+            return self._apply(text).strip()
+
+        hits = Counter()
+        result = self._apply(text, hits).strip()
+        logger.debug("[%s] %d -> %d chars, rules: %s", self.name, len(text), len(result),
+                     ', '.join(f"{name}×{count}" for name, count in hits.items()) or 'none')
+        return result
+
+
+# Shared building blocks
+LINK = r'\[([^\]\n]+)\]\(([^)\s]+)\)'
+BOLD = r'\*\*([^*\n]+)\*\*'
+ITALIC = r'(?<![\*\w])\*(?![\s*])([^*\n]+?)(?<!\s)\*(?![\*\w])'
+HEADER = r'^#{1,6}[ \t]+'
+SPACES = r' {2,}'
+NEWLINES = r'\n{3,}'
+
+PLAIN_TEXT_RULES = [
+    Rule('link', LINK, '{0} {1}', '[', nested=True),
+    Rule('bold', BOLD, '{0}', '*', nested=True),
+    Rule('italic', ITALIC, '{0}', '*', nested=True),
+    Rule('header', HEADER, '', '#'),
+    Rule('spaces', SPACES, ' ', '  '),
+    Rule('newlines', NEWLINES, '\n\n', '\n\n\n'),
+]
+
+TELEGRAM_TAGS = (
+    'b', 'strong', 'i', 'em', 'u', 'ins', 's', 'strike', 'del',
+    'a', 'code', 'pre', 'tg-spoiler', 'span', 'blockquote', 'tg-emoji',
+)
+
+NORMALIZERS: Dict[str, Normalizer] = {
+    # LinkedIn commentary is plain text and chokes on parentheses
+    'linkedin': Normalizer('linkedin', PLAIN_TEXT_RULES[:3] + [
+        Rule('parentheses', r'\(([^)]+)\)', '[{0}]', '(', nested=True),
+    ] + PLAIN_TEXT_RULES[3:]),
+    # X shows markdown and HTML literally
+    'twitter': Normalizer('twitter', PLAIN_TEXT_RULES + [
+        Rule('html_tag', r'</?[a-zA-Z][\w-]*(?:\s[^<>]*)?/?>', '', '<'),
+    ]),
+    # Telegram HTML: markdown becomes tags, known tags and entities pass
+    # through, anything else that looks like markup is escaped
+    'telegram': Normalizer('telegram', [
+        Rule('link', LINK, lambda g: f'<a href="{html.escape(g[1])}">{g[0]}</a>', '[', nested=True),
+        Rule('bold', BOLD, '<b>{0}</b>', '*', nested=True),
+        Rule('italic', ITALIC, '<i>{0}</i>', '*', nested=True),
+        Rule('header', r'^#{1,6}[ \t]+([^\n]+)', '<b>{0}</b>', '#', nested=True),
+        Rule('tag', r'(</?(?:' + '|'.join(TELEGRAM_TAGS) + r')(?:\s[^<>]*)?>)', '{0}', '<'),
+        Rule('entity', r'(&(?:[a-zA-Z]+|#\d+|#x[0-9a-fA-F]+);)', '{0}', '&'),
+        Rule('ampersand', r'&', '&amp;', '&'),
+        Rule('less_than', r'<', '&lt;', '<'),
+        Rule('greater_than', r'>', '&gt;', '>'),
+        Rule('spaces', SPACES, ' ', '  '),
+        Rule('newlines', NEWLINES, '\n\n', '\n\n\n'),
+    ]),
+}
+
+
+def normalize_text(text: str, platform: str) -> str:
+    """
+    Clean LLM output for a platform in one pass
+
+    Args:
+        text: Post text as written by the model
+        platform: 'linkedin', 'twitter' or 'telegram'
+
+    Returns:
+        Text the platform renders as intended
+    """
+    return NORMALIZERS[platform].normalize(text)
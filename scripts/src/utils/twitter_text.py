@@ -0,0 +1,195 @@
+import re
+import unicodedata
+from typing import List, Tuple
+
+# Weighted counting rules from twitter-text v3 (what X uses for the 280 limit)
+MAX_WEIGHTED_LENGTH = 280
+URL_WEIGHT = 23
+DEFAULT_WEIGHT = 2
+# Latin, Cyrillic, Greek, Hebrew, Arabic... and some punctuation count once;
+# everything else (CJK, emoji, ...) counts twice
+LIGHT_RANGES = (
+    (0x0000, 0x10FF),
+    (0x2000, 0x200D),
+    (0x2010, 0x201F),
+    (0x2032, 0x2037),
+)
+
+# Code points that extend the previous emoji instead of counting on their own:
+# ZWJ + next emoji, variation selectors, keycap, skin tones, tag sequences
+EMOJI_TAIL_RE = re.compile(
+    '(?:\u200d[^\\s]|[\ufe0e\ufe0f\u20e3\U0001F3FB-\U0001F3FF\U000E0020-\U000E007F])+'
+)
+FLAG_RE = re.compile('[\U0001F1E6-\U0001F1FF]{2}')
+HEAVY_RE = re.compile(
+    '[^' + ''.join(f'\\U{low:08x}-\\U{high:08x}' for low, high in LIGHT_RANGES) + ']'
+)
+
+URL_RE = re.compile(r'https?://[^\s]+')
+HASHTAG_RE = re.compile(r'#\w+')
+SENTENCE_END_RE = re.compile(r'(?<=[.!?…])\s+')
+
+
+def _raw_weight(text: str) -> int:
+    return len(text) + (DEFAULT_WEIGHT - 1) * len(HEAVY_RE.findall(text))
+
+
+def _text_weight(text: str) -> int:
+    """Weight of text that contains no URLs"""
+    if text.isascii():
+        return len(text)
+    weight = _raw_weight(text)
+    for tail in EMOJI_TAIL_RE.findall(text):
+        # Already counted as part of the emoji it follows
+        weight -= _raw_weight(tail)
+    # A flag is two regional indicators but one emoji
+    return weight - DEFAULT_WEIGHT * len(FLAG_RE.findall(text))
+
+
+def weighted_length(text: str) -> int:
+    """
+    Length of a tweet the way X counts it
+
+    URLs count as 23 whatever their length, CJK characters and emoji count
+    as 2, and multi-codepoint emoji sequences count once.
+    """
+    text = unicodedata.normalize('NFC', text)
+    weight = 0
+    position = 0
+    for match in URL_RE.finditer(text):
+        weight += _text_weight(text[position:match.start()]) + URL_WEIGHT
+        position = match.end()
+    return weight + _text_weight(text[position:])
+
+
+def fits_in_tweet(text: str, max_weight: int = MAX_WEIGHTED_LENGTH) -> bool:
+    return weighted_length(text) <= max_weight
+
+
+def _pieces(body: str) -> List[Tuple[str, int]]:
+    """Sentences of the body with their weights"""
+    pieces = []
+    for sentence in SENTENCE_END_RE.split(body):
+        sentence = sentence.strip()
+        if sentence:
+            pieces.append((sentence, _text_weight(sentence)))
+    return pieces
+
+
+def _pack(pieces: List[Tuple[str, int]], first_budget: int, budget: int) -> List[str]:
+    """Greedy packing of sentences (then words) into tweets - one pass"""
+    tweets = []
+    current, current_weight = [], 0
+    limit = first_budget
+
+    def flush():
+        nonlocal current, current_weight, limit
+        if current:
+            tweets.append(' '.join(current))
+            current, current_weight = [], 0
+            limit = budget
+
+    def add(text, weight):
+        nonlocal current_weight, limit
+        if current and current_weight + 1 + weight > limit:
+            flush()
+        if not current and weight > limit:
+            # Only the first tweet is smaller; leave it to the URLs/hashtags
+            tweets.append('')
+            limit = budget
+        current_weight += (1 if current else 0) + weight
+        current.append(text)
+
+    for sentence, weight in pieces:
+        if weight <= budget:
+            add(sentence, weight)
+            continue
+        # Sentence alone is too long: fall back to word boundaries
+        for word in sentence.split():
+            word_weight = _text_weight(word)
+            while word_weight > budget:
+                # A single unbreakable token longer than a tweet
+                cut = max(1, len(word) * budget // word_weight)
+                while cut > 1 and _text_weight(word[:cut]) > budget:
+                    cut -= 1
+                flush()
+                add(word[:cut], _text_weight(word[:cut]))
+                flush()
+                word = word[cut:]
+                word_weight = _text_weight(word)
+            add(word, word_weight)
+    flush()
+    return tweets
+
+
+def _first_tweet_suffix(urls: List[str], hashtags: List[str],
+                        max_weight: int) -> Tuple[str, int, List[Tuple[str, int]]]:
+    """
+    URLs then as many hashtags as fit, leaving at least half the tweet for text
+
+    Returns the suffix, its weight, and the URLs and hashtags that did not
+    fit as (text, weight) pieces to post after the body.
+    """
+    room = max_weight // 2
+    lines, weight, overflow = [], 0, []
+    for url in urls:
+        if weight + 1 + URL_WEIGHT <= room:
+            lines.append(url)
+            weight += 1 + URL_WEIGHT
+        else:
+            overflow.append((url, URL_WEIGHT))
+    tags, tags_weight, overflow_tags = [], 0, []
+    for tag in hashtags:
+        tag_weight = _text_weight(tag) + (1 if tags else 0)
+        if weight + 1 + tags_weight + tag_weight <= room:
+            tags.append(tag)
+            tags_weight += tag_weight
+        else:
+            overflow_tags.append(tag)
+    if tags:
+        lines.append(' '.join(tags))
+        weight += 1 + tags_weight
+    if overflow_tags:
+        # One piece; _pack breaks it at spaces if it is longer than a tweet
+        overflow.append((' '.join(overflow_tags), _text_weight(' '.join(overflow_tags))))
+    return ''.join(f"\n{line}" for line in lines), weight, overflow
+
+
+def split_thread(text: str, max_weight: int = MAX_WEIGHTED_LENGTH) -> List[str]:
+    """
+    Split text into a thread where every tweet fits X's weighted limit
+
+    Text that already fits is returned as a single tweet, untouched.
+    Otherwise hashtags and URLs go to the first tweet (those that do not
+    fit there get closing tweets of their own, in order), the rest is split
+    at sentence boundaries (words only for over-long sentences), and tweets
+    are numbered "i/N".
+    """
+    text = unicodedata.normalize('NFC', text)
+    if weighted_length(text) <= max_weight:
+        return [text]
+
+    urls = URL_RE.findall(text)
+    body = URL_RE.sub(' ', text)
+    hashtags = list(dict.fromkeys(HASHTAG_RE.findall(body)))
+    body = ' '.join(HASHTAG_RE.sub(' ', body).split())
+
+    suffix, suffix_weight, overflow = _first_tweet_suffix(urls, hashtags, max_weight)
+    pieces = _pieces(body)
+
+    # The "i/N " prefix depends on N; repack only when N gains a digit
+    digits = 1
+    while True:
+        prefix_weight = 2 * digits + 2
+        budget = max_weight - prefix_weight
+        tweets = _pack(pieces, budget - suffix_weight, budget) or ['']
+        tweets += _pack(overflow, budget, budget)
+        if len(tweets) < 10 ** digits:
+            break
+        digits += 1
+
+    tweets[0] = (tweets[0] + suffix).strip()
+    total = len(tweets)
+    if total > 1:
+        tweets = [f"{i + 1}/{total} {tweet}" for i, tweet in enumerate(tweets)]
+    return tweets